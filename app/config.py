@@ -8,9 +8,40 @@ DB_PATH = os.path.join(DATA_DIR, "expense_tracker.db")
 FONTS_DIR = os.path.join(BASE_DIR, "resources", "fonts")
 EXPORTS_DIR = os.path.join(BASE_DIR, "exports")
 
-# Ensure directories exist
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(EXPORTS_DIR, exist_ok=True)
+
+def ensure_dirs():
+    """create the data and exports directories; called by main.py, not at import time."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+
+
+# Database connection pool (one engine per database file, shared by every session)
+DB_POOL_SIZE = 5
+DB_POOL_MAX_OVERFLOW = 10
+DB_POOL_TIMEOUT = 30
+
+# SQLite PRAGMA profile applied on connect: "durable", "balanced" or "fast" (see core/database.py)
+DB_PERFORMANCE_PROFILE = "balanced"
+
+# How money columns are stored: "decimal" (NUMERIC(15, 2)) or "cents" (integer minor units).
+# Changing it migrates existing rows once at startup (see core/database.py).
+MONEY_STORAGE = "decimal"
+
+# Each expense keeps the currency it was paid in. Totals, budgets, charts and the monthly rollup
+# are in BASE_CURRENCY, converted with the rates in the fx_rates table (see services/fx_service.py).
+BASE_CURRENCY = "BRL"
+CURRENCY_SYMBOLS = {
+    "BRL": "R$",
+    "USD": "US$",
+    "EUR": "€",
+    "GBP": "£",
+    "ARS": "AR$",
+}
+
+# Query instrumentation (core/instrumentation.py), enabled with `python main.py --query-stats FILE`.
+# Statements slower than SLOW_QUERY_MS are appended to SLOW_QUERY_LOG with their query plan.
+SLOW_QUERY_MS = 100
+SLOW_QUERY_LOG = os.path.join(DATA_DIR, "slow_queries.log")
 
 APP_NAME = "Expense Tracker"
 APP_VERSION = "1.0.0"
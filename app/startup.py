@@ -0,0 +1,37 @@
+"""Startup timing for `python main.py --startup-profile`: wall time per import/construction phase."""
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """phases are printed to stderr as they finish, so views built later on first open show up too."""
+
+    def __init__(self):
+        self.enabled = False
+        self._t0 = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+
+    def enable(self):
+        self.enabled = True
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases.append((name, elapsed))
+            print(f"[startup] {name:<32} {elapsed * 1000:8.1f} ms", file=sys.stderr)
+
+    def mark(self, name: str):
+        """time since the process started the profile (the first import of this module)."""
+        if self.enabled:
+            print(f"[startup] {name:<32} {(time.perf_counter() - self._t0) * 1000:8.1f} ms total", file=sys.stderr)
+
+
+profile = StartupProfile()
@@ -0,0 +1,5 @@
+"""Benchmarks for the repository and service layer against a synthetic ledger.
+
+    python -m benchmarks --expenses 100000 --out results.json
+    python -m benchmarks --expenses 100000 --compare results.json
+"""
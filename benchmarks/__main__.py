@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date
+
+from app import config
+from core.database import dispose_engines, init_db, set_default_db_path
+from benchmarks.generator import DEFAULT_END, generate_ledger
+from benchmarks.suite import build_cases, compare, run_cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--expenses", type=int, default=100_000, help="rows to generate (10k to 5M)")
+    parser.add_argument("--categories", type=int, default=7)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--end", type=date.fromisoformat, default=DEFAULT_END, help="last ledger day, YYYY-MM-DD")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--foreign-share", type=float, default=0.0,
+                        help="share of expenses in foreign currencies (0 to 1), converted with seeded rates")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query case")
+    parser.add_argument("--export-repeat", type=int, default=1, help="runs per export case")
+    parser.add_argument("--only", action="append", default=[], help="run only cases with this name prefix")
+    parser.add_argument("--dir", help="keep the database and exports here instead of a temporary directory")
+    parser.add_argument("--out", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+    if args.dir and os.path.exists(os.path.join(args.dir, "bench.db")):
+        parser.error(f"{args.dir} already has a bench.db, remove it or pick another directory")
+
+    with tempfile.TemporaryDirectory(prefix="expense-bench-") as tmp:
+        work_dir = args.dir or tmp
+        set_default_db_path(os.path.join(work_dir, "bench.db"))
+        init_db()
+
+        t = time.perf_counter()
+        ledger = generate_ledger(
+            args.expenses, args.categories, args.years, args.end, args.seed,
+            foreign_share=args.foreign_share,
+            progress=lambda n: print(f"generated {n}/{args.expenses}", end="\r", file=sys.stderr),
+        )
+        print(f"\nledger ready in {time.perf_counter() - t:.1f}s", file=sys.stderr)
+
+        results = run_cases(build_cases(args.end, work_dir), args.repeat, args.export_repeat, args.only)
+        dispose_engines()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "db_profile": config.DB_PERFORMANCE_PROFILE,
+            "money_storage": config.MONEY_STORAGE,
+        },
+        "ledger": ledger,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print("\n".join(compare(json.load(f), report)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Deterministic synthetic ledger: the same arguments always produce the same rows."""
+import math
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from app.config import BASE_CURRENCY
+from core.database import session_scope
+from core.models import Category
+from core import repository as repo
+
+CHUNK_SIZE = 50_000
+DEFAULT_END = date(2025, 12, 31)
+CENTS = Decimal("0.01")
+SOURCES = ("Nubank", "Itaú", "Bradesco", "Inter", "Santander", "Dinheiro", "C6")
+WEEKEND_WEIGHT = 1.4  # relative to a weekday
+# currencies of the foreign share of the ledger, with the rate their monthly random walk starts at
+FOREIGN_CURRENCIES = (("USD", 5.0), ("EUR", 5.5))
+
+
+class CategoryProfile(NamedTuple):
+    category_id: str
+    weight: float  # share of the expenses
+    median: float  # median amount, amounts are log-normal around it
+    sigma: float
+    words: tuple[str, ...]
+
+
+# matches the categories seeded by core.database._seed_default_categories
+DEFAULT_PROFILES = (
+    CategoryProfile("cat_1", 34, 42.0, 0.8, ("mercado", "padaria", "restaurante", "ifood", "feira", "lanche")),
+    CategoryProfile("cat_2", 20, 24.0, 0.7, ("uber", "gasolina", "metrô", "ônibus", "estacionamento", "pedágio")),
+    CategoryProfile("cat_3", 4, 950.0, 0.6, ("aluguel", "condomínio", "luz", "água", "internet", "gás")),
+    CategoryProfile("cat_4", 5, 110.0, 0.9, ("farmácia", "consulta", "exame", "dentista", "academia")),
+    CategoryProfile("cat_5", 12, 75.0, 0.9, ("cinema", "show", "bar", "viagem", "streaming", "livro")),
+    CategoryProfile("cat_6", 15, 140.0, 1.0, ("roupa", "eletrônicos", "presente", "casa", "amazon")),
+    CategoryProfile("cat_7", 10, 55.0, 1.1, ("taxa", "doação", "assinatura", "diversos")),
+)
+
+
+def build_profiles(categories: int, rnd: random.Random) -> list[CategoryProfile]:
+    """the seeded categories first, then extra ones with random weights and price ranges."""
+    profiles = list(DEFAULT_PROFILES[:categories])
+    for i in range(len(profiles), categories):
+        profiles.append(CategoryProfile(
+            category_id=f"bench_{i + 1}",
+            weight=rnd.uniform(1, 15),
+            median=round(math.exp(rnd.uniform(math.log(10), math.log(600))), 2),
+            sigma=rnd.uniform(0.5, 1.1),
+            words=tuple(f"item{i + 1}_{w}" for w in range(6)),
+        ))
+    return profiles
+
+
+def _seed_rates(start: date, end: date, rnd: random.Random) -> dict[str, float]:
+    """one rate per month and foreign currency; returns the average rate of each currency."""
+    averages = {}
+    with session_scope() as session:
+        for currency, rate in FOREIGN_CURRENCIES:
+            month, rates = date(start.year, start.month, 1), []
+            while month <= end:
+                rate *= rnd.uniform(0.97, 1.03)
+                rates.append(rate)
+                repo.set_fx_rate(session, currency, datetime.combine(month, datetime.min.time()),
+                                 Decimal(str(round(rate, 4))))
+                month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+            averages[currency] = sum(rates) / len(rates)
+    return averages
+
+
+def _iter_rows(
+    profiles: list[CategoryProfile],
+    expenses: int,
+    start: date,
+    days: int,
+    rnd: random.Random,
+    foreign_share: float = 0.0,
+    rates: Optional[dict[str, float]] = None,
+) -> Iterator[dict]:
+    weights = [p.weight for p in profiles]
+    start_dt = datetime.combine(start, datetime.min.time())
+    for i in range(expenses):
+        profile = rnd.choices(profiles, weights)[0]
+        # rejection sampling so weekends get WEEKEND_WEIGHT times more expenses
+        while True:
+            day = start_dt + timedelta(days=rnd.randrange(days))
+            if day.weekday() < 5 and rnd.random() * WEEKEND_WEIGHT > 1.0:
+                continue
+            break
+        amount = max(0.01, rnd.lognormvariate(math.log(profile.median), profile.sigma))
+        currency = BASE_CURRENCY
+        # only draws when enabled, so ledgers without foreign expenses stay identical for a seed
+        if foreign_share and rnd.random() < foreign_share:
+            currency = rnd.choice(list(rates))
+            amount = max(0.01, amount / rates[currency])
+        word = rnd.choice(profile.words)
+        yield {
+            "amount": Decimal(str(amount)).quantize(CENTS),
+            "currency": currency,
+            "date": day,
+            "category_id": profile.category_id,
+            "description": f"{word} {rnd.randint(1, 999)}" if rnd.random() < 0.5 else word,
+            "source": rnd.choice(SOURCES),
+            "created_at": day + timedelta(seconds=rnd.randrange(86_400)),
+        }
+
+
+def generate_ledger(
+    expenses: int,
+    categories: int = 7,
+    years: int = 5,
+    end: date = DEFAULT_END,
+    seed: int = 0,
+    progress: Optional[Callable[[int], None]] = None,
+    foreign_share: float = 0.0,
+) -> dict:
+    """fill the default database (see core.database.set_default_db_path) with synthetic expenses.
+
+    foreign_share of the expenses are in FOREIGN_CURRENCIES, with monthly rates seeded in fx_rates.
+    the database must already be initialized. returns the parameters used, for the results file.
+    """
+    rnd = random.Random(seed)
+    profiles = build_profiles(categories, rnd)
+
+    with session_scope() as session:
+        for profile in profiles[len(DEFAULT_PROFILES):]:
+            session.add(Category(id=profile.category_id, name=f"Categoria {profile.category_id[6:]}",
+                                 color="#64748b", is_system=False))
+
+    start = date(end.year - years, end.month, 1)
+    days = (end - start).days + 1
+    rates = _seed_rates(start, end, rnd) if foreign_share else None
+    chunk: list[dict] = []
+    written = 0
+    for row in _iter_rows(profiles, expenses, start, days, rnd, foreign_share, rates):
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            with session_scope() as session:
+                written += repo.bulk_insert_expenses(session, chunk)
+            chunk = []
+            if progress:
+                progress(written)
+    with session_scope() as session:
+        written += repo.bulk_insert_expenses(session, chunk)
+    if progress:
+        progress(written)
+
+    return {
+        "expenses": written,
+        "categories": categories,
+        "years": years,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "seed": seed,
+        "foreign_share": foreign_share,
+    }
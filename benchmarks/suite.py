@@ -0,0 +1,103 @@
+"""Timed cases over an already generated ledger, and comparison of two results files."""
+import os
+import statistics
+import time
+from datetime import date, datetime
+from typing import Any, Callable, NamedTuple
+
+from core.database import session_scope
+from core import repository as repo
+from services.export_service import export_csv, export_pdf
+
+
+class Case(NamedTuple):
+    name: str
+    fn: Callable[[], Any]  # returns something with a len() or a scalar
+    heavy: bool = False  # exports: repeated --export-repeat times instead of --repeat
+
+
+def _day_start(d: date) -> datetime:
+    return datetime.combine(d, datetime.min.time())
+
+
+def _day_end(d: date) -> datetime:
+    return datetime.combine(d, datetime.max.time())
+
+
+def _query(fn: Callable, *args, **kwargs) -> Callable[[], Any]:
+    def run():
+        with session_scope() as session:
+            return fn(session, *args, **kwargs)
+    return run
+
+
+def build_cases(end: date, out_dir: str) -> list[Case]:
+    """periods are anchored on the ledger end date so results do not depend on today's date."""
+    month_start = date(end.year, end.month, 1)
+    year_ago = date(end.year - 1, end.month, 1)
+    # starts and ends mid-month, so both the rollup and the edge-month scans are exercised
+    mid_from, mid_to = date(end.year - 2, end.month, 15), date(end.year - 1, end.month, 14)
+    csv_path = os.path.join(out_dir, "bench.csv")
+    pdf_path = os.path.join(out_dir, "bench.pdf")
+
+    return [
+        Case("get_expenses/month", _query(repo.get_expenses, _day_start(month_start), _day_end(end))),
+        Case("get_expenses/year_limit_200", _query(repo.get_expenses, _day_start(year_ago), _day_end(end), limit=200)),
+        Case("get_total_by_category_in_period/month",
+             _query(repo.get_total_by_category_in_period, _day_start(month_start), _day_end(end))),
+        Case("get_total_by_category_in_period/year",
+             _query(repo.get_total_by_category_in_period, _day_start(year_ago), _day_end(end))),
+        Case("get_monthly_totals/12", _query(repo.get_monthly_totals, 12, end=end)),
+        Case("get_monthly_totals/60", _query(repo.get_monthly_totals, 60, end=end)),
+        Case("get_total_spent_in_period/mid_month",
+             _query(repo.get_total_spent_in_period, _day_start(mid_from), _day_end(mid_to))),
+        Case("get_total_spent_in_period/all", _query(repo.get_total_spent_in_period, datetime.min, _day_end(end))),
+        Case("export_csv/year", lambda: export_csv(csv_path, _day_start(year_ago), _day_end(end)), heavy=True),
+        Case("export_pdf/month", lambda: export_pdf(pdf_path, _day_start(month_start), _day_end(end)), heavy=True),
+    ]
+
+
+def _size(result: Any):
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, str) and os.path.exists(result):
+        return os.path.getsize(result)  # exports return the file path
+    return str(result)
+
+
+def run_cases(cases: list[Case], repeat: int, export_repeat: int, only: list[str] = ()) -> dict[str, dict]:
+    results = {}
+    for case in cases:
+        if only and not any(case.name.startswith(prefix) for prefix in only):
+            continue
+        runs = []
+        result = None
+        for _ in range(export_repeat if case.heavy else repeat):
+            t = time.perf_counter()
+            result = case.fn()
+            runs.append(time.perf_counter() - t)
+        results[case.name] = {
+            "runs": [round(r, 6) for r in runs],
+            "min": round(min(runs), 6),
+            "median": round(statistics.median(runs), 6),
+            "mean": round(statistics.fmean(runs), 6),
+            "result": _size(result),
+        }
+    return results
+
+
+def compare(old: dict, new: dict) -> list[str]:
+    """one line per case present in both files: old and new medians and the ratio new/old."""
+    lines = [f"{'case':<45} {'old (ms)':>10} {'new (ms)':>10} {'ratio':>7}"]
+    for name, res in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            lines.append(f"{name:<45} {'-':>10} {res['median'] * 1000:>10.2f} {'-':>7}")
+            continue
+        ratio = res["median"] / before["median"] if before["median"] else float("inf")
+        lines.append(
+            f"{name:<45} {before['median'] * 1000:>10.2f} {res['median'] * 1000:>10.2f} {ratio:>6.2f}x"
+        )
+    if old.get("ledger") != new.get("ledger"):
+        lines.append("warning: the two runs used different ledgers, timings are not comparable")
+    return lines
@@ -1,34 +1,356 @@
-from contextlib import contextmanager
+import sqlite3
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.schema import CreateColumn
 
-from app.config import DB_PATH
-from core.models import Base, Category, Expense
+from app.config import (
+    DB_PATH,
+    DB_PERFORMANCE_PROFILE,
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    MONEY_STORAGE,
+)
+from core.models import Base, Category, Expense, SchemaMeta
+from core import instrumentation
+from core import repository as repo
 
-def get_engine():
-    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+# one engine (and its pool) per database file, plus the sessionmaker bound to it
+_engines: dict[str, Engine] = {}
+_sessionmakers: dict[Engine, sessionmaker] = {}
+# the same for the asyncio extension (aiosqlite driver), used by services.aio
+_async_engines: dict[str, "AsyncEngine"] = {}
+_async_sessionmakers: dict["AsyncEngine", "async_sessionmaker"] = {}
+_registry_lock = Lock()
+_default_db_path = DB_PATH
+
+_MB = 1024 * 1024
+
+# PRAGMAs applied to every new connection. cache_size is negative, so it is in KiB.
+# all profiles use WAL so readers never block the writer; they differ in how much
+# durability is traded for speed (synchronous) and how much memory SQLite may use.
+SQLITE_PROFILES: dict[str, dict[str, object]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 256 * _MB,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -131072,
+        "mmap_size": 1024 * _MB,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def _apply_profile(engine: Engine, profile: str):
+    pragmas = SQLITE_PROFILES.get(profile)
+    if pragmas is None:
+        raise ValueError(f"unknown SQLite profile {profile!r}, expected one of {sorted(SQLITE_PROFILES)}")
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _create_engine(db_path: str) -> Engine:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     engine = create_engine(
-        f"sqlite:///{DB_PATH}",
+        f"sqlite:///{db_path}",
         connect_args={"check_same_thread": False},
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_POOL_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
         echo = False,
     )
+    _apply_profile(engine, DB_PERFORMANCE_PROFILE)
+    if instrumentation.is_enabled():
+        instrumentation.attach(engine)
     return engine
 
+def set_default_db_path(db_path: str):
+    """point get_engine()/session_scope() without arguments at another database file (benchmarks, tools)."""
+    global _default_db_path
+    _default_db_path = db_path
+
+def _resolve(db_path: Optional[str]) -> str:
+    return str(Path(db_path or _default_db_path).resolve())
+
+def get_engine(db_path: Optional[str] = None) -> Engine:
+    """return the process-wide engine for db_path (defaults to DB_PATH), creating it on first use."""
+    path = _resolve(db_path)
+    engine = _engines.get(path)
+    if engine is not None:
+        return engine
+
+    with _registry_lock:
+        engine = _engines.get(path)
+        if engine is None:
+            engine = _create_engine(path)
+            _engines[path] = engine
+    return engine
+
+def get_sessionmaker(engine: Optional[Engine] = None) -> sessionmaker:
+    eng = engine or get_engine()
+    factory = _sessionmakers.get(eng)
+    if factory is not None:
+        return factory
+
+    with _registry_lock:
+        factory = _sessionmakers.get(eng)
+        if factory is None:
+            factory = sessionmaker(
+                bind=eng,
+                autocommit=False,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+            _sessionmakers[eng] = factory
+    return factory
+
+def dispose_engines():
+    """close every pooled connection, called on application shutdown."""
+    with _registry_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _sessionmakers.clear()
+
+def snapshot_database(dest_path: str, db_path: Optional[str] = None) -> str:
+    """copy the database to dest_path with SQLite's online backup API.
+
+    the copy is the committed state at the end of the backup; the app may keep reading and
+    writing meanwhile. batch jobs (report.py) point their processes at it so every file they
+    produce sees the same data.
+    """
+    Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
+    src = sqlite3.connect(_resolve(db_path))
+    dst = sqlite3.connect(dest_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return dest_path
+
+def _create_async_engine(db_path: str) -> "AsyncEngine":
+    try:
+        import aiosqlite  # noqa: F401
+        import greenlet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("aiosqlite não instalado. Execute: pip install aiosqlite greenlet")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_POOL_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        echo = False,
+    )
+    # connection events live on the sync facade; the PRAGMAs and listeners are the same
+    _apply_profile(engine.sync_engine, DB_PERFORMANCE_PROFILE)
+    if instrumentation.is_enabled():
+        instrumentation.attach(engine.sync_engine)
+    return engine
+
+def get_async_engine(db_path: Optional[str] = None) -> "AsyncEngine":
+    """the asyncio twin of get_engine: one AsyncEngine per database file. needs aiosqlite."""
+    path = _resolve(db_path)
+    engine = _async_engines.get(path)
+    if engine is not None:
+        return engine
+
+    with _registry_lock:
+        engine = _async_engines.get(path)
+        if engine is None:
+            engine = _create_async_engine(path)
+            _async_engines[path] = engine
+    return engine
+
+def get_async_sessionmaker(engine: Optional["AsyncEngine"] = None) -> "async_sessionmaker":
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    eng = engine or get_async_engine()
+    factory = _async_sessionmakers.get(eng)
+    if factory is not None:
+        return factory
+
+    with _registry_lock:
+        factory = _async_sessionmakers.get(eng)
+        if factory is None:
+            factory = async_sessionmaker(bind=eng, autoflush=False, expire_on_commit=False)
+            _async_sessionmakers[eng] = factory
+    return factory
+
+async def dispose_async_engines():
+    """close the pooled aiosqlite connections; must run on the event loop that used them."""
+    with _registry_lock:
+        engines = list(_async_engines.values())
+        _async_engines.clear()
+        _async_sessionmakers.clear()
+    for engine in engines:
+        await engine.dispose()
+
 def init_db(engine=None):
     if engine is None:
         engine = get_engine()
     Base.metadata.create_all(engine)
+    _ensure_columns(engine)
+    _ensure_indexes(engine)
+    _migrate_money_storage(engine)
+    _build_monthly_totals_once(engine)
+    _ensure_search_index(engine)
     _seed_default_categories(engine)
     return engine
 
-def _seed_default_categories(engine):
-    from sqlalchemy.orm import sessionmaker
-    from sqlalchemy import text
+def _get_meta(conn, key: str) -> Optional[str]:
+    return conn.execute(
+        select(SchemaMeta.value).where(SchemaMeta.key == key)
+    ).scalar()
+
+def _set_meta(conn, key: str, value: str):
+    conn.execute(
+        sqlite_insert(SchemaMeta)
+        .values(key=key, value=value)
+        .on_conflict_do_update(index_elements=[SchemaMeta.key], set_={"value": value})
+    )
+
+# (table, column) pairs declared with the Money type
+MONEY_COLUMNS = [
+    ("expenses", "amount"),
+    ("categories", "monthly_limit"),
+    ("category_limits", "limit_value"),
+    ("recurring_expenses", "amount"),
+    ("expense_monthly_totals", "total"),
+]
+
+def _migrate_money_storage(engine):
+    """rewrite stored amounts once when MONEY_STORAGE changes ("decimal" <-> "cents")."""
+    if MONEY_STORAGE not in ("decimal", "cents"):
+        raise ValueError(f"unknown MONEY_STORAGE {MONEY_STORAGE!r}, expected 'decimal' or 'cents'")
+
+    with engine.begin() as conn:
+        current = _get_meta(conn, "money_storage") or "decimal"
+        if current == MONEY_STORAGE:
+            return
+
+        for table, column in MONEY_COLUMNS:
+            if MONEY_STORAGE == "cents":
+                expr = f"CAST(ROUND({column} * 100) AS INTEGER)"
+            else:
+                expr = f"ROUND({column} / 100.0, 2)"
+            conn.execute(text(f"UPDATE {table} SET {column} = {expr} WHERE {column} IS NOT NULL"))
+        _set_meta(conn, "money_storage", MONEY_STORAGE)
+
+def _build_monthly_totals_once(engine):
+    """fill the monthly rollup from existing expenses the first time a database is opened with it."""
+    with session_scope(engine) as session:
+        conn = session.connection()
+        if _get_meta(conn, "monthly_totals") == "1":
+            return
+        repo.rebuild_monthly_totals(session)
+        _set_meta(conn, "monthly_totals", "1")
+
+def _ensure_columns(engine):
+    """create_all skips tables that already exist, so add columns declared after the table was created.
+
+    SQLite's ADD COLUMN cannot add constraints: such columns must be nullable (foreign keys are
+    only declared, SQLite does not enforce them here) and unique keys go in an index.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existing:
+                    ddl = CreateColumn(col).compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+        # rows written before created_at was filled in have it NULL; keyset pagination orders and
+        # compares on (date, created_at, id), so give them a value (a no-op scan once backfilled)
+        conn.execute(text("UPDATE expenses SET created_at = COALESCE(updated_at, date) WHERE created_at IS NULL"))
+
+def _ensure_indexes(engine):
+    """create_all skips tables that already exist, so add indexes declared after the table was created."""
+    inspector = inspect(engine)
+    created = False
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+                    created = True
+        if created:
+            conn.execute(text("ANALYZE"))
 
-    Session = sessionmaker(bind=engine)
-    with Session() as session:
+# FTS5 index over expenses.description/source. it is an external-content table (the text lives
+# only in expenses), kept in sync by triggers so every write path, bulk inserts included, updates it.
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(
+        description, source,
+        content='expenses', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_ai AFTER INSERT ON expenses BEGIN
+        INSERT INTO expenses_fts(rowid, description, source) VALUES (new.rowid, new.description, new.source);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_ad AFTER DELETE ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, description, source)
+        VALUES ('delete', old.rowid, old.description, old.source);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS expenses_fts_au AFTER UPDATE OF description, source ON expenses BEGIN
+        INSERT INTO expenses_fts(expenses_fts, rowid, description, source)
+        VALUES ('delete', old.rowid, old.description, old.source);
+        INSERT INTO expenses_fts(rowid, description, source) VALUES (new.rowid, new.description, new.source);
+    END""",
+]
+
+def _ensure_search_index(engine):
+    with engine.begin() as conn:
+        for ddl in SEARCH_INDEX_DDL:
+            conn.execute(text(ddl))
+        if _get_meta(conn, "search_index") != "1":
+            rebuild_search_index(conn)
+            _set_meta(conn, "search_index", "1")
+
+def rebuild_search_index(conn):
+    """reindex every expense; also the fix if the index drifts (e.g. a VACUUM renumbering rowids)."""
+    conn.execute(text("INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')"))
+
+def _seed_default_categories(engine):
+    SessionLocal = get_sessionmaker(engine)
+    with SessionLocal() as session:
         count = session.query(Category).count()
         if count > 0:
             return
@@ -50,14 +372,8 @@ def _seed_default_categories(engine):
 
 @contextmanager
 def session_scope(engine=None):
-    eng = engine or get_engine()
-    SessionLocal = sessionmaker(
-        bind=eng,
-        autocommit=False,
-        autoflush=False,
-        expire_on_commit=False,
-    )
-    session = SessionLocal()
+    SessionLocal = get_sessionmaker(engine)
+    session: Session = SessionLocal()
 
     try:
         yield session
@@ -67,3 +383,18 @@ def session_scope(engine=None):
         raise
     finally:
         session.close()
+
+@asynccontextmanager
+async def async_session_scope(engine=None):
+    """session_scope for the asyncio services: commit on success, rollback on error."""
+    SessionLocal = get_async_sessionmaker(engine)
+    session = SessionLocal()
+
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
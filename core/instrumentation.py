@@ -0,0 +1,284 @@
+"""Query instrumentation: per-statement latency histograms, row counts, callers and a slow-query log.
+
+off by default. enable() must run before the first engine is created (core.database attaches
+the listeners in _create_engine); main.py does it for --query-stats. queries are grouped into
+scopes, one per background request of the views (see ui.loader), so the numbers read as
+"queries per refresh".
+"""
+import json
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import SLOW_QUERY_LOG, SLOW_QUERY_MS
+
+# upper bounds of the latency buckets, in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+RECENT_SCOPES = 500
+UNSCOPED = "(sem escopo)"
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+class StatementStats:
+    __slots__ = ("sql", "calls", "total_ms", "max_ms", "fetch_ms", "rows", "histogram", "callers")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.fetch_ms = 0.0  # from the end of execute to the last row fetched; not in the histogram
+        self.rows = 0  # rows returned to the caller (SELECT) or affected (writes)
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.callers: dict[str, int] = {}
+
+    def to_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "fetch_ms": round(self.fetch_ms, 3),
+            "rows": self.rows,
+            "histogram": {
+                (f"<={b}ms" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}ms"): n
+                for i, (b, n) in enumerate(zip(BUCKETS_MS + (None,), self.histogram)) if n
+            },
+            "callers": dict(sorted(self.callers.items(), key=lambda kv: -kv[1])),
+        }
+
+
+class _Scope:
+    __slots__ = ("name", "started", "queries", "total_ms")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = datetime.now()
+        self.queries = 0
+        self.total_ms = 0.0
+
+
+class _ConnectionState:
+    """per DBAPI connection: the statement whose rows are being fetched."""
+    __slots__ = ("current", "executed_at", "last_row_at")
+
+    def __init__(self):
+        self.current: Optional[StatementStats] = None
+        self.executed_at = 0.0
+        self.last_row_at = 0.0
+
+    def finish(self):
+        """fold the fetch time of the current statement in, once its rows are no longer being read."""
+        stats = self.current
+        if stats is None:
+            return
+        self.current = None
+        if self.last_row_at > self.executed_at:
+            with _lock:
+                stats.fetch_ms += (self.last_row_at - self.executed_at) * 1000
+
+
+_enabled = False
+_lock = threading.Lock()
+# the open scopes, innermost last; a context variable so asyncio tasks each see their own
+_scopes: ContextVar[tuple] = ContextVar("instrumentation_scopes", default=())
+_statements: dict[str, StatementStats] = {}
+_scope_totals: dict[str, dict[str, float]] = {}
+_recent_scopes: deque = deque(maxlen=RECENT_SCOPES)
+_slow_log_path: Optional[str] = None
+_slow_ms = SLOW_QUERY_MS
+
+
+def enable(slow_query_ms: Optional[float] = None, slow_log: Optional[str] = SLOW_QUERY_LOG):
+    """turn instrumentation on for engines created from now on. slow_log=None disables the log file."""
+    global _enabled, _slow_ms, _slow_log_path
+    _enabled = True
+    _slow_ms = SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms
+    _slow_log_path = slow_log
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _statements.clear()
+        _scope_totals.clear()
+        _recent_scopes.clear()
+
+
+def attach(engine: Engine):
+    """hook the cursor and connect events of engine; called by core.database for every new engine."""
+    event.listen(engine, "connect", _on_connect)
+    event.listen(engine, "checkin", _on_checkin)
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+
+
+def scope(name: str):
+    """group the queries run by this thread (or asyncio task) inside the block under name; a no-op when disabled."""
+    if not _enabled:
+        return nullcontext()
+    return _scoped(name)
+
+
+@contextmanager
+def _scoped(name: str):
+    sc = _Scope(name)
+    token = _scopes.set(_scopes.get() + (sc,))
+    try:
+        yield sc
+    finally:
+        _scopes.reset(token)
+        _close_scope(sc)
+
+
+def _close_scope(sc: _Scope):
+    with _lock:
+        totals = _scope_totals.setdefault(sc.name, {"runs": 0, "queries": 0, "total_ms": 0.0, "max_queries": 0})
+        totals["runs"] += 1
+        totals["queries"] += sc.queries
+        totals["total_ms"] += sc.total_ms
+        totals["max_queries"] = max(totals["max_queries"], sc.queries)
+        _recent_scopes.append({
+            "name": sc.name,
+            "started": sc.started.isoformat(timespec="milliseconds"),
+            "queries": sc.queries,
+            "total_ms": round(sc.total_ms, 3),
+        })
+
+
+def _on_connect(dbapi_connection, connection_record):
+    state = _ConnectionState()
+    connection_record.info["instrumentation"] = state
+
+    # rows are counted as the caller fetches them; sqlite3 reports rowcount -1 for SELECTs
+    def count_row(cursor, row):
+        if state.current is not None:
+            state.current.rows += 1
+            state.last_row_at = time.perf_counter()
+        return row
+
+    # aiosqlite connections (services.aio) have no row_factory: their rows are not counted
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.row_factory = count_row
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    state = connection_record.info.get("instrumentation")
+    if state is not None:
+        state.finish()
+
+
+def _state(conn) -> Optional[_ConnectionState]:
+    return conn.connection.info.get("instrumentation")
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    state = _state(conn)
+    if state is not None:
+        state.finish()
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    caller = _find_caller()
+    sql = " ".join(statement.split())
+
+    with _lock:
+        stats = _statements.get(sql)
+        if stats is None:
+            stats = _statements[sql] = StatementStats(sql)
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.histogram[bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+        stats.callers[caller] = stats.callers.get(caller, 0) + 1
+        if cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+    stack = _scopes.get()
+    if stack:
+        stack[-1].queries += 1
+        stack[-1].total_ms += elapsed_ms
+    else:
+        with _lock:
+            totals = _scope_totals.setdefault(UNSCOPED, {"runs": 0, "queries": 0, "total_ms": 0.0, "max_queries": 0})
+            totals["queries"] += 1
+            totals["total_ms"] += elapsed_ms
+
+    state = _state(conn)
+    if elapsed_ms >= _slow_ms and _slow_log_path:
+        _log_slow(getattr(cursor, "connection", None), sql, statement, parameters, executemany, elapsed_ms, caller)
+    if state is not None:
+        state.current = stats
+        state.executed_at = state.last_row_at = time.perf_counter()
+
+
+def _find_caller() -> str:
+    """innermost service function on the stack, else the repository function, else '?'."""
+    frame = sys._getframe(2)
+    fallback = "?"
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("services."):
+            return f"{module}.{frame.f_code.co_name}"
+        if fallback == "?" and module == "core.repository":
+            fallback = f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback
+
+
+def _log_slow(dbapi_connection, sql: str, statement: str, parameters, executemany: bool, elapsed_ms: float, caller: str):
+    plan = ""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        plan = "    (EXPLAIN indisponível neste driver)"
+    elif sql.upper().startswith(_EXPLAINABLE):
+        params = parameters[0] if executemany and parameters else parameters
+        try:
+            rows = dbapi_connection.execute(f"EXPLAIN QUERY PLAN {statement}", params or ()).fetchall()
+            depth = {0: 0}
+            lines = []
+            for node_id, parent, _, detail in rows:
+                depth[node_id] = depth.get(parent, 0) + 1
+                lines.append(f"{'  ' * (depth[node_id] + 1)}{detail}")
+            plan = "\n".join(lines)
+        except sqlite3.Error as e:
+            plan = f"    (EXPLAIN falhou: {e})"
+
+    entry = f"{datetime.now().isoformat(timespec='seconds')} {elapsed_ms:.1f}ms {caller}\n  {sql}\n{plan}\n"
+    with _lock:
+        with open(_slow_log_path, "a", encoding="utf-8") as f:
+            f.write(entry)
+
+
+def snapshot() -> dict:
+    """statements ordered by total time, per-scope totals and the most recent scopes."""
+    with _lock:
+        statements = sorted(_statements.values(), key=lambda s: s.total_ms + s.fetch_ms, reverse=True)
+        return {
+            "slow_query_ms": _slow_ms,
+            "statements": [s.to_dict() for s in statements],
+            "scopes": {
+                name: {**t, "total_ms": round(t["total_ms"], 3)} for name, t in sorted(_scope_totals.items())
+            },
+            "recent_scopes": list(_recent_scopes),
+        }
+
+
+def dump(path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2, ensure_ascii=False)
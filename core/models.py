@@ -1,19 +1,71 @@
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
+    Integer,
     Numeric,
     String,
     Text,
+    cast,
     create_engine,
+    func,
+    type_coerce,
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy.types import TypeDecorator
+
+from app.config import BASE_CURRENCY, MONEY_STORAGE
+
+CENTS = Decimal("0.01")
+
+class Money(TypeDecorator):
+    """exact Decimal amount, stored as NUMERIC(15, 2) or as integer cents depending on MONEY_STORAGE."""
+    impl = Numeric(15, 2)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if MONEY_STORAGE == "cents":
+            return dialect.type_descriptor(Integer())
+        return dialect.type_descriptor(Numeric(15, 2))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or MONEY_STORAGE != "cents":
+            return value
+        return int((Decimal(str(value)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+    def process_result_value(self, value, dialect):
+        if value is None or MONEY_STORAGE != "cents":
+            return value
+        return (Decimal(int(value)) / 100).quantize(CENTS)
+
+def money_cents(column):
+    """SQL expression reading a Money column as integer cents, for either MONEY_STORAGE."""
+    if MONEY_STORAGE == "cents":
+        return cast(column, Integer)
+    return cast(func.round(column * 100), Integer)
+
+def money_scaled(column, factor):
+    """SQL expression: a Money value times factor (e.g. an exchange rate), rounded to the cent and read as Money."""
+    return type_coerce(func.round(column * factor, 0 if MONEY_STORAGE == "cents" else 2), Money)
+
+def scale_money(amount, factor) -> Decimal:
+    """money_scaled in Python: amount times factor, rounded half up to the cent."""
+    return (Decimal(str(amount)) * Decimal(str(factor))).quantize(CENTS, rounding=ROUND_HALF_UP)
 
 class Base(DeclarativeBase):
     pass
 
+class SchemaMeta(Base):
+    """key/value markers for one-shot data migrations."""
+    __tablename__ = "schema_meta"
+
+    key = Column(String(50), primary_key=True)
+    value = Column(String(100), nullable=False)
+
 class Category(Base):
     __tablename__ = "categories"
 
@@ -21,13 +73,14 @@ class Category(Base):
     name = Column(String(100), nullable=False, unique=True)
     color = Column(String(7), default="#6366f1")
     icon = Column(String(50), default="")
-    monthly_limit = Column(Numeric(15, 2), nullable=True) 
+    monthly_limit = Column(Money, nullable=True)
     is_system = Column(Boolean, default = False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     expenses = relationship("Expense", back_populates="category", cascade="all, delete-orphan")
     limits = relationship("CategoryLimit", back_populates="category", cascade="all, delete-orphan")
+    recurring = relationship("RecurringExpense", back_populates="category", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Category {self.name}>"
@@ -37,7 +90,7 @@ class CategoryLimit(Base):
 
     id = Column(String(36), primary_key=True)
     category_id = Column(String(36), ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
-    limit_value = Column(Numeric(15, 2), nullable=False)
+    limit_value = Column(Money, nullable=False)
     month = Column(String(7), nullable=False)  # YYYY-MM
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -48,13 +101,23 @@ class CategoryLimit(Base):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # date range filters ordered by (date desc, created_at desc)
+        Index("ix_expenses_date_created_at", "date", "created_at"),
+        # per-category scans within a period
+        Index("ix_expenses_category_id_date", "category_id", "date"),
+        # natural key of materialized occurrences: one expense per template and date
+        Index("ux_expenses_recurring_id_date", "recurring_id", "date", unique=True),
+    )
 
     id = Column(String(36), primary_key=True)
-    amount = Column(Numeric(15, 2), nullable=False)
+    amount = Column(Money, nullable=False)
     date = Column(DateTime, nullable=False)
     category_id = Column(String(36), ForeignKey("categories.id", ondelete="RESTRICT"), nullable=False)
     description = Column(Text, default="")
     source = Column(String(50), default="")
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY)
+    recurring_id = Column(String(36), ForeignKey("recurring_expenses.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -62,3 +125,55 @@ class Expense(Base):
 
     def __repr__(self):
         return f"<Expense {self.amount} {self.date.date()}>"
+
+class RecurringExpense(Base):
+    """template of a fixed cost; services.recurring_service turns its occurrences into expenses.
+
+    the schedule is a small RRULE subset: every `interval` days, weeks, months or years from
+    start_date, optionally stopping at `until` or after `count` occurrences.
+    """
+    __tablename__ = "recurring_expenses"
+
+    id = Column(String(36), primary_key=True)
+    amount = Column(Money, nullable=False)
+    category_id = Column(String(36), ForeignKey("categories.id", ondelete="CASCADE"), nullable=False)
+    description = Column(Text, default="")
+    source = Column(String(50), default="")
+    currency = Column(String(3), nullable=False, default=BASE_CURRENCY, server_default=BASE_CURRENCY)
+    frequency = Column(String(10), nullable=False)  # "daily", "weekly", "monthly" or "yearly"
+    interval = Column(Integer, nullable=False, default=1)
+    start_date = Column(DateTime, nullable=False)  # first occurrence; anchors the weekday / day of month
+    until = Column(DateTime, nullable=True)
+    count = Column(Integer, nullable=True)
+    materialized_until = Column(DateTime, nullable=True)  # last occurrence already turned into an expense
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    category = relationship("Category", back_populates="recurring")
+
+    def __repr__(self):
+        return f"<RecurringExpense {self.amount} {self.frequency}/{self.interval}>"
+
+class FxRate(Base):
+    """units of BASE_CURRENCY per unit of currency, from day until the currency's next rate."""
+    __tablename__ = "fx_rates"
+
+    currency = Column(String(3), primary_key=True)
+    day = Column(DateTime, primary_key=True)
+    rate = Column(Numeric(18, 8), nullable=False)
+
+    def __repr__(self):
+        return f"<FxRate {self.currency} {self.day.date()} {self.rate}>"
+
+class ExpenseMonthlyTotal(Base):
+    """per (month, category) rollup of expenses in BASE_CURRENCY, kept in sync by core.repository."""
+    __tablename__ = "expense_monthly_totals"
+
+    year_month = Column(String(7), primary_key=True)  # YYYY-MM
+    category_id = Column(String(36), ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Money, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ExpenseMonthlyTotal {self.year_month} category={self.category_id} total={self.total}>"
@@ -1,30 +1,176 @@
-"""Data access layer for expenses and categories."""
-from datetime import datetime
+"""Data access layer for expenses and categories.
+
+reads return the NamedTuple records below, built straight from Core select rows: they carry no
+session state, so services hand them out after the session closes. writes work on ORM instances
+loaded with session.get and return the record of what they wrote.
+"""
+from datetime import MAXYEAR, date, datetime, timedelta
 from decimal import Decimal
-from typing import Optional
+from typing import Iterator, NamedTuple, Optional
+import base64
+import json
+import re
 import uuid
 
-from sqlalchemy import func, select, desc
-from sqlalchemy.orm import Session, joinedload
-
-from core.models import Category, CategoryLimit, Expense
+from sqlalchemy import (
+    Integer,
+    and_,
+    case,
+    cast,
+    column,
+    delete,
+    desc,
+    exists,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.config import BASE_CURRENCY
+from core.models import (
+    Category,
+    CategoryLimit,
+    Expense,
+    ExpenseMonthlyTotal,
+    FxRate,
+    RecurringExpense,
+    money_cents,
+    money_scaled,
+    scale_money,
+)
 
 
 def _uuid():
     return str(uuid.uuid4())
 
+# ---------- Records ----------
+
+
+class CategoryRecord(NamedTuple):
+    id: str
+    name: str
+    color: str
+    icon: str
+    monthly_limit: Optional[Decimal]
+    is_system: bool
+
+
+class CategoryLimitRecord(NamedTuple):
+    category_id: str
+    month: str  # YYYY-MM
+    limit_value: Decimal
+
+
+class ExpenseRecord(NamedTuple):
+    id: str
+    date: datetime
+    amount: Decimal  # in currency
+    currency: str
+    category_id: str
+    category_name: str
+    description: str
+    source: str
+    recurring_id: Optional[str]
+    created_at: Optional[datetime]
+
+
+class RecurringExpenseRecord(NamedTuple):
+    id: str
+    amount: Decimal
+    currency: str
+    category_id: str
+    category_name: str
+    description: str
+    source: str
+    frequency: str
+    interval: int
+    start_date: datetime
+    until: Optional[datetime]
+    count: Optional[int]
+    materialized_until: Optional[datetime]
+    active: bool
+
+
+class FxRateRecord(NamedTuple):
+    currency: str
+    day: datetime
+    rate: Decimal
+
+
+def _records(session: Session, record: type, stmt) -> list:
+    # Core execution on the session's connection, like iter_ledger_rows: no ORM row processing
+    return list(map(record._make, session.connection().execute(stmt)))
+
+
+def _record(session: Session, record: type, stmt):
+    row = session.connection().execute(stmt.limit(1)).first()
+    return None if row is None else record._make(row)
+
+
+def _category_select():
+    return select(
+        Category.id,
+        Category.name,
+        func.coalesce(Category.color, "#6366f1"),
+        func.coalesce(Category.icon, ""),
+        Category.monthly_limit,
+        func.coalesce(Category.is_system, False),
+    )
+
+
+def _expense_select():
+    return select(
+        Expense.id,
+        Expense.date,
+        Expense.amount,
+        Expense.currency,
+        Expense.category_id,
+        func.coalesce(Category.name, ""),
+        func.coalesce(Expense.description, ""),
+        func.coalesce(Expense.source, ""),
+        Expense.recurring_id,
+        Expense.created_at,
+    ).outerjoin(Category, Category.id == Expense.category_id)
+
+
+def _recurring_select():
+    return select(
+        RecurringExpense.id,
+        RecurringExpense.amount,
+        RecurringExpense.currency,
+        RecurringExpense.category_id,
+        func.coalesce(Category.name, ""),
+        func.coalesce(RecurringExpense.description, ""),
+        func.coalesce(RecurringExpense.source, ""),
+        RecurringExpense.frequency,
+        RecurringExpense.interval,
+        RecurringExpense.start_date,
+        RecurringExpense.until,
+        RecurringExpense.count,
+        RecurringExpense.materialized_until,
+        RecurringExpense.active,
+    ).outerjoin(Category, Category.id == RecurringExpense.category_id)
+
 # ---------- Categories and limits ----------
 
-def get_all_categories(session: Session) -> list[Category]:
-    return session.query(Category).order_by(Category.name).all()
+def get_all_categories(session: Session) -> list[CategoryRecord]:
+    return _records(session, CategoryRecord, _category_select().order_by(Category.name))
 
 
-def get_category_by_id(session: Session, category_id: str) -> Optional[Category]:
-    return session.query(Category).filter(Category.id == category_id).first()
+def get_category_by_id(session: Session, category_id: str) -> Optional[CategoryRecord]:
+    return _record(session, CategoryRecord, _category_select().where(Category.id == category_id))
 
 
-def get_category_by_name(session: Session, name: str) -> Optional[Category]:
-    return session.query(Category).filter(Category.name == name).first()
+def get_category_by_name(session: Session, name: str) -> Optional[CategoryRecord]:
+    return _record(session, CategoryRecord, _category_select().where(Category.name == name))
 
 
 def create_category(
@@ -33,7 +179,7 @@ def create_category(
     color: str = "#6366f1",
     icon: str = "",
     monthly_limit: Optional[Decimal] = None,
-) -> Category:
+) -> CategoryRecord:
     cat = Category(
         id=_uuid(),
         name=name.strip(),
@@ -44,7 +190,7 @@ def create_category(
     )
     session.add(cat)
     session.flush()
-    return cat
+    return get_category_by_id(session, cat.id)
 
 def update_category(
     session: Session,
@@ -52,8 +198,8 @@ def update_category(
     name: Optional[str] = None,
     color: Optional[str] = None,
     monthly_limit: Optional[Decimal] = None,
-) -> Optional[Category]:
-    cat = get_category_by_id(session, category_id)
+) -> Optional[CategoryRecord]:
+    cat = session.get(Category, category_id)
     if not cat:
         return None
     if name is not None:
@@ -62,20 +208,23 @@ def update_category(
         cat.color = color # type: ignore
     if monthly_limit is not None:
         cat.monthly_limit = monthly_limit # type: ignore
-    return cat
+    session.flush()
+    return get_category_by_id(session, category_id)
 
 
 def delete_category(session: Session, category_id: str) -> bool:
-    cat = get_category_by_id(session, category_id)
+    cat = session.get(Category, category_id)
     if not cat or cat.is_system:
         return False
     session.delete(cat)
+    # the ORM cascade removes the expenses one by one, the rollup rows go in one statement
+    session.execute(delete(ExpenseMonthlyTotal).where(ExpenseMonthlyTotal.category_id == category_id))
     return True
 
 
 def set_category_limit_for_month(
     session: Session, category_id: str, year_month: str, limit_value: Decimal
-) -> CategoryLimit:
+) -> CategoryLimitRecord:
     """set or update spending limit for a category in a given month (YYYY-MM)."""
     existing = (
         session.query(CategoryLimit)
@@ -87,31 +236,232 @@ def set_category_limit_for_month(
     )
     if existing:
         existing.limit_value = limit_value
-        return existing
-    limit = CategoryLimit(
-        id=_uuid(),
-        category_id=category_id,
-        month=year_month,
-        limit_value=limit_value,
-    )
-    session.add(limit)
-    session.flush()
-    return limit
+    else:
+        session.add(CategoryLimit(
+            id=_uuid(),
+            category_id=category_id,
+            month=year_month,
+            limit_value=limit_value,
+        ))
+    return CategoryLimitRecord(category_id, year_month, limit_value)
 
 
 def get_category_limit_for_month(
     session: Session, category_id: str, year_month: str
-) -> Optional[CategoryLimit]:
-    return (
-        session.query(CategoryLimit)
-        .filter(
-            CategoryLimit.category_id == category_id,
-            CategoryLimit.month == year_month,
+) -> Optional[CategoryLimitRecord]:
+    stmt = select(CategoryLimit.category_id, CategoryLimit.month, CategoryLimit.limit_value).where(
+        CategoryLimit.category_id == category_id,
+        CategoryLimit.month == year_month,
+    )
+    return _record(session, CategoryLimitRecord, stmt)
+
+
+BudgetRow = tuple[str, str, Optional[Decimal], Decimal] # (category_id, category_name, effective limit, spent)
+def get_budget_rows(session: Session, year_month: str) -> list[BudgetRow]:
+    """every category with its limit for the month and what was spent in it, in one query.
+
+    the effective limit is the month's CategoryLimit, else Category.monthly_limit (None: no limit).
+    spending comes from the monthly rollup.
+    """
+    stmt = (
+        select(
+            Category.id,
+            Category.name,
+            func.coalesce(CategoryLimit.limit_value, Category.monthly_limit),
+            func.coalesce(ExpenseMonthlyTotal.total, 0),
         )
-        .first()
+        .outerjoin(CategoryLimit, and_(CategoryLimit.category_id == Category.id, CategoryLimit.month == year_month))
+        .outerjoin(
+            ExpenseMonthlyTotal,
+            and_(ExpenseMonthlyTotal.category_id == Category.id, ExpenseMonthlyTotal.year_month == year_month),
+        )
+        .order_by(Category.name)
+    )
+    return [(cid, name, limit, Decimal(str(spent))) for cid, name, limit, spent in session.execute(stmt)]
+
+
+# ---------- Exchange rates ----------
+
+
+def _rate_as_of(currency, day):
+    """SQL scalar: the currency's latest rate not after day; before its first rate, the first one."""
+    latest = (
+        select(FxRate.rate)
+        .where(FxRate.currency == currency, FxRate.day <= day)
+        .order_by(FxRate.day.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    first = select(FxRate.rate).where(FxRate.currency == currency).order_by(FxRate.day).limit(1).scalar_subquery()
+    return func.coalesce(latest, first)
+
+
+def base_amount():
+    """SQL expression: Expense.amount converted to BASE_CURRENCY.
+
+    aggregates sum it in the same pass that reads the rows. expenses already in BASE_CURRENCY
+    never evaluate the rate subquery; the others cost one seek on the fx_rates primary key.
+    """
+    return case(
+        (Expense.currency == BASE_CURRENCY, Expense.amount),
+        else_=money_scaled(Expense.amount, _rate_as_of(Expense.currency, Expense.date)),
+    )
+
+
+def get_fx_rate(session: Session, currency: str, day: datetime) -> Optional[Decimal]:
+    """the rate base_amount() applies to an expense in currency on day; None when the currency has none."""
+    if currency == BASE_CURRENCY:
+        return Decimal("1")
+    value = session.execute(select(_rate_as_of(currency, day))).scalar()
+    return None if value is None else Decimal(str(value))
+
+
+def get_fx_rates(session: Session, currency: Optional[str] = None) -> list[FxRateRecord]:
+    stmt = select(FxRate.currency, FxRate.day, FxRate.rate)
+    if currency:
+        stmt = stmt.where(FxRate.currency == currency)
+    return _records(session, FxRateRecord, stmt.order_by(FxRate.currency, FxRate.day.desc()))
+
+
+def set_fx_rate(session: Session, currency: str, day: datetime, rate: Decimal):
+    session.execute(
+        sqlite_insert(FxRate)
+        .values(currency=currency, day=day, rate=rate)
+        .on_conflict_do_update(index_elements=[FxRate.currency, FxRate.day], set_={"rate": rate})
+    )
+
+
+def delete_fx_rate(session: Session, currency: str, day: datetime) -> bool:
+    result = session.execute(delete(FxRate).where(FxRate.currency == currency, FxRate.day == day))
+    return result.rowcount > 0
+
+
+def currency_in_use(session: Session, currency: str) -> bool:
+    """whether any expense or recurring template is in currency, i.e. whether it still needs a rate."""
+    stmt = select(or_(
+        exists().where(Expense.currency == currency),
+        exists().where(RecurringExpense.currency == currency),
+    ))
+    return bool(session.execute(stmt).scalar())
+
+
+def _to_base(session: Session, amount: Decimal, currency: str, day: datetime, rates: Optional[dict] = None) -> Decimal:
+    """amount in BASE_CURRENCY, as base_amount() computes it; rates memoizes lookups across a batch."""
+    if currency == BASE_CURRENCY:
+        return amount
+    key = (currency, day.date())
+    rate = rates.get(key) if rates is not None else None
+    if rate is None:
+        rate = get_fx_rate(session, currency, day)
+        if rate is None:
+            raise ValueError(f"sem cotação de {currency} para {BASE_CURRENCY}")
+        if rates is not None:
+            rates[key] = rate
+    return scale_money(amount, rate)
+
+
+# ---------- Monthly rollup ----------
+
+
+def _year_month(dt: datetime) -> str:
+    # zero-padded like SQLite's strftime('%Y-%m'): Python's %Y leaves years before 1000 short
+    return f"{dt.year:04d}-{dt.month:02d}"
+
+
+def _monthly_total_upsert():
+    stmt = sqlite_insert(ExpenseMonthlyTotal)
+    return stmt.on_conflict_do_update(
+        index_elements=[ExpenseMonthlyTotal.year_month, ExpenseMonthlyTotal.category_id],
+        set_={
+            # rounded so "decimal" storage does not accumulate float drift (a no-op for cents)
+            "total": func.round(ExpenseMonthlyTotal.total + stmt.excluded.total, 2),
+            "count": ExpenseMonthlyTotal.count + stmt.excluded.count,
+        },
     )
 
 
+def _bump_monthly_total(session: Session, year_month: str, category_id: str, amount: Decimal, count: int):
+    """add amount/count to the (year_month, category_id) rollup row, creating it if needed."""
+    session.execute(
+        _monthly_total_upsert(),
+        {"year_month": year_month, "category_id": category_id, "total": amount, "count": count},
+    )
+    if count < 0:
+        session.execute(
+            delete(ExpenseMonthlyTotal).where(
+                ExpenseMonthlyTotal.year_month == year_month,
+                ExpenseMonthlyTotal.category_id == category_id,
+                ExpenseMonthlyTotal.count <= 0,
+            )
+        )
+
+
+def rebuild_monthly_totals(session: Session):
+    """recompute the whole rollup from the expenses table, e.g. after exchange rates changed."""
+    ym = func.strftime("%Y-%m", Expense.date)
+    session.execute(delete(ExpenseMonthlyTotal))
+    session.execute(
+        insert(ExpenseMonthlyTotal).from_select(
+            ["year_month", "category_id", "total", "count"],
+            select(ym, Expense.category_id, func.round(func.sum(base_amount()), 2), func.count())
+            .group_by(ym, Expense.category_id),
+        )
+    )
+
+
+def _next_month(dt: datetime) -> datetime:
+    """first instant of the month after dt's; datetime.max after December 9999, which has no successor."""
+    if dt.month == 12:
+        return datetime(dt.year + 1, 1, 1) if dt.year < MAXYEAR else datetime.max
+    return datetime(dt.year, dt.month + 1, 1)
+
+
+def _rollup_plan(date_from: datetime, date_to: datetime):
+    """split [date_from, date_to] into whole months read from the rollup and edge ranges scanned from expenses.
+
+    returns ((first_ym, last_ym) or None, [conditions on Expense.date])
+    """
+    month_from = datetime(date_from.year, date_from.month, 1)
+    first = month_from if date_from == month_from else _next_month(month_from)
+    end = datetime(date_to.year, date_to.month, 1)
+    if date_to >= _next_month(end) - timedelta(microseconds=1):
+        end = _next_month(end)
+
+    if first >= end:
+        return None, [and_(Expense.date >= date_from, Expense.date <= date_to)]
+
+    edges = []
+    if date_from < first:
+        edges.append(and_(Expense.date >= date_from, Expense.date < first))
+    if end <= date_to and end != datetime.max:  # datetime.max: December 9999 is already a whole month
+        edges.append(and_(Expense.date >= end, Expense.date <= date_to))
+    last = end - timedelta(days=1)
+    return (_year_month(first), _year_month(last)), edges
+
+
+def _period_amounts(date_from: datetime, date_to: datetime):
+    """(year_month, category_id, total) rows covering the period: rollup months plus scanned edges."""
+    months, edges = _rollup_plan(date_from, date_to)
+    parts = []
+    if months:
+        parts.append(
+            select(
+                ExpenseMonthlyTotal.year_month.label("ym"),
+                ExpenseMonthlyTotal.category_id.label("category_id"),
+                ExpenseMonthlyTotal.total.label("total"),
+            ).where(ExpenseMonthlyTotal.year_month.between(*months))
+        )
+    for cond in edges:
+        parts.append(
+            select(
+                func.strftime("%Y-%m", Expense.date).label("ym"),
+                Expense.category_id.label("category_id"),
+                base_amount().label("total"),
+            ).where(cond)
+        )
+    return union_all(*parts).subquery()
+
+
 # ---------- Expenses ----------
 
 
@@ -122,7 +472,8 @@ def create_expense(
     category_id: str,
     description: str = "",
     source: str = "",
-) -> Expense:
+    currency: str = BASE_CURRENCY,
+) -> ExpenseRecord:
     exp = Expense(
         id=_uuid(),
         amount=amount,
@@ -130,14 +481,151 @@ def create_expense(
         category_id=category_id,
         description=description.strip(),
         source=source.strip(),
+        currency=currency,
     )
     session.add(exp)
     session.flush()
-    return exp
+    _bump_monthly_total(session, _year_month(date), category_id, _to_base(session, amount, currency, date), 1)
+    return get_expense_by_id(session, exp.id)
+
+
+def bulk_insert_expenses(session: Session, rows: list[dict]) -> int:
+    """insert many expenses in one executemany and fold them into the monthly rollup.
+
+    rows hold Expense column values (amount, date, category_id, description, source, currency);
+    id, timestamps and currency (BASE_CURRENCY) are filled in when missing.
+    """
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    deltas: dict[tuple[str, str], list] = {}
+    rates: dict = {}
+    for row in rows:
+        row.setdefault("id", _uuid())
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+        currency = row.setdefault("currency", BASE_CURRENCY)
+        delta = deltas.setdefault((_year_month(row["date"]), row["category_id"]), [Decimal("0"), 0])
+        delta[0] += _to_base(session, row["amount"], currency, row["date"], rates)
+        delta[1] += 1
+
+    session.execute(insert(Expense.__table__), rows)
+    session.execute(
+        _monthly_total_upsert(),
+        [
+            {"year_month": ym, "category_id": cid, "total": total, "count": count}
+            for (ym, cid), (total, count) in deltas.items()
+        ],
+    )
+    return len(rows)
+
+
+def create_recurring_expense(
+    session: Session,
+    amount: Decimal,
+    category_id: str,
+    start_date: datetime,
+    frequency: str,
+    interval: int = 1,
+    description: str = "",
+    source: str = "",
+    until: Optional[datetime] = None,
+    count: Optional[int] = None,
+    currency: str = BASE_CURRENCY,
+) -> RecurringExpenseRecord:
+    rec = RecurringExpense(
+        id=_uuid(),
+        amount=amount,
+        currency=currency,
+        category_id=category_id,
+        description=description.strip(),
+        source=source.strip(),
+        frequency=frequency,
+        interval=interval,
+        start_date=start_date,
+        until=until,
+        count=count,
+        active=True,
+    )
+    session.add(rec)
+    session.flush()
+    return get_recurring_expense_by_id(session, rec.id)
+
+
+def get_recurring_expenses(session: Session, active_only: bool = False) -> list[RecurringExpenseRecord]:
+    stmt = _recurring_select()
+    if active_only:
+        stmt = stmt.where(RecurringExpense.active.is_(True))
+    return _records(session, RecurringExpenseRecord, stmt.order_by(RecurringExpense.start_date, RecurringExpense.id))
+
+
+def get_recurring_expense_by_id(session: Session, recurring_id: str) -> Optional[RecurringExpenseRecord]:
+    return _record(session, RecurringExpenseRecord, _recurring_select().where(RecurringExpense.id == recurring_id))
+
+
+def set_recurring_expense_active(session: Session, recurring_id: str, active: bool, resume_after: datetime) -> bool:
+    """pause or resume a template; resuming moves materialized_until up to resume_after, skipping the paused span."""
+    rec = session.get(RecurringExpense, recurring_id)
+    if rec is None:
+        return False
+    rec.active = active
+    if active:
+        rec.materialized_until = max(rec.materialized_until or resume_after, resume_after)
+    return True
+
 
+def get_due_recurring_expenses(session: Session, through: datetime) -> list[RecurringExpense]:
+    """active templates that may have occurrences not yet materialized on or before through.
+
+    ORM instances, unlike the other reads: the materializer moves their materialized_until in place.
+    """
+    return (
+        session.query(RecurringExpense)
+        .filter(
+            RecurringExpense.active.is_(True),
+            RecurringExpense.start_date <= through,
+            (RecurringExpense.materialized_until.is_(None)) | (RecurringExpense.materialized_until < through),
+        )
+        .all()
+    )
 
-def get_expense_by_id(session: Session, expense_id: str) -> Optional[Expense]:
-    return session.query(Expense).filter(Expense.id == expense_id).first()
+
+def delete_recurring_expense(session: Session, recurring_id: str) -> bool:
+    """remove a template; the expenses it already produced stay, no longer linked to it."""
+    rec = session.get(RecurringExpense, recurring_id)
+    if not rec:
+        return False
+    session.execute(
+        update(Expense).where(Expense.recurring_id == recurring_id).values(recurring_id=None)
+    )
+    session.delete(rec)
+    return True
+
+
+def insert_recurring_occurrences(session: Session, rows: list[dict]) -> list[dict]:
+    """bulk insert materialized occurrences, skipping any (recurring_id, date) already stored.
+
+    the natural key makes materializing idempotent: a run interrupted before it moved the
+    templates' materialized_until, or two runs racing, never duplicate an expense. returns
+    the rows actually inserted.
+    """
+    if not rows:
+        return []
+    existing = set(
+        session.execute(
+            select(Expense.recurring_id, Expense.date).where(
+                Expense.recurring_id.in_({r["recurring_id"] for r in rows}),
+                Expense.date.between(min(r["date"] for r in rows), max(r["date"] for r in rows)),
+            )
+        ).tuples()
+    )
+    fresh = [r for r in rows if (r["recurring_id"], r["date"]) not in existing]
+    bulk_insert_expenses(session, fresh)
+    return fresh
+
+
+def get_expense_by_id(session: Session, expense_id: str) -> Optional[ExpenseRecord]:
+    return _record(session, ExpenseRecord, _expense_select().where(Expense.id == expense_id))
 
 def get_expenses(
     session: Session,
@@ -148,32 +636,202 @@ def get_expenses(
     max_amount: Optional[Decimal] = None,
     source: Optional[str] = None,
     limit: Optional[int] = None,
-) -> list[Expense]:
-    q = session.query(Expense).options(joinedload(Expense.category)).order_by(Expense.date.desc(), Expense.created_at.desc())
+) -> list[ExpenseRecord]:
+    stmt = (
+        _expense_select()
+        .where(*_expense_filters(date_from, date_to, category_id, min_amount, max_amount, source))
+        .order_by(Expense.date.desc(), Expense.created_at.desc())
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    return _records(session, ExpenseRecord, stmt)
+
+# FTS5 index created by core.database (not an ORM model)
+expenses_fts = table("expenses_fts", column("rowid", Integer))
+_fts_match = literal_column("expenses_fts").op("MATCH")
+_expense_rowid = literal_column("expenses.rowid")
+
+
+def fts_query(text: str) -> str:
+    """turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def _expense_filters(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    min_amount: Optional[Decimal] = None,
+    max_amount: Optional[Decimal] = None,
+    source: Optional[str] = None,
+    search: Optional[str] = None,
+) -> list:
+    conditions = []
     if date_from:
-        q = q.filter(Expense.date >= date_from)
+        conditions.append(Expense.date >= date_from)
     if date_to:
-        q = q.filter(Expense.date <= date_to)
+        conditions.append(Expense.date <= date_to)
     if category_id:
-        q = q.filter(Expense.category_id == category_id)
+        conditions.append(Expense.category_id == category_id)
     if min_amount is not None:
-        q = q.filter(Expense.amount >= min_amount)
+        conditions.append(Expense.amount >= min_amount)
     if max_amount is not None:
-        q = q.filter(Expense.amount <= max_amount)
+        conditions.append(Expense.amount <= max_amount)
     if source:
-        q = q.filter(Expense.source.ilike(f"%{source}%"))
-    if limit:
-        q = q.limit(limit)
-    return q.all()
+        conditions.append(Expense.source.ilike(f"%{source}%"))
+    if search and fts_query(search):
+        matches = select(expenses_fts.c.rowid).where(_fts_match(fts_query(search)))
+        conditions.append(_expense_rowid.in_(matches))
+    return conditions
+
+
+def search_expenses(
+    session: Session,
+    query: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    limit: int = 100,
+) -> list[ExpenseRecord]:
+    """full-text search over description and source, best matches (bm25) first."""
+    match = fts_query(query)
+    if not match:
+        return []
+    stmt = (
+        _expense_select()
+        .join(expenses_fts, expenses_fts.c.rowid == _expense_rowid)
+        .where(_fts_match(match), *_expense_filters(date_from, date_to, category_id))
+        .order_by(func.bm25(literal_column("expenses_fts")), desc(Expense.date))
+        .limit(limit)
+    )
+    return _records(session, ExpenseRecord, stmt)
+
+# (date, amount, currency, amount in BASE_CURRENCY, category_name, description, source)
+ExportRow = tuple[datetime, Decimal, str, Decimal, str, str, str]
+def iter_export_rows(
+    session: Session,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Iterator[ExportRow]:
+    """stream the exported columns in listing order, batch_size rows in memory at a time."""
+    stmt = export_rows_query(date_from, date_to, category_id).execution_options(yield_per=batch_size)
+    for row in session.execute(stmt):
+        yield row.tuple()
+
+def export_rows_query(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+):
+    """the select behind iter_export_rows, for callers that stream it themselves (AsyncSession.stream)."""
+    return (
+        select(
+            Expense.date, Expense.amount, Expense.currency, base_amount(),
+            Category.name, Expense.description, Expense.source,
+        )
+        .outerjoin(Category, Category.id == Expense.category_id)
+        .where(*_expense_filters(date_from, date_to, category_id))
+        .order_by(desc(Expense.date), desc(Expense.created_at))
+    )
+
+# date.toordinal() computed by SQLite: julianday("0001-01-01") is 1721425.5 and that day is ordinal 1
+_DAY_ORDINAL = cast(func.julianday(func.date(Expense.date)) - 1721424.5, Integer)
+
+LedgerRow = tuple[int, int, int] # (index into category_ids, day ordinal, BASE_CURRENCY amount in cents)
+def iter_ledger_rows(session: Session, category_ids: list[str], batch_size: int = 100_000) -> Iterator[list[LedgerRow]]:
+    """every expense as plain integers, in table order, batch_size rows per list.
 
-def get_expenses_new(session: Session, **filters) -> list[Expense]:
-    stmt = select(Expense).order_by(desc(Expense.date), desc(Expense.created_at))
+    built for columnar loading: one sequential scan, and no datetime, Decimal or category id
+    string is created per row. expenses of categories missing from category_ids get index -1.
+    """
+    cat_index = case({cid: i for i, cid in enumerate(category_ids)}, value=Expense.category_id, else_=-1)
+    stmt = select(cat_index, _DAY_ORDINAL, money_cents(base_amount())).execution_options(yield_per=batch_size)
+    # Core execution on the session's connection: skips the ORM row processing, ~3x faster here
+    for partition in session.connection().execute(stmt).tuples().partitions():
+        yield partition
+
+def get_expense_summary(
+    session: Session,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    search: Optional[str] = None,
+) -> tuple[int, Decimal]:
+    """(count, total in BASE_CURRENCY) of the expenses matching the filters."""
+    q = session.query(func.count(Expense.id), func.coalesce(func.sum(base_amount()), 0))
+    q = q.filter(*_expense_filters(date_from, date_to, category_id, search=search))
+    count, total = q.one()
+    return count, Decimal(str(total))
+
+class ExpensePage(NamedTuple):
+    rows: list[ExpenseRecord]
+    next_cursor: Optional[str]  # None on the last page
+
+
+def _encode_cursor(exp: ExpenseRecord) -> str:
+    key = [exp.date.isoformat(), exp.created_at.isoformat(), exp.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, datetime, str]:
+    try:
+        d, created, expense_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(d), datetime.fromisoformat(created), str(expense_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid expense cursor: {cursor!r}") from e
+
+
+def get_expenses_page(
+    session: Session,
+    cursor: Optional[str] = None,
+    page_size: int = 200,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    min_amount: Optional[Decimal] = None,
+    max_amount: Optional[Decimal] = None,
+    source: Optional[str] = None,
+    search: Optional[str] = None,
+) -> ExpensePage:
+    """one page in (date desc, created_at desc, id desc) order, continuing after cursor.
+
+    keyset pagination: the cursor holds the sort key of the last row returned, so every page
+    is an index range seek instead of an OFFSET scan over the rows already seen.
+    """
+    stmt = (
+        _expense_select()
+        .where(*_expense_filters(date_from, date_to, category_id, min_amount, max_amount, source, search))
+        .order_by(desc(Expense.date), desc(Expense.created_at), desc(Expense.id))
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(Expense.date, Expense.created_at, Expense.id) < tuple_(*_decode_cursor(cursor)))
 
-    if filters.get("date_from"):
-        stmt.where(Expense.date >= filters["date_from"])
+    rows = _records(session, ExpenseRecord, stmt.limit(page_size + 1))
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return ExpensePage(rows, _encode_cursor(rows[-1]))
+    return ExpensePage(rows, None)
 
-    if filters.get("date_to"):
-        stmt.where(Expense.date <= filters["date_to"])
+def expense_matches(
+    session: Session,
+    expense_id: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    min_amount: Optional[Decimal] = None,
+    max_amount: Optional[Decimal] = None,
+    source: Optional[str] = None,
+    search: Optional[str] = None,
+) -> bool:
+    """whether the expense passes the same filters as get_expenses_page; a primary key lookup."""
+    stmt = select(Expense.id).where(
+        Expense.id == expense_id,
+        *_expense_filters(date_from, date_to, category_id, min_amount, max_amount, source, search),
+    )
+    return session.execute(stmt).first() is not None
 
 def update_expense(
     session: Session,
@@ -183,10 +841,12 @@ def update_expense(
     category_id: Optional[str] = None,
     description: Optional[str] = None,
     source: Optional[str] = None,
-) -> Optional[Expense]:
-    exp = get_expense_by_id(session, expense_id)
+    currency: Optional[str] = None,
+) -> Optional[ExpenseRecord]:
+    exp = session.get(Expense, expense_id)
     if not exp:
         return None
+    old_key = (_year_month(exp.date), exp.category_id, _to_base(session, exp.amount, exp.currency, exp.date))
     if amount is not None:
         exp.amount = amount if not None else exp.amount # type: ignore
     if date is not None:
@@ -197,31 +857,48 @@ def update_expense(
         exp.description = description # type: ignore
     if source is not None:
         exp.source = source # type: ignore
-    return exp
+    if currency is not None:
+        exp.currency = currency # type: ignore
+    new_key = (_year_month(exp.date), exp.category_id, _to_base(session, exp.amount, exp.currency, exp.date))
+    if new_key != old_key:
+        _bump_monthly_total(session, old_key[0], old_key[1], -old_key[2], -1)
+        _bump_monthly_total(session, new_key[0], new_key[1], new_key[2], 1)
+    session.flush()
+    return get_expense_by_id(session, expense_id)
 
 
 def delete_expense(session: Session, expense_id: str) -> bool:
-    exp = get_expense_by_id(session, expense_id)
+    exp = session.get(Expense, expense_id)
     if exp is None:
         return False
+    base = _to_base(session, exp.amount, exp.currency, exp.date)
+    _bump_monthly_total(session, _year_month(exp.date), exp.category_id, -base, -1)
     session.delete(exp)
     return True
 
 CategoryTotal = list[tuple[str, str, Decimal]] # (category_id, category_name, total)
 def get_total_by_category_in_period(session: Session, date_from: datetime, date_to: datetime) -> CategoryTotal:
+    amounts = _period_amounts(date_from, date_to)
     q = (
-        session.query(Category.id, Category.name, func.sum(Expense.amount).label("total"))
-        .join(Expense, Expense.category_id == Category.id)
-        .filter(Expense.date >= date_from, Expense.date <= date_to)
+        session.query(Category.id, Category.name, func.sum(amounts.c.total).label("total"))
+        .join(amounts, amounts.c.category_id == Category.id)
         .group_by(Category.id, Category.name)
     )
     return [(r.id, r.name, r.total or Decimal("0")) for r in q.all()]
 
-MonthlyTotal = list[tuple[str, Decimal]] # (year_month, total) for last x months
-def get_monthly_totals(session: Session, months_back: int = 12) -> MonthlyTotal:
-    from datetime import date
+CategoryBreakdown = list[tuple[str, str, str, Decimal]] # (category_id, category_name, color, total)
+def get_category_breakdown_in_period(session: Session, date_from: datetime, date_to: datetime) -> CategoryBreakdown:
+    amounts = _period_amounts(date_from, date_to)
+    q = (
+        session.query(Category.id, Category.name, Category.color, func.sum(amounts.c.total).label("total"))
+        .join(amounts, amounts.c.category_id == Category.id)
+        .group_by(Category.id, Category.name, Category.color)
+    )
+    return [(r.id, r.name, r.color, r.total or Decimal("0")) for r in q.all()]
 
-    end = date.today()
+MonthlyTotal = list[tuple[str, Decimal]] # (year_month, total) for last x months
+def get_monthly_totals(session: Session, months_back: int = 12, end: Optional[date] = None) -> MonthlyTotal:
+    end = end or date.today()
     year, month = end.year, end.month
     month -= months_back
     while month <= 0:
@@ -231,22 +908,17 @@ def get_monthly_totals(session: Session, months_back: int = 12) -> MonthlyTotal:
     start_dt = datetime.combine(start, datetime.min.time())
     end_dt = datetime.combine(end, datetime.max.time())
 
+    amounts = _period_amounts(start_dt, end_dt)
     subq = (
-        session.query(
-            func.strftime("%Y-%m", Expense.date).label("ym"),
-            func.sum(Expense.amount).label("total"),
-        )
-        .filter(Expense.date >= start_dt, Expense.date <= end_dt)
-        .group_by(func.strftime("%Y-%m", Expense.date))
+        session.query(amounts.c.ym, func.sum(amounts.c.total).label("total"))
+        .group_by(amounts.c.ym)
+        .order_by(amounts.c.ym)
     )
     rows = subq.all()
     return [(r.ym, r.total or Decimal("0")) for r in rows]
 
 
 def get_total_spent_in_period(session: Session, date_from: datetime, date_to: datetime) -> Decimal:
-    result = (
-        session.query(func.coalesce(func.sum(Expense.amount), 0))
-        .filter(Expense.date >= date_from, Expense.date <= date_to)
-        .scalar()
-    )
+    amounts = _period_amounts(date_from, date_to)
+    result = session.query(func.coalesce(func.sum(amounts.c.total), 0)).scalar()
     return Decimal(str(result))
@@ -1,31 +1,76 @@
+import argparse
 import sys
 
+from app.startup import profile
 
-from PyQt6.QtWidgets import QApplication, QStyle
-from PyQt6.QtCore import Qt
+def main():
+    parser = argparse.ArgumentParser(prog="expense-tracker")
+    parser.add_argument("--rebuild-totals", action="store_true",
+                        help="recompute the monthly totals table from all expenses and exit")
+    parser.add_argument("--query-stats", metavar="FILE",
+                        help="record SQL timings and per-refresh query counts, written to FILE on exit")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print the time spent in each import and construction phase")
+    args, qt_args = parser.parse_known_args()
 
-from app.config import APP_NAME
-from core.database import init_db
-from ui.main_window import MainWindow
+    if args.startup_profile:
+        profile.enable()
 
-def main():
-    init_db()
+    # heavy imports happen here, not at module level, so the profile can time them
+    with profile.phase("import app.config"):
+        from app.config import APP_NAME, ensure_dirs
+    with profile.phase("import core (SQLAlchemy)"):
+        from core import instrumentation
+        from core.database import init_db, dispose_engines
+
+    if args.query_stats:
+        instrumentation.enable()
+
+    ensure_dirs()
+    with profile.phase("init_db"):
+        init_db()
+    if args.rebuild_totals:
+        from services.expense_service import rebuild_monthly_totals
+        rebuild_monthly_totals()
+        print("monthly totals rebuilt")
+        return
+    with profile.phase("recurring expenses"):
+        from services.recurring_service import materialize_due
+        skipped = []
+        materialize_due(skipped=skipped)  # catch up on rent, subscriptions... due since the last run
+        for name in skipped:
+            print(f"recurring expense {name!r} skipped: no exchange rate for its currency", file=sys.stderr)
+
+    with profile.phase("import PyQt6"):
+        from PyQt6.QtWidgets import QApplication, QStyle
+        from PyQt6.QtCore import Qt, QTimer
+    with profile.phase("import ui"):
+        from ui.main_window import MainWindow
 
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
     )
     
-    app = QApplication(sys.argv)
+    with profile.phase("QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
 
     # app.setWindowIcon(app.style().standardIcon(getattr(QStyle.StandardPixmap, "SP_ComputerIcon")))
     app.setApplicationName(APP_NAME)
     app.setStyle("Fusion")
 
-    win = MainWindow()
-    win.show()
-    
-    sys.exit(app.exec())
+    with profile.phase("MainWindow"):
+        win = MainWindow()
+    with profile.phase("show"):
+        win.show()
+    QTimer.singleShot(0, lambda: profile.mark("event loop running"))
 
+    code = app.exec()
+    from services import aio
+    aio.shutdown()  # a no-op unless an asyncio service was used
+    dispose_engines()
+    if args.query_stats:
+        instrumentation.dump(args.query_stats)
+    sys.exit(code)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,92 @@
+"""Headless batch reports: CSV and PDF files for many periods and categories at once.
+
+    python report.py --period 2025-11 2025-12 --category "*" --out relatorios
+
+writes one file per format, period and category from a single snapshot of the database,
+rendered in a process pool (see services.report_service).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from services.export_service import PDF_WORKERS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python report.py")
+    parser.add_argument("--period", nargs="+", required=True, metavar="PERIOD",
+                        help="AAAA, AAAA-MM or AAAA-MM-DD:AAAA-MM-DD; one report set per period")
+    parser.add_argument("--category", action="append", default=[], metavar="NAME",
+                        help='category name or id, repeatable; "*" for one report per category, '
+                             '"todas" for all categories in one report (the default)')
+    parser.add_argument("--format", nargs="+", choices=("csv", "pdf"), default=["csv", "pdf"])
+    parser.add_argument("--out", help="output directory (default: a new folder in the exports directory)")
+    parser.add_argument("--workers", type=int, default=PDF_WORKERS, help="processes rendering reports")
+    parser.add_argument("--db", help="database file (default: the application database)")
+    args = parser.parse_args(argv)
+
+    from app.config import EXPORTS_DIR, ensure_dirs
+    from core.database import dispose_engines, init_db, set_default_db_path, snapshot_database
+    from services import report_service
+    from services.category_service import list_categories
+
+    try:
+        periods = [report_service.parse_period(p) for p in args.period]
+    except ValueError as e:
+        parser.error(str(e))
+    out_dir = args.out or os.path.join(EXPORTS_DIR, f"relatorios_{time.strftime('%Y%m%d_%H%M%S')}")
+
+    ensure_dirs()
+    if args.db:
+        set_default_db_path(args.db)
+    init_db()  # migrations, so the snapshot has the current schema
+
+    with tempfile.TemporaryDirectory(prefix="expense-report-") as tmp:
+        t = time.perf_counter()
+        snapshot = snapshot_database(os.path.join(tmp, "snapshot.db"))
+        dispose_engines()
+        set_default_db_path(snapshot)
+        print(f"snapshot ready in {time.perf_counter() - t:.1f}s", file=sys.stderr)
+
+        by_key = {}
+        for c in list_categories():
+            by_key[c.id] = by_key[c.name.casefold()] = c
+        categories = []
+        for name in args.category or ["todas"]:
+            if name == "*":
+                categories.extend((c.id, c.name) for c in list_categories())
+            elif name.casefold() == "todas":
+                categories.append((None, "todas"))
+            elif name.casefold() in by_key or name in by_key:
+                c = by_key.get(name) or by_key[name.casefold()]
+                categories.append((c.id, c.name))
+            else:
+                parser.error(f"categoria desconhecida: {name!r}")
+        dispose_engines()
+
+        jobs = report_service.plan_jobs(periods, list(dict.fromkeys(categories)), tuple(args.format), out_dir)
+        done = 0
+
+        def on_done(result: report_service.JobResult):
+            nonlocal done
+            done += 1
+            job = result.job
+            status = "sem despesas" if result.empty else (f"ERRO: {result.error}" if result.error else job.path)
+            print(f"[{done}/{len(jobs)}] {job.kind} {job.period.label} {job.category_label} "
+                  f"({result.seconds:.1f}s): {status}", file=sys.stderr)
+
+        t = time.perf_counter()
+        results = report_service.run_jobs(jobs, snapshot, args.workers, on_done)
+        dispose_engines()
+
+    written = sum(1 for r in results if not r.empty and not r.error)
+    failed = sum(1 for r in results if r.error)
+    print(f"{written} files written to {out_dir} in {time.perf_counter() - t:.1f}s"
+          f"{f', {failed} failed' if failed else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
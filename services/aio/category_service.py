@@ -0,0 +1,75 @@
+"""Asyncio twin of services.category_service; reads and fills the same CategoryCache."""
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from core.database import async_session_scope
+from core import repository as repo
+from services import category_service as sync
+from services.category_service import CachedCategory
+
+
+async def list_categories() -> list[CachedCategory]:
+    cached = sync._cache.peek()
+    if cached is not None:
+        return cached
+    generation = sync._cache.generation
+    async with async_session_scope() as session:
+        rows = await session.run_sync(repo.get_all_categories)
+    return sync._cache.fill(rows, generation)
+
+async def get_category(category_id: str) -> Optional[CachedCategory]:
+    return next((c for c in await list_categories() if c.id == category_id), None)
+
+async def list_categories_with_spending(date_from: datetime, date_to: datetime):
+    """(categories, {category_id: total spent in the period}); the two reads run concurrently."""
+    async def totals():
+        async with async_session_scope() as session:
+            return await session.run_sync(repo.get_total_by_category_in_period, date_from, date_to)
+
+    categories, rows = await asyncio.gather(list_categories(), totals())
+    return categories, {cid: total for cid, _, total in rows}
+
+async def create_category(
+    name: str,
+    color: str = "#6366f1",
+    icon: str = "",
+    monthly_limit: Optional[Decimal] = None,
+):
+    async with async_session_scope() as session:
+        cat = await session.run_sync(repo.create_category, name, color=color, icon=icon, monthly_limit=monthly_limit)
+    await asyncio.to_thread(sync._written, cat.id, "created")
+    return cat
+
+async def update_category(
+    category_id: str,
+    name: Optional[str] = None,
+    color: Optional[str] = None,
+    monthly_limit: Optional[Decimal] = None,
+):
+    async with async_session_scope() as session:
+        cat = await session.run_sync(
+            repo.update_category, category_id, name=name, color=color, monthly_limit=monthly_limit
+        )
+    if cat is not None:
+        await asyncio.to_thread(sync._written, cat.id, "updated")
+    return cat
+
+async def delete_category(category_id: str) -> bool:
+    async with async_session_scope() as session:
+        deleted = await session.run_sync(repo.delete_category, category_id)
+    if deleted:
+        await asyncio.to_thread(sync._written, category_id, "deleted")
+    return deleted
+
+async def set_limit_for_month(category_id: str, year_month: str, limit_value: Decimal):
+    """year_month format: YYYY-MM."""
+    async with async_session_scope() as session:
+        limit = await session.run_sync(repo.set_category_limit_for_month, category_id, year_month, limit_value)
+    await asyncio.to_thread(sync._written, category_id, "limit")
+    return limit
+
+async def get_limit_for_month(category_id: str, year_month: str):
+    async with async_session_scope() as session:
+        return await session.run_sync(repo.get_category_limit_for_month, category_id, year_month)
@@ -0,0 +1,33 @@
+"""Asyncio twin of services.dashboard_service.get_snapshot."""
+import asyncio
+from datetime import date, datetime
+from typing import Optional
+
+from core.database import async_session_scope
+from core import repository as repo
+from services import analytics
+from services import dashboard_service as sync
+from services.dashboard_service import DashboardSnapshot
+
+
+async def _read(fn, *args, **kwargs):
+    async with async_session_scope() as session:
+        return await session.run_sync(fn, *args, **kwargs)
+
+async def get_snapshot(today: Optional[date] = None) -> DashboardSnapshot:
+    """same figures as the blocking get_snapshot.
+
+    from SQL, the month breakdown and the monthly series are read concurrently, each on its
+    own pooled connection. with NumPy the ledger answers in memory, so it just runs in a thread.
+    """
+    today = today or date.today()
+    if analytics.available():
+        return await asyncio.to_thread(sync.get_snapshot, today)
+
+    start_month = datetime(today.year, today.month, 1)
+    end_today = datetime.combine(today, datetime.max.time())
+    breakdown, monthly = await asyncio.gather(
+        _read(repo.get_category_breakdown_in_period, start_month, end_today),
+        _read(repo.get_monthly_totals, 12, end=today),
+    )
+    return sync._snapshot(today, breakdown, monthly)
@@ -0,0 +1,148 @@
+"""Asyncio twin of services.expense_service."""
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from app.config import BASE_CURRENCY
+from core.database import async_session_scope
+from core import repository as repo
+from services import expense_service as sync
+from services import fx_service
+from services.events import ExpenseState
+
+
+async def add_expense(
+    amount: Decimal,
+    date: datetime,
+    category_id: str,
+    description: str = "",
+    source: str = "",
+    currency: str = BASE_CURRENCY,
+):
+    # rate lookups may query on a cache miss: off the loop, like the hooks below
+    await asyncio.to_thread(fx_service.rate, currency, date)
+    with sync._tracking():
+        async with async_session_scope() as session:
+            exp = await session.run_sync(
+                repo.create_expense, amount, date, category_id, description, source, currency
+            )
+        # the ledger, budget and event hooks may query (a budget month loads on first use): off the loop
+        await asyncio.to_thread(sync._added, exp)
+    return exp
+
+async def list_expenses(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    min_amount: Optional[Decimal] = None,
+    max_amount: Optional[Decimal] = None,
+    source: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    async with async_session_scope() as session:
+        return await session.run_sync(
+            repo.get_expenses,
+            date_from=date_from,
+            date_to=date_to,
+            category_id=category_id,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            source=source,
+            limit=limit,
+        )
+
+async def summarize_expenses(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    search: Optional[str] = None,
+) -> tuple[int, Decimal]:
+    async with async_session_scope() as session:
+        return await session.run_sync(
+            repo.get_expense_summary, date_from=date_from, date_to=date_to, category_id=category_id, search=search
+        )
+
+async def search_expenses(
+    query: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    limit: int = 100,
+):
+    async with async_session_scope() as session:
+        return await session.run_sync(
+            repo.search_expenses, query, date_from=date_from, date_to=date_to, category_id=category_id, limit=limit
+        )
+
+async def list_expenses_page(cursor: Optional[str] = None, page_size: int = 200, **filters) -> repo.ExpensePage:
+    async with async_session_scope() as session:
+        return await session.run_sync(repo.get_expenses_page, cursor=cursor, page_size=page_size, **filters)
+
+async def expense_matches(expense_id: str, **filters) -> bool:
+    async with async_session_scope() as session:
+        return await session.run_sync(repo.expense_matches, expense_id, **filters)
+
+async def get_expense(expense_id: str):
+    async with async_session_scope() as session:
+        return await session.run_sync(repo.get_expense_by_id, expense_id)
+
+async def update_expense(
+    expense_id: str,
+    amount: Optional[Decimal] = None,
+    date: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    description: Optional[str] = None,
+    source: Optional[str] = None,
+    currency: Optional[str] = None,
+):
+    with sync._tracking():
+        async with async_session_scope() as session:
+            old = await session.run_sync(repo.get_expense_by_id, expense_id)
+            before = await asyncio.to_thread(ExpenseState.of, old) if old else None
+            if old is not None and (currency or date):
+                await asyncio.to_thread(fx_service.rate, currency or old.currency, date or old.date)
+            exp = await session.run_sync(
+                repo.update_expense,
+                expense_id,
+                amount=amount,
+                date=date,
+                category_id=category_id,
+                description=description,
+                source=source,
+                currency=currency,
+            )
+        if exp is not None:
+            await asyncio.to_thread(sync._updated, before, exp)
+    return exp
+
+async def remove_expense(expense_id: str) -> bool:
+    with sync._tracking():
+        async with async_session_scope() as session:
+            exp = await session.run_sync(repo.get_expense_by_id, expense_id)
+            state = await asyncio.to_thread(ExpenseState.of, exp) if exp else None
+            deleted = await session.run_sync(repo.delete_expense, expense_id)
+        if deleted:
+            await asyncio.to_thread(sync._removed, state)
+    return deleted
+
+async def total_by_category(date_from: datetime, date_to: datetime):
+    async with async_session_scope() as session:
+        return await session.run_sync(repo.get_total_by_category_in_period, date_from, date_to)
+
+async def monthly_totals(months_back: int = 12):
+    async with async_session_scope() as session:
+        return await session.run_sync(repo.get_monthly_totals, months_back)
+
+async def total_spent(date_from: datetime, date_to: datetime) -> Decimal:
+    async with async_session_scope() as session:
+        return await session.run_sync(repo.get_total_spent_in_period, date_from, date_to)
+
+async def period_overview(date_from: datetime, date_to: datetime):
+    """(total spent, {category_id: total}, (count, total)) of a period: three independent reads at once."""
+    total, by_category, summary = await asyncio.gather(
+        total_spent(date_from, date_to),
+        total_by_category(date_from, date_to),
+        summarize_expenses(date_from=date_from, date_to=date_to),
+    )
+    return total, {cid: t for cid, _, t in by_category}, summary
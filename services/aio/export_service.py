@@ -0,0 +1,75 @@
+"""Asyncio twin of services.export_service."""
+import asyncio
+import csv
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from core.database import async_session_scope
+from core import repository as repo
+from services import export_service as sync
+from services.export_service import (
+    EXPORT_BATCH_SIZE, PROGRESS_EVERY, WRITE_BUFFER_SIZE, NoExpensesError, ProgressCallback,
+)
+
+
+async def iter_export_rows(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[repo.ExportRow]:
+    """repo.ExportRow tuples, streamed batch_size at a time."""
+    async with async_session_scope() as session:
+        stmt = repo.export_rows_query(date_from, date_to, category_id).execution_options(yield_per=batch_size)
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            for row in partition:
+                yield row.tuple()
+
+async def export_csv(
+    filepath: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> str:
+    sync._ensure_exports_dir()
+    filepath = filepath or sync._default_path("csv")
+
+    partial = f"{filepath}.part"
+    written = 0
+    try:
+        with open(partial, "w", encoding="utf-8-sig", newline="", buffering=WRITE_BUFFER_SIZE) as f:
+            writer = csv.writer(f, delimiter=";", lineterminator="\n")
+            writer.writerow(sync.CSV_HEADER)
+            async for row in iter_export_rows(date_from, date_to, category_id):
+                writer.writerow(sync._csv_record(*row))
+                written += 1
+                if progress and written % PROGRESS_EVERY == 0:
+                    progress(written)
+    except BaseException:
+        if os.path.exists(partial):  # open() itself may have failed
+            os.remove(partial)
+        raise
+
+    if written == 0:
+        os.remove(partial)
+        raise NoExpensesError("Nenhuma despesa encontrada no periodo selecionados")
+    os.replace(partial, filepath)
+    if progress:
+        progress(written)
+    return filepath
+
+async def export_pdf(
+    filepath: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> str:
+    """the blocking export_pdf in a thread: rendering is CPU bound and already spread over processes."""
+    return await asyncio.to_thread(
+        sync.export_pdf, filepath, date_from, date_to, category_id, workers=workers, progress=progress
+    )
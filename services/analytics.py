@@ -0,0 +1,297 @@
+"""In-memory columnar view of the ledger for dashboard aggregates. Needs NumPy (optional).
+
+the expenses are read once as (category index, day ordinal, cents) integer columns and folded
+into a category x day matrix of cents and counts. prefix sums over the days turn any date-range
+total into two array lookups per category. writes made through the services update the matrix
+in place; bulk writes (imports, category deletes) drop it and the next query reloads.
+
+amounts are summed in integer cents, so results match the SQL totals exactly. dates may be
+date or datetime; only the day is used and both ends of a period are inclusive.
+"""
+import importlib.util
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import chain
+from threading import Condition, Lock
+from typing import Optional
+
+from core.database import session_scope
+from core import repository as repo
+
+LOAD_ATTEMPTS = 3
+LOAD_WAIT = 2.0  # seconds a load waits for writes in flight to finish their bookkeeping
+GROW_DAYS = 366  # extra columns added when a write falls outside the loaded range
+
+_numpy_available: Optional[bool] = None
+
+
+def available() -> bool:
+    """True when NumPy is installed; checked without importing it, to keep startup fast."""
+    global _numpy_available
+    if _numpy_available is None:
+        _numpy_available = importlib.util.find_spec("numpy") is not None
+    return _numpy_available
+
+
+def _to_cents(amount) -> int:
+    return int((Decimal(str(amount)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _from_cents(cents) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class LedgerBusy(RuntimeError):
+    """every load attempt overlapped a write; the ledger stays unloaded and callers answer from SQL."""
+
+
+class LedgerAnalytics:
+    """loaded lazily on the first query, from whichever thread asks first (normally a DataLoader worker)."""
+
+    def __init__(self):
+        self._lock = Lock()  # guards the arrays below
+        self._idle = Condition(self._lock)  # notified when the last write in flight ends
+        self._load_lock = Lock()  # one load at a time
+        self._writes = 0  # bumped by every write; a load that overlaps a write is redone
+        self._pending = 0  # writes between begin_write and end_write: committed rows record() has yet to apply
+        self._loaded = False
+        self._category_ids: list[str] = []
+        self._cat_index: dict[str, int] = {}
+        self._first_day = 0  # day ordinal of column 0
+        self._cents = None  # int64 [categories, days]
+        self._counts = None  # int64 [categories, days]
+        self._cum = None  # prefix sums over days, [categories, days + 1]; None after a write
+        self._cum_counts = None
+        self.loads = 0
+
+    # ---------- loading and writes ----------
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            for _ in range(LOAD_ATTEMPTS):
+                with self._lock:
+                    if self._loaded:
+                        return
+                    # a write in flight may be committed already: a read now would contain it and
+                    # its record() would then add it a second time
+                    if not self._idle.wait_for(lambda: not self._pending, LOAD_WAIT):
+                        continue
+                    writes = self._writes
+                category_ids, columns = self._read_ledger()
+                with self._lock:
+                    if self._writes == writes and not self._pending:
+                        self._install(category_ids, columns)
+                        return
+            # installing a read that overlapped a write would lose or double that write until the next invalidate
+            raise LedgerBusy(f"ledger changed during {LOAD_ATTEMPTS} loads")
+
+    def _read_ledger(self):
+        import numpy as np
+
+        from services.category_service import list_categories
+
+        category_ids = [c.id for c in list_categories()]
+        with session_scope() as session:
+            parts = [
+                np.fromiter(chain.from_iterable(batch), dtype=np.int64, count=3 * len(batch)).reshape(-1, 3)
+                for batch in repo.iter_ledger_rows(session, category_ids)
+            ]
+        columns = np.concatenate(parts) if parts else np.empty((0, 3), dtype=np.int64)
+        return category_ids, columns
+
+    def _install(self, category_ids: list[str], columns):
+        import numpy as np
+
+        cat, day, cents = columns[:, 0], columns[:, 1], columns[:, 2]
+        known = cat >= 0
+        cat, day, cents = cat[known], day[known], cents[known]
+
+        today = date.today().toordinal()
+        first = int(day.min()) if len(day) else today
+        width = max(int(day.max()) if len(day) else today, today) - first + 1
+        n_cats = max(len(category_ids), 1)
+
+        flat = cat * width + (day - first)
+        size = n_cats * width
+        # float weights are exact for sums below 2**53 cents
+        self._cents = np.rint(np.bincount(flat, weights=cents, minlength=size)).astype(np.int64).reshape(n_cats, width)
+        self._counts = np.bincount(flat, minlength=size).astype(np.int64).reshape(n_cats, width)
+        self._category_ids = list(category_ids)
+        self._cat_index = {cid: i for i, cid in enumerate(category_ids)}
+        self._first_day = first
+        self._cum = self._cum_counts = None
+        self._loaded = True
+        self.loads += 1
+
+    def begin_write(self):
+        """a write whose record() calls follow its commit is starting; pair with end_write."""
+        with self._lock:
+            self._writes += 1
+            self._pending += 1
+
+    def end_write(self):
+        """the write begun last is committed and recorded (or failed)."""
+        with self._lock:
+            self._writes += 1
+            self._pending -= 1
+            if not self._pending:
+                self._idle.notify_all()
+
+    def invalidate(self):
+        with self._lock:
+            self._writes += 1
+            self._loaded = False
+            self._cents = self._counts = self._cum = self._cum_counts = None
+
+    def record(self, day: date, category_id: str, amount, count: int):
+        """apply one write: amount and count are negative when an expense is removed or moved away."""
+        with self._lock:
+            self._writes += 1
+            if not self._loaded:
+                return
+            ci = self._cat_index.get(category_id)
+            if ci is None:
+                ci = self._add_category(category_id)
+            col = day.toordinal() - self._first_day
+            if col < 0 or col >= self._cents.shape[1]:
+                col = self._grow(day.toordinal())
+            self._cents[ci, col] += _to_cents(amount)
+            self._counts[ci, col] += count
+            self._cum = self._cum_counts = None
+
+    def _add_category(self, category_id: str) -> int:
+        import numpy as np
+
+        self._cat_index[category_id] = len(self._category_ids)
+        self._category_ids.append(category_id)
+        zeros = np.zeros((1, self._cents.shape[1]), dtype=np.int64)
+        self._cents = np.vstack([self._cents, zeros])
+        self._counts = np.vstack([self._counts, zeros])
+        return len(self._category_ids) - 1
+
+    def _grow(self, ordinal: int) -> int:
+        import numpy as np
+
+        width = self._cents.shape[1]
+        before = max(0, self._first_day - ordinal + GROW_DAYS) if ordinal < self._first_day else 0
+        after = max(0, ordinal - (self._first_day + width - 1) + GROW_DAYS) if ordinal >= self._first_day + width else 0
+        pad = ((0, 0), (before, after))
+        self._cents = np.pad(self._cents, pad)
+        self._counts = np.pad(self._counts, pad)
+        self._first_day -= before
+        return ordinal - self._first_day
+
+    # ---------- queries ----------
+
+    def _prefix(self):
+        """(cumulative cents, cumulative counts, first day, category ids), consistent with each other."""
+        import numpy as np
+
+        while True:
+            self._ensure_loaded()
+            with self._lock:
+                if not self._loaded:
+                    continue  # invalidated in between
+                if self._cum is None:
+                    n_cats, width = self._cents.shape
+                    self._cum = np.zeros((n_cats, width + 1), dtype=np.int64)
+                    self._cum_counts = np.zeros((n_cats, width + 1), dtype=np.int64)
+                    np.cumsum(self._cents, axis=1, out=self._cum[:, 1:])
+                    np.cumsum(self._counts, axis=1, out=self._cum_counts[:, 1:])
+                return self._cum, self._cum_counts, self._first_day, list(self._category_ids)
+
+    @staticmethod
+    def _columns(ordinals, first_day: int, width: int):
+        """prefix-sum positions for day ordinals: position p covers the days before first_day + p."""
+        import numpy as np
+
+        return np.clip(np.asarray(ordinals, dtype=np.int64) - first_day, 0, width)
+
+    def _range(self, date_from: Optional[date], date_to: Optional[date]):
+        cum, cum_counts, first, category_ids = self._prefix()
+        width = cum.shape[1] - 1
+        lo = 0 if date_from is None else int(self._columns(date_from.toordinal(), first, width))
+        hi = width if date_to is None else int(self._columns(date_to.toordinal() + 1, first, width))
+        hi = max(hi, lo)
+        return cum[:, hi] - cum[:, lo], cum_counts[:, hi] - cum_counts[:, lo], category_ids
+
+    def category_totals(self, date_from: Optional[date], date_to: Optional[date]) -> dict[str, Decimal]:
+        """{category_id: total} for categories with expenses in the period, both ends inclusive."""
+        totals, counts, category_ids = self._range(date_from, date_to)
+        return {cid: _from_cents(totals[i]) for i, cid in enumerate(category_ids) if counts[i] > 0}
+
+    def period_summary(
+        self,
+        date_from: Optional[date],
+        date_to: Optional[date],
+        category_id: Optional[str] = None,
+    ) -> tuple[int, Decimal]:
+        """(count, total) of the period, optionally for one category."""
+        totals, counts, category_ids = self._range(date_from, date_to)
+        if category_id is None:
+            return int(counts.sum()), _from_cents(totals.sum())
+        try:
+            i = category_ids.index(category_id)
+        except ValueError:
+            return 0, Decimal("0.00")
+        return int(counts[i]), _from_cents(totals[i])
+
+    def range_totals(self, boundaries: list[date], category_id: Optional[str] = None) -> list[tuple[int, Decimal]]:
+        """(count, total) for each [boundaries[i], boundaries[i + 1]) range, in one vectorized lookup."""
+        import numpy as np
+
+        cum, cum_counts, first, category_ids = self._prefix()
+        if category_id is not None:
+            if category_id not in category_ids:
+                return [(0, Decimal("0.00"))] * max(len(boundaries) - 1, 0)
+            i = category_ids.index(category_id)
+            cum, cum_counts = cum[i], cum_counts[i]
+        else:
+            cum, cum_counts = cum.sum(axis=0), cum_counts.sum(axis=0)
+        pos = self._columns([d.toordinal() for d in boundaries], first, len(cum) - 1)
+        totals, counts = np.diff(cum[pos]), np.diff(cum_counts[pos])
+        return [(int(n), _from_cents(t)) for n, t in zip(counts, totals)]
+
+    def monthly_totals(self, months_back: int = 12, end: Optional[date] = None) -> list[tuple[str, Decimal]]:
+        """same contract as repository.get_monthly_totals: (YYYY-MM, total) for months with expenses."""
+        end = end or date.today()
+        year, month = end.year, end.month - months_back
+        while month <= 0:
+            month += 12
+            year -= 1
+        starts = []
+        while (year, month) <= (end.year, end.month):
+            starts.append(date(year, month, 1))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        boundaries = starts + [date.fromordinal(end.toordinal() + 1)]
+        return [
+            (start.strftime("%Y-%m"), total)
+            for start, (count, total) in zip(starts, self.range_totals(boundaries))
+            if count > 0
+        ]
+
+
+_ledger = LedgerAnalytics()
+
+
+def get_ledger() -> LedgerAnalytics:
+    return _ledger
+
+
+def record(day: date, category_id: str, amount, count: int):
+    if available():
+        _ledger.record(day, category_id, amount, count)
+
+
+def begin_write():
+    _ledger.begin_write()
+
+
+def end_write():
+    _ledger.end_write()
+
+
+def invalidate():
+    _ledger.invalidate()
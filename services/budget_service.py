@@ -0,0 +1,192 @@
+"""Monthly budget limits: evaluation per category and alerts when spending crosses 80% / 100%."""
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from threading import Lock
+from typing import Callable, Optional
+
+from core.database import session_scope
+from core import repository as repo
+
+WARNING_RATIO = Decimal("0.8")
+EXCEEDED_RATIO = Decimal("1")
+THRESHOLDS = (WARNING_RATIO, EXCEEDED_RATIO)
+
+
+@dataclass(frozen=True)
+class BudgetStatus:
+    category_id: str
+    name: str
+    year_month: str
+    limit: Optional[Decimal]  # None: the category has no limit for the month
+    spent: Decimal
+
+    @property
+    def ratio(self) -> Optional[Decimal]:
+        if not self.limit:
+            return None
+        return self.spent / self.limit
+
+    @property
+    def level(self) -> str:
+        """"ok", "warning" (>= 80% of the limit) or "exceeded" (>= 100%)."""
+        ratio = self.ratio
+        if ratio is None or ratio < WARNING_RATIO:
+            return "ok"
+        return "exceeded" if ratio >= EXCEEDED_RATIO else "warning"
+
+
+@dataclass(frozen=True)
+class ThresholdCrossing:
+    """spending of a category went from below to at/above threshold (a fraction of the limit)."""
+    category_id: str
+    name: str
+    year_month: str
+    threshold: Decimal
+    spent: Decimal
+    limit: Decimal
+
+
+CrossingListener = Callable[[ThresholdCrossing], None]
+
+
+def _year_month(day: date) -> str:
+    return day.strftime("%Y-%m")
+
+
+def evaluate_month(year_month: Optional[str] = None) -> list[BudgetStatus]:
+    """status of every category for the month (default: current), from one aggregate query."""
+    year_month = year_month or _year_month(date.today())
+    with session_scope() as session:
+        rows = repo.get_budget_rows(session, year_month)
+    return [BudgetStatus(cid, name, year_month, limit, spent) for cid, name, limit, spent in rows]
+
+
+def list_categories_with_budget(year_month: Optional[str] = None):
+    """(categories, {category_id: BudgetStatus}) for the month, default: current."""
+    from services.category_service import list_categories
+
+    return list_categories(), {s.category_id: s for s in evaluate_month(year_month)}
+
+
+def get_alerts(year_month: Optional[str] = None) -> list[BudgetStatus]:
+    """categories at or above WARNING_RATIO of their limit, the most spent (relative) first."""
+    alerts = [s for s in evaluate_month(year_month) if s.level != "ok"]
+    return sorted(alerts, key=lambda s: s.ratio, reverse=True)
+
+
+class BudgetTracker:
+    """running (spent, limit) per category for the months touched by writes.
+
+    a month is loaded with one evaluate query the first time a write lands in it; after that
+    every write is an O(1) update that reports the thresholds it crossed upwards.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._months: dict[str, dict[str, list]] = {}  # year_month -> category_id -> [name, spent, limit]
+        self._listeners: list[CrossingListener] = []
+        self._pending = 0  # writes between begin_write and end_write
+
+    def begin_write(self):
+        """a write whose record() follows its commit is starting; pair with end_write."""
+        with self._lock:
+            self._pending += 1
+
+    def end_write(self):
+        with self._lock:
+            self._pending -= 1
+
+    def add_listener(self, listener: CrossingListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: CrossingListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def invalidate(self):
+        with self._lock:
+            self._months.clear()
+
+    def _month(self, year_month: str) -> dict[str, list]:
+        month = self._months.get(year_month)
+        if month is None:
+            month = {s.category_id: [s.name, s.spent, s.limit] for s in evaluate_month(year_month)}
+            # another write in flight may be in this read and would be added again by its own
+            # record(): use the month for this write only, the next one reads it again
+            if self._pending <= 1:
+                self._months[year_month] = month
+        return month
+
+    def record(self, changes: list[tuple[date, str, Decimal]]) -> list[ThresholdCrossing]:
+        """apply one write, given as (day, category_id, amount) changes, and notify any crossing.
+
+        amounts are negative for removals; an update is a removal plus an insertion. must be
+        called after the write is committed, so a month loaded here already includes all of it,
+        and between begin_write and end_write.
+        """
+        net: dict[tuple[str, str], Decimal] = {}
+        for day, category_id, amount in changes:
+            key = (_year_month(day), category_id)
+            net[key] = net.get(key, Decimal("0")) + amount
+
+        crossings = []
+        with self._lock:
+            loaded = {year_month for year_month, _ in net if year_month in self._months}
+            for (year_month, category_id), amount in net.items():
+                entry = self._month(year_month).get(category_id)
+                if entry is None:
+                    continue
+                if year_month in loaded:
+                    entry[1] += amount
+                # else the month was just read from the database, with this write already in it
+                name, after, limit = entry
+                before = after - amount
+                if limit and amount > 0:
+                    crossings.extend(
+                        ThresholdCrossing(category_id, name, year_month, t, after, limit)
+                        for t in THRESHOLDS
+                        if before < limit * t <= after
+                    )
+        for crossing in crossings:
+            for listener in list(self._listeners):
+                listener(crossing)
+        return crossings
+
+
+_tracker = BudgetTracker()
+
+
+def add_crossing_listener(listener: CrossingListener):
+    """listener(crossing) is called on the thread that made the write, right after it commits."""
+    _tracker.add_listener(listener)
+
+
+def remove_crossing_listener(listener: CrossingListener):
+    _tracker.remove_listener(listener)
+
+
+def record_expense(day: datetime, category_id: str, amount: Decimal) -> list[ThresholdCrossing]:
+    """an expense was added (amount > 0) or removed (amount < 0)."""
+    return _tracker.record([(day, category_id, amount)])
+
+
+def record_update(
+    old_day: datetime, old_category_id: str, old_amount: Decimal,
+    day: datetime, category_id: str, amount: Decimal,
+) -> list[ThresholdCrossing]:
+    """an expense moved from (old_day, old_category_id, old_amount) to (day, category_id, amount)."""
+    return _tracker.record([(old_day, old_category_id, -old_amount), (day, category_id, amount)])
+
+
+def begin_write():
+    _tracker.begin_write()
+
+
+def end_write():
+    _tracker.end_write()
+
+
+def invalidate():
+    """drop the running counters; call after limits change or after bulk writes."""
+    _tracker.invalidate()
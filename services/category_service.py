@@ -1,32 +1,125 @@
 """Business logic for categories and limits."""
+from datetime import datetime
 from decimal import Decimal
+from threading import Lock
 from typing import Optional
 
 from core.database import session_scope
 from core import repository as repo
+from services import analytics, budget_service, events
+from services.events import CategoryChanged
 
+DEFAULT_COLOR = "#6366f1"
 
-def list_categories():
-    with session_scope() as session:
-        return repo.get_all_categories(session)
+CachedCategory = repo.CategoryRecord  # the cache keeps the repository's records as they are
+
+
+class CategoryCache:
+    """every category held in memory, loaded in one query and dropped on any category write."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._by_id: Optional[dict[str, CachedCategory]] = None
+        self._by_name: dict[str, CachedCategory] = {}
+        self.generation = 0  # bumped by invalidate; fill() ignores rows read before the last bump
+        self.hits = 0
+        self.misses = 0
+
+    def _loaded(self) -> dict[str, CachedCategory]:
+        with self._lock:
+            if self._by_id is not None:
+                self.hits += 1
+                return self._by_id
+            self.misses += 1
+            with session_scope() as session:
+                rows = repo.get_all_categories(session)
+            self._install(rows)
+            return self._by_id
+
+    def _install(self, rows: list[CachedCategory]):
+        self._by_id = {c.id: c for c in rows}  # name order, as get_all_categories returns them
+        self._by_name = {c.name: c for c in rows}
+
+    def peek(self) -> Optional[list[CachedCategory]]:
+        """the cached categories, or None when they are not loaded; never queries."""
+        with self._lock:
+            if self._by_id is None:
+                return None
+            self.hits += 1
+            return list(self._by_id.values())
+
+    def fill(self, rows: list[CachedCategory], generation: int) -> list[CachedCategory]:
+        """load the cache from get_all_categories rows read elsewhere (the asyncio services).
+
+        generation is the value read before the query; if a write invalidated the cache
+        since, the rows are returned but not kept.
+        """
+        with self._lock:
+            self.misses += 1
+            if self.generation == generation:
+                self._install(rows)
+        return rows
+
+    def all(self) -> list[CachedCategory]:
+        return list(self._loaded().values())
+
+    def get(self, category_id: str) -> Optional[CachedCategory]:
+        return self._loaded().get(category_id)
+
+    def get_by_name(self, name: str) -> Optional[CachedCategory]:
+        self._loaded()
+        return self._by_name.get(name)
 
-def get_category(category_id: str):
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._by_id = None
+            self._by_name = {}
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_cache = CategoryCache()
+
+
+def cache_stats() -> dict[str, int]:
+    return _cache.stats()
+
+def invalidate_cache():
+    _cache.invalidate()
+
+def list_categories() -> list[CachedCategory]:
+    return _cache.all()
+
+def list_categories_with_spending(date_from: datetime, date_to: datetime):
+    """(categories, {category_id: total spent in the period})."""
     with session_scope() as session:
-        return repo.get_category_by_id(session, category_id)
+        totals = repo.get_total_by_category_in_period(session, date_from, date_to)
+    return _cache.all(), {cid: total for cid, _, total in totals}
+
+def get_category(category_id: str) -> Optional[CachedCategory]:
+    return _cache.get(category_id)
 
 def get_category_color_by_id(category_id: str) -> str:
-    with session_scope() as session:
-        c = repo.get_category_by_id(session, category_id)
-        return str(c.color) if c else "#6366f1"
+    c = _cache.get(category_id)
+    return c.color if c else DEFAULT_COLOR
 
 def get_category_color_by_name(category_name: str) -> str:
-    with session_scope() as session:
-        c = repo.get_category_by_name(session, category_name)
-        return str(c.color) if c else "#6366f1"
+    c = _cache.get_by_name(category_name)
+    return c.color if c else DEFAULT_COLOR
 
 def get_top_category_info():
     pass
 
+def _written(category_id: str, action: str):
+    """post-commit bookkeeping of a category write (see CategoryChanged.action), shared with services.aio."""
+    _cache.invalidate()
+    if action == "deleted":
+        analytics.invalidate()  # its expenses are deleted with it
+    budget_service.invalidate()
+    events.publish(CategoryChanged(category_id, action))
+
 def create_category(
     name: str,
     color: str = "#6366f1",
@@ -34,9 +127,11 @@ def create_category(
     monthly_limit: Optional[Decimal] = None,
 ):
     with session_scope() as session:
-        return repo.create_category(
+        cat = repo.create_category(
             session, name, color=color, icon=icon, monthly_limit=monthly_limit
         )
+    _written(cat.id, "created")
+    return cat
 
 def update_category(
     category_id: str,
@@ -45,22 +140,30 @@ def update_category(
     monthly_limit: Optional[Decimal] = None,
 ):
     with session_scope() as session:
-        return repo.update_category(
+        cat = repo.update_category(
             session, category_id, name=name, color=color, monthly_limit=monthly_limit
         )
+    if cat is not None:
+        _written(cat.id, "updated")
+    return cat
 
 
 def delete_category(category_id: str) -> bool:
     with session_scope() as session:
-        return repo.delete_category(session, category_id)
+        deleted = repo.delete_category(session, category_id)
+    if deleted:
+        _written(category_id, "deleted")
+    return deleted
 
 
 def set_limit_for_month(category_id: str, year_month: str, limit_value: Decimal):
     """year_month format: YYYY-MM."""
     with session_scope() as session:
-        return repo.set_category_limit_for_month(
+        limit = repo.set_category_limit_for_month(
             session, category_id, year_month, limit_value
         )
+    _written(category_id, "limit")
+    return limit
 
 
 def get_limit_for_month(category_id: str, year_month: str):
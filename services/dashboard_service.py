@@ -0,0 +1,79 @@
+"""Dashboard figures, from the in-memory ledger (services.analytics) or a single read transaction."""
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+from core.database import session_scope
+from core import repository as repo
+from services import analytics
+from services.category_service import list_categories
+
+DEFAULT_COLOR = "#6366f1"
+
+
+@dataclass(frozen=True)
+class CategorySlice:
+    category_id: str
+    name: str
+    color: str
+    total: Decimal
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    today: date
+    month_total: Decimal
+    year_total: Decimal
+    by_category: tuple[CategorySlice, ...]  # current month, only categories with spending
+    top_category: Optional[CategorySlice]
+    monthly: tuple[tuple[str, Decimal], ...]  # (year_month, total) for the last 12 months
+
+
+def get_snapshot(today: Optional[date] = None) -> DashboardSnapshot:
+    """everything the dashboard shows.
+
+    with NumPy installed the figures come from the columnar ledger (no SQL after its first load);
+    otherwise from two aggregate queries. month and year totals are derived from the
+    per-category and monthly series instead of being computed again.
+    """
+    today = today or date.today()
+    start_month = datetime(today.year, today.month, 1)
+    end_today = datetime.combine(today, datetime.max.time())
+
+    if analytics.available():
+        ledger = analytics.get_ledger()
+        categories = {c.id: c for c in list_categories()}
+        try:
+            breakdown = [
+                (cid, categories[cid].name, categories[cid].color, total)
+                for cid, total in ledger.category_totals(start_month, end_today).items()
+                if cid in categories
+            ]
+            monthly = ledger.monthly_totals(12, end=today)
+            return _snapshot(today, breakdown, monthly)
+        except analytics.LedgerBusy:
+            pass  # writes kept racing the load: answer this one from SQL
+
+    with session_scope() as session:
+        breakdown = repo.get_category_breakdown_in_period(session, start_month, end_today)
+        monthly = repo.get_monthly_totals(session, 12, end=today)
+    return _snapshot(today, breakdown, monthly)
+
+
+def _snapshot(today: date, breakdown, monthly) -> DashboardSnapshot:
+    """breakdown: (category_id, name, color, total) of the month; monthly: (year_month, total)."""
+    by_category = tuple(
+        CategorySlice(cid, name, color or DEFAULT_COLOR, total)
+        for cid, name, color, total in sorted(breakdown, key=lambda r: r[3], reverse=True)
+        if total > 0
+    )
+    year_prefix = f"{today.year}-"
+    return DashboardSnapshot(
+        today=today,
+        month_total=sum((s.total for s in by_category), Decimal("0")),
+        year_total=sum((total for ym, total in monthly if ym.startswith(year_prefix)), Decimal("0")),
+        by_category=by_category,
+        top_category=by_category[0] if by_category else None,
+        monthly=tuple(monthly),
+    )
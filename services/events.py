@@ -0,0 +1,102 @@
+"""Data-change notifications published by the services after each write commits.
+
+subscribers get the typed events below, synchronously, on the thread that made the write.
+handlers must be quick and must not raise; the UI goes through ui.events, which hands
+them over to the GUI thread.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from threading import Lock
+from typing import Callable, Optional
+
+
+@dataclass(frozen=True)
+class ExpenseState:
+    """the fields of an expense the views show and sort by, as they were when the event was made.
+
+    amount is in currency; base_amount is the same amount in BASE_CURRENCY, what totals add up.
+    """
+    id: str
+    date: datetime
+    created_at: Optional[datetime]
+    amount: Decimal
+    category_id: str
+    description: str
+    source: str
+    currency: str
+    base_amount: Decimal
+
+    @classmethod
+    def of(cls, exp) -> "ExpenseState":
+        from services import fx_service  # it publishes events itself
+
+        amount = Decimal(str(exp.amount))
+        return cls(
+            exp.id, exp.date, exp.created_at, amount, exp.category_id,
+            exp.description or "", exp.source or "",
+            exp.currency, fx_service.to_base(amount, exp.currency, exp.date),
+        )
+
+
+class DataEvent:
+    """base class of every event; subscribe to it to receive all of them."""
+
+
+@dataclass(frozen=True)
+class ExpenseCreated(DataEvent):
+    expense: ExpenseState
+
+
+@dataclass(frozen=True)
+class ExpenseUpdated(DataEvent):
+    before: ExpenseState
+    after: ExpenseState
+
+
+@dataclass(frozen=True)
+class ExpenseDeleted(DataEvent):
+    expense: ExpenseState
+
+
+@dataclass(frozen=True)
+class ExpensesImported(DataEvent):
+    """a bulk write; too many rows to describe one by one, subscribers reload."""
+    inserted: int
+
+
+@dataclass(frozen=True)
+class RatesChanged(DataEvent):
+    """an exchange rate was set or removed: totals involving currency changed, subscribers reload."""
+    currency: str
+
+
+@dataclass(frozen=True)
+class CategoryChanged(DataEvent):
+    category_id: str
+    action: str  # "created", "updated", "deleted" or "limit" (a monthly limit was set)
+
+
+Handler = Callable[[DataEvent], None]
+
+_lock = Lock()
+_handlers: list[tuple[type, Handler]] = []
+
+
+def subscribe(event_type: type, handler: Handler):
+    """handler(event) for every published event that is an instance of event_type."""
+    with _lock:
+        _handlers.append((event_type, handler))
+
+
+def unsubscribe(event_type: type, handler: Handler):
+    with _lock:
+        if (event_type, handler) in _handlers:
+            _handlers.remove((event_type, handler))
+
+
+def publish(event: DataEvent):
+    with _lock:
+        handlers = [h for t, h in _handlers if isinstance(event, t)]
+    for handler in handlers:
+        handler(event)
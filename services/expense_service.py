@@ -1,9 +1,13 @@
+from contextlib import contextmanager
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
+from app.config import BASE_CURRENCY
 from core.database import session_scope
 from core import repository as repo
+from services import analytics, budget_service, events, fx_service
+from services.events import ExpenseCreated, ExpenseDeleted, ExpenseState, ExpenseUpdated
 
 def add_expense(
     amount: Decimal,
@@ -11,11 +15,52 @@ def add_expense(
     category_id: str,
     description: str = "",
     source: str = "",
+    currency: str = BASE_CURRENCY,
 ):
-    with session_scope() as session:
-        return repo.create_expense(
-            session, amount, date, category_id, description, source
+    fx_service.rate(currency, date)  # fails before writing when the currency has no rate
+    with _tracking():
+        with session_scope() as session:
+            exp = repo.create_expense(
+                session, amount, date, category_id, description, source, currency
+            )
+        _added(exp)
+    return exp
+
+# post-commit bookkeeping of every write, shared with the asyncio twins in services.aio.
+# the ledger and the budgets count BASE_CURRENCY amounts
+
+@contextmanager
+def _tracking():
+    """bracket a write from before its commit to after its bookkeeping: a ledger or budget
+    month read in between would already contain the row the bookkeeping then adds."""
+    analytics.begin_write()
+    budget_service.begin_write()
+    try:
+        yield
+    finally:
+        budget_service.end_write()
+        analytics.end_write()
+
+def _added(exp):
+    state = ExpenseState.of(exp)
+    analytics.record(state.date, state.category_id, state.base_amount, 1)
+    budget_service.record_expense(state.date, state.category_id, state.base_amount)
+    events.publish(ExpenseCreated(state))
+
+def _updated(before: ExpenseState, exp):
+    after = ExpenseState.of(exp)
+    if (before.date, before.category_id, before.base_amount) != (after.date, after.category_id, after.base_amount):
+        analytics.record(before.date, before.category_id, -before.base_amount, -1)
+        analytics.record(after.date, after.category_id, after.base_amount, 1)
+        budget_service.record_update(
+            before.date, before.category_id, before.base_amount, after.date, after.category_id, after.base_amount
         )
+    events.publish(ExpenseUpdated(before, after))
+
+def _removed(state: ExpenseState):
+    analytics.record(state.date, state.category_id, -state.base_amount, -1)
+    budget_service.record_expense(state.date, state.category_id, -state.base_amount)
+    events.publish(ExpenseDeleted(state))
 
 def list_expenses(
     date_from: Optional[datetime] = None,
@@ -38,9 +83,41 @@ def list_expenses(
             limit=limit,
         )
 
-def list_expenses_new(**kwargs):
+def summarize_expenses(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    search: Optional[str] = None,
+) -> tuple[int, Decimal]:
+    with session_scope() as session:
+        return repo.get_expense_summary(
+            session, date_from=date_from, date_to=date_to, category_id=category_id, search=search
+        )
+
+
+def search_expenses(
+    query: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    limit: int = 100,
+):
+    """ranked full-text search over description and source; words match as prefixes."""
+    with session_scope() as session:
+        return repo.search_expenses(
+            session, query, date_from=date_from, date_to=date_to, category_id=category_id, limit=limit
+        )
+
+def list_expenses_page(cursor: Optional[str] = None, page_size: int = 200, **filters) -> repo.ExpensePage:
+    """filters: date_from, date_to, category_id, min_amount, max_amount, source, search."""
     with session_scope() as session:
-        return repo.get_expenses_new(session, **kwargs)
+        return repo.get_expenses_page(session, cursor=cursor, page_size=page_size, **filters)
+
+
+def expense_matches(expense_id: str, **filters) -> bool:
+    """filters: the same as list_expenses_page."""
+    with session_scope() as session:
+        return repo.expense_matches(session, expense_id, **filters)
 
 
 def get_expense(expense_id: str):
@@ -55,22 +132,38 @@ def update_expense(
     category_id: Optional[str] = None,
     description: Optional[str] = None,
     source: Optional[str] = None,
+    currency: Optional[str] = None,
 ):
-    with session_scope() as session:
-        return repo.update_expense(
-            session,
-            expense_id,
-            amount=amount,
-            date=date,
-            category_id=category_id,
-            description=description,
-            source=source,
-        )
+    with _tracking():
+        with session_scope() as session:
+            old = repo.get_expense_by_id(session, expense_id)
+            before = ExpenseState.of(old) if old else None
+            if old is not None and (currency or date):
+                fx_service.rate(currency or old.currency, date or old.date)
+            exp = repo.update_expense(
+                session,
+                expense_id,
+                amount=amount,
+                date=date,
+                category_id=category_id,
+                description=description,
+                source=source,
+                currency=currency,
+            )
+        if exp is not None:
+            _updated(before, exp)
+    return exp
 
 
 def remove_expense(expense_id: str) -> bool:
-    with session_scope() as session:
-        return repo.delete_expense(session, expense_id)
+    with _tracking():
+        with session_scope() as session:
+            exp = repo.get_expense_by_id(session, expense_id)
+            state = ExpenseState.of(exp) if exp else None
+            deleted = repo.delete_expense(session, expense_id)
+        if deleted:
+            _removed(state)
+    return deleted
 
 
 def total_by_category(date_from: datetime, date_to: datetime):
@@ -86,3 +179,8 @@ def monthly_totals(months_back: int = 12):
 def total_spent(date_from: datetime, date_to: datetime) -> Decimal:
     with session_scope() as session:
         return repo.get_total_spent_in_period(session, date_from, date_to)
+
+
+def rebuild_monthly_totals():
+    with session_scope() as session:
+        repo.rebuild_monthly_totals(session)
@@ -1,133 +1,235 @@
+import csv
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from decimal import Decimal
+from io import BytesIO
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
-from app.config import EXPORTS_DIR
-from services.expense_service import list_expenses
+from app.config import BASE_CURRENCY, CURRENCY_SYMBOLS, EXPORTS_DIR
+from core.database import session_scope
+from core import repository as repo
+from services.pdf_renderer import FIRST_PAGE_ROWS, ROWS_PER_PAGE, PageSpec, format_amount, render_pages
+
+CSV_HEADER = ("Data", "Valor", "Moeda", "Categoria", "Descrição", "Origem")
+EXPORT_BATCH_SIZE = 2000
+WRITE_BUFFER_SIZE = 1024 * 1024
+PROGRESS_EVERY = 5000
+PDF_PAGES_PER_TASK = 25
+PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+ProgressCallback = Callable[[int], None] # receives the number of rows written so far
+
+class NoExpensesError(ValueError):
+    """the filters matched no expense, so no file was written."""
 
 def _ensure_exports_dir():
     Path(EXPORTS_DIR).mkdir(parents=True, exist_ok=True)
 
+def _default_path(extension: str) -> str:
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return str(Path(EXPORTS_DIR) / f"despesas_{ts}.{extension}")
+
+def _csv_record(date, amount, currency, base_amount, cat_name, desc, source) -> tuple:
+    return (
+        date.strftime("%Y-%m-%d") if date else "",
+        str(amount).replace(".", ","),
+        currency,
+        cat_name or "",
+        (desc or "").replace(";", ",").replace("\n", " "),
+        source or "",
+    )
+
+def iter_export_rows(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    category_id: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[repo.ExportRow]:
+    """repo.ExportRow tuples, read from the database in batches."""
+    with session_scope() as session:
+        yield from repo.iter_export_rows(
+            session, date_from=date_from, date_to=date_to, category_id=category_id, batch_size=batch_size
+        )
+
 def export_csv(
     filepath: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
     category_id: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
 ) -> str:
     
     _ensure_exports_dir()
-    
-    if not filepath:
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = str(Path(EXPORTS_DIR) / f"despesas_{ts}.csv")
+    filepath = filepath or _default_path("csv")
 
-    expenses = list_expenses(
-        date_from = date_from, date_to = date_to, category_id = category_id
-    )
+    # written next to the target and renamed at the end, so a failed or empty export never clobbers a file
+    partial = f"{filepath}.part"
+    written = 0
+    try:
+        with open(partial, "w", encoding="utf-8-sig", newline="", buffering=WRITE_BUFFER_SIZE) as f:
+            writer = csv.writer(f, delimiter=";", lineterminator="\n")
+            writer.writerow(CSV_HEADER)
+            for row in iter_export_rows(date_from, date_to, category_id):
+                writer.writerow(_csv_record(*row))
+                written += 1
+                if progress and written % PROGRESS_EVERY == 0:
+                    progress(written)
+    except BaseException:
+        if os.path.exists(partial):  # open() itself may have failed
+            os.remove(partial)
+        raise
 
-    if len(expenses) > 0 and expenses != []:
-        with open(filepath, "w", encoding="utf-8-sig", newline="") as f:
-            f.write("Data;Valor;Categoria;Descrição;Origem\n")
-            for e in expenses:
-                date_str = e.date.strftime("%Y-%m-%d") if e.date else ""
-                amount_str = str(e.amount).replace(".", ",")
-                cat_name = e.category.name if e.category else ""
-                desc = (e.description or "").replace(";", ",").replace("\n", " ")
-                source = e.source or ""
-                f.write(f"{date_str};{amount_str};{cat_name};{desc};{source}\n")
-    elif not expenses:
-        raise ValueError("Nenhuma despesa encontrada no periodo selecionados")
+    if written == 0:
+        os.remove(partial)
+        raise NoExpensesError("Nenhuma despesa encontrada no periodo selecionados")
+    os.replace(partial, filepath)
+    if progress:
+        progress(written)
     
     return filepath
 
+def _paginate(rows: Iterator[repo.ExportRow]) -> Iterator[PageSpec]:
+    """group rows into page-sized chunks with a running total footer; the last page shows the total.
+
+    amounts show in their own currency, with its symbol unless it is BASE_CURRENCY; totals are in BASE_CURRENCY.
+    """
+    running = Decimal("0")
+    page: list = []
+    capacity = FIRST_PAGE_ROWS
+    number = 1
+    pending: Optional[PageSpec] = None
+    for date, amount, currency, base_amount, cat_name, desc, source in rows:
+        shown = format_amount(amount)
+        if currency != BASE_CURRENCY:
+            shown = f"{CURRENCY_SYMBOLS.get(currency, currency)} {shown}"
+        page.append((
+            date.strftime("%d/%m/%Y") if date else "",
+            shown,
+            cat_name or "",
+            (desc or "")[:40],
+            source or "",
+        ))
+        running += base_amount
+        if len(page) == capacity:
+            if pending:
+                yield pending
+            pending = PageSpec(number, page, f"Acumulado: {format_amount(running)}")
+            number += 1
+            page = []
+            capacity = ROWS_PER_PAGE
+    if page:
+        if pending:
+            yield pending
+        pending = PageSpec(number, page, "")
+    if pending:
+        yield pending._replace(footer=f"Total: {format_amount(running)}")
+
+def _batched(items: Iterator, size: int) -> Iterator[list]:
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
 def export_pdf(
     filepath: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
     category_id: Optional[str] = None,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
 ) -> str:
+    """render the report from streamed rows, PDF_PAGES_PER_TASK pages per task.
+
+    with more than one task, tasks render in a process pool and are merged in order with pypdf;
+    without pypdf (or with workers=1) the pages render in-process straight into the output file,
+    each one laid out as its rows come from the query.
+    """
     try:
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import cm
-        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+        import reportlab  # noqa: F401
     except ImportError:
         raise RuntimeError("reportlab não instalado. Execute: pip install reportlab")
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        PdfWriter = None
 
     _ensure_exports_dir()
-    if not filepath:
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = str(Path(EXPORTS_DIR) / f"despesas_{ts}.pdf")
+    filepath = filepath or _default_path("pdf")
 
-    expenses = list_expenses(
-        date_from=date_from, date_to=date_to, category_id=category_id
-    )
+    pages = _paginate(iter_export_rows(date_from, date_to, category_id))
+    first_page = next(pages, None)
+    if first_page is None:
+        raise NoExpensesError("Nenhuma despesa encontrada no perido selecionados")
 
-    doc = SimpleDocTemplate(
-        filepath,
-        pagesize = A4,
-        rightMargin = 2 * cm,
-        leftMargin = 2 * cm,
-        topMargin = 2 * cm,
-        bottomMargin = 2 * cm,
-    )
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=18,
-        spaceAfter=12,
-    )
-
-    flow = []
-    flow.append(Paragraph("Relatório de Despesas", title_style))
+    title_lines = ["Relatório de Despesas"]
     if date_from or date_to:
         period = []
         if date_from:
             period.append(date_from.strftime("%d/%m/%Y"))
         if date_to:
             period.append(date_to.strftime("%d/%m/%Y"))
-        flow.append(Paragraph(f"Período: {' a '.join(period)}", styles["Normal"]))
-    flow.append(Spacer(1, 0.5 * cm))
+        title_lines.append(f"Período: {' a '.join(period)}")
 
-    if not expenses:
-        raise ValueError("Nenhuma despesa encontrada no perido selecionados")
-    
-    if expenses >= 0 and expenses != []:
-        data = [["Data", "Valor (R$)", "Categoria", "Descrição", "Origem"]]
-        total = Decimal("0")
-        for e in expenses:
-            date_str = e.date.strftime("%d/%m/%Y") if e.date else ""
-            amount_str = f"{e.amount:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-            cat_name = e.category.name if e.category else ""
-            desc = (e.description or "")[:40]
-            source = e.source or ""
-            data.append([date_str, amount_str, cat_name, desc, source])
-            total += e.amount
-        data.append(["", f"Total: {total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), "", "", ""])
-
-        table = Table(data, colWidths=[2 * cm, 2.5 * cm, 3 * cm, 6 * cm, 2.5 * cm])
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#6366f1")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-                    ("TOPPADDING", (0, 0), (-1, 0), 8),
-                    ("BACKGROUND", (0, 1), (-1, -2), colors.white),
-                    ("GRID", (0, 0), (-1, -2), 0.5, colors.lightgrey),
-                    ("LINEABOVE", (0, -1), (-1, -1), 1, colors.grey),
-                    ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-                ]
-            )
-        )
-        flow.append(table)
+    workers = PDF_WORKERS if workers is None else workers
+    tasks = _batched(chain([first_page], pages), PDF_PAGES_PER_TASK)
+    first_task = next(tasks)
+    second_task = next(tasks, None)
+
+    partial = f"{filepath}.part"
+    try:
+        if second_task is None or PdfWriter is None or workers <= 1:
+            pdf_pages = chain(first_task, second_task or [], chain.from_iterable(tasks))
+            with open(partial, "wb") as f:
+                render_pages(_reporting(pdf_pages, progress), title_lines, out=f)
+        else:
+            _render_parallel(partial, chain([first_task, second_task], tasks), title_lines, workers, PdfWriter, progress)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    os.replace(partial, filepath)
+    return filepath
+
+def _reporting(pages: Iterator[PageSpec], progress: Optional[ProgressCallback]) -> Iterator[PageSpec]:
+    """pass pages through, reporting the rows handed out every PDF_PAGES_PER_TASK pages and at the end."""
+    rows = 0
+    for page in pages:
+        yield page
+        rows += len(page.rows)
+        if progress and page.number % PDF_PAGES_PER_TASK == 0:
+            progress(rows)
+    if progress:
+        progress(rows)
+
+def _render_parallel(path: str, tasks: Iterator[list[PageSpec]], title_lines: list[str], workers: int, PdfWriter, progress):
+    writer = PdfWriter()
+    in_flight: deque = deque()
+    rows_done = 0
+
+    def drain(limit: int):
+        nonlocal rows_done
+        while len(in_flight) > limit:
+            future, rows = in_flight.popleft()
+            writer.append(BytesIO(future.result()))
+            rows_done += rows
+            if progress:
+                progress(rows_done)
+
+    # spawn, not fork: the caller may be a multi-threaded Qt process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for i, task in enumerate(tasks):
+            future = pool.submit(render_pages, task, title_lines if i == 0 else None)
+            in_flight.append((future, sum(len(p.rows) for p in task)))
+            # bounded look-ahead keeps memory flat while the pool stays busy
+            drain(workers * 2)
+        drain(0)
 
-    doc.build(flow)
-    return filepath
\ No newline at end of file
+    with open(path, "wb") as f:
+        writer.write(f)
@@ -0,0 +1,105 @@
+"""Exchange rates to BASE_CURRENCY, the currency of every total, budget, chart and report total.
+
+rates live in the fx_rates table, one per currency and day; an expense converts at the latest
+rate on or before its date. aggregates convert in SQL (core.repository.base_amount), in the same
+pass that sums them. single amounts (write hooks, table patches) go through rate(), an LRU cache
+in front of the table, so a burst of edits in one currency queries it once per day seen.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional
+
+from app.config import BASE_CURRENCY, CURRENCY_SYMBOLS
+from core.database import session_scope
+from core.models import scale_money
+from core import repository as repo
+from services import analytics, budget_service, events
+from services.events import RatesChanged
+
+
+def currencies() -> list[str]:
+    """BASE_CURRENCY first, then the others in CURRENCY_SYMBOLS."""
+    return [BASE_CURRENCY, *(c for c in CURRENCY_SYMBOLS if c != BASE_CURRENCY)]
+
+
+def symbol(currency: str) -> str:
+    return CURRENCY_SYMBOLS.get(currency, currency)
+
+
+def _day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+@lru_cache(maxsize=4096)
+def _rate(currency: str, day: date) -> Optional[Decimal]:
+    with session_scope() as session:
+        return repo.get_fx_rate(session, currency, datetime.combine(day, datetime.min.time()))
+
+
+def rate(currency: str, day) -> Decimal:
+    """units of BASE_CURRENCY per unit of currency on day (a date or datetime)."""
+    if currency == BASE_CURRENCY:
+        return Decimal("1")
+    value = _rate(currency, _day(day))
+    if value is None:
+        raise ValueError(f"Sem cotação de {currency} para {BASE_CURRENCY}. Cadastre uma em \"Cotações\".")
+    return value
+
+
+def to_base(amount, currency: str, day) -> Decimal:
+    """amount in BASE_CURRENCY, rounded like the SQL conversion."""
+    if currency == BASE_CURRENCY:
+        return Decimal(str(amount))
+    return scale_money(amount, rate(currency, day))
+
+
+def cache_info():
+    return _rate.cache_info()
+
+
+def invalidate_cache():
+    _rate.cache_clear()
+
+
+def list_rates(currency: Optional[str] = None):
+    with session_scope() as session:
+        return repo.get_fx_rates(session, currency)
+
+
+def set_rate(currency: str, day, value: Decimal):
+    """set the rate of currency from day on; totals of expenses already in currency are recomputed."""
+    if currency == BASE_CURRENCY:
+        raise ValueError(f"{BASE_CURRENCY} é a moeda base")
+    if value <= 0:
+        raise ValueError("a cotação deve ser positiva")
+    with session_scope() as session:
+        repo.set_fx_rate(session, currency, datetime.combine(_day(day), datetime.min.time()), value)
+        _rates_changed(session, currency)
+    _published(currency)
+
+
+def delete_rate(currency: str, day) -> bool:
+    with session_scope() as session:
+        deleted = repo.delete_fx_rate(session, currency, datetime.combine(_day(day), datetime.min.time()))
+        if deleted:
+            _rates_changed(session, currency)
+    if deleted:
+        _published(currency)
+    return deleted
+
+
+def _rates_changed(session, currency: str):
+    # the rollup stores converted totals; a rate nobody uses yet leaves it untouched
+    if not repo.currency_in_use(session, currency):
+        return
+    if not repo.get_fx_rates(session, currency):
+        raise ValueError(f"Há despesas ou recorrências em {currency}: mantenha ao menos uma cotação.")
+    repo.rebuild_monthly_totals(session)
+
+
+def _published(currency: str):
+    invalidate_cache()
+    analytics.invalidate()
+    budget_service.invalidate()
+    events.publish(RatesChanged(currency))
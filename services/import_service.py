@@ -0,0 +1,191 @@
+"""Bulk import of CSV bank statements, including files produced by export_csv."""
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional
+
+from app.config import BASE_CURRENCY
+from core.database import session_scope
+from core import repository as repo
+from services import analytics, budget_service, events, fx_service
+from services.category_service import list_categories
+
+CENTS = Decimal("0.01")
+IMPORT_CHUNK_SIZE = 5000
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%Y/%m/%d", "%d-%m-%Y")
+
+# Expense field -> CSV header, matching the columns written by export_csv
+DEFAULT_COLUMNS = {
+    "date": "Data",
+    "amount": "Valor",
+    "currency": "Moeda",
+    "category": "Categoria",
+    "description": "Descrição",
+    "source": "Origem",
+}
+
+ProgressCallback = Callable[[int], None] # receives the number of rows read so far
+
+
+@dataclass
+class RowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+
+def parse_amount(text: str) -> Decimal:
+    """accepts "1.234,56", "1234,56", "1,234.56", "1234.56" and an optional "R$" prefix.
+
+    statements list debits as negative values, so the sign is dropped.
+    """
+    t = text.strip().replace("R$", "").replace(" ", "").replace("\xa0", "")
+    if not t:
+        raise ValueError("valor vazio")
+    if "," in t and "." in t:
+        if t.rfind(",") > t.rfind("."):
+            t = t.replace(".", "").replace(",", ".")
+        else:
+            t = t.replace(",", "")
+    elif "," in t:
+        t = t.replace(",", ".")
+    try:
+        value = abs(Decimal(t)).quantize(CENTS)
+    except InvalidOperation:
+        raise ValueError(f"valor inválido: {text!r}")
+    if value == 0:
+        raise ValueError("valor zerado")
+    return value
+
+
+def parse_date(text: str) -> datetime:
+    t = text.strip()
+    # fast paths for the layouts export_csv and most bank statements use, strptime is slow
+    try:
+        if len(t) == 10 and t[4] == "-":
+            return datetime.fromisoformat(t)
+        if len(t) == 10 and t[2] == "/" and t[5] == "/":
+            return datetime(int(t[6:]), int(t[3:5]), int(t[:2]))
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(t, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida: {text!r}")
+
+
+def parse_currency(text: str, day: datetime) -> str:
+    """an ISO code ("usd", "USD"); empty means BASE_CURRENCY. the currency must have a rate."""
+    code = text.strip().upper() or BASE_CURRENCY
+    if len(code) != 3 or not code.isalpha():
+        raise ValueError(f"moeda inválida: {text!r}")
+    fx_service.rate(code, day)
+    return code
+
+
+def _sniff_delimiter(header_line: str) -> str:
+    try:
+        return csv.Sniffer().sniff(header_line, delimiters=";,\t").delimiter
+    except csv.Error:
+        return ";"
+
+
+def _column_indexes(header: list[str], columns: dict[str, str]) -> dict[str, int]:
+    positions = {name.strip().casefold(): i for i, name in enumerate(header)}
+    indexes = {}
+    for fld, name in columns.items():
+        i = positions.get(name.strip().casefold())
+        if i is not None:
+            indexes[fld] = i
+    missing = [columns[f] for f in ("date", "amount") if f not in indexes]
+    if missing:
+        raise ValueError(f"colunas obrigatórias ausentes no arquivo: {', '.join(missing)}")
+    return indexes
+
+
+def import_csv(
+    filepath: str,
+    columns: Optional[dict[str, str]] = None,
+    default_category_id: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    encoding: str = "utf-8-sig",
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> ImportResult:
+    """stream a CSV statement into the expenses table.
+
+    columns maps Expense fields (date, amount, currency, category, description, source) to header
+    names and defaults to the export_csv layout; without a currency column amounts are in BASE_CURRENCY. rows whose category is missing or unknown use
+    default_category_id, or are reported as errors when it is not given. valid rows are
+    inserted chunk_size at a time, one transaction per chunk; invalid rows are collected in
+    ImportResult.errors without stopping the import.
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    result = ImportResult()
+
+    category_ids = {c.name.casefold(): c.id for c in list_categories()}
+
+    def flush(chunk: list[dict]):
+        with session_scope() as session:
+            result.inserted += repo.bulk_insert_expenses(session, chunk)
+
+    # chunks commit one by one: a failing chunk, a raising progress callback or an interrupt
+    # midway leaves the earlier ones in the table, so the caches must still hear about them
+    try:
+        with open(filepath, "r", encoding=encoding, newline="") as f:
+            header_line = f.readline()
+            delimiter = delimiter or _sniff_delimiter(header_line)
+            indexes = _column_indexes(next(csv.reader([header_line], delimiter=delimiter)), columns)
+            reader = csv.reader(f, delimiter=delimiter)
+
+            def cell(record: list[str], fld: str) -> str:
+                i = indexes.get(fld)
+                return record[i].strip() if i is not None and i < len(record) else ""
+
+            chunk: list[dict] = []
+            line = 1
+            for line, record in enumerate(reader, start=2):
+                if not any(v.strip() for v in record):
+                    continue
+                try:
+                    cat_name = cell(record, "category")
+                    category_id = category_ids.get(cat_name.casefold()) if cat_name else None
+                    category_id = category_id or default_category_id
+                    if not category_id:
+                        raise ValueError(f"categoria desconhecida: {cat_name!r}" if cat_name else "categoria ausente")
+                    day = parse_date(cell(record, "date"))
+                    chunk.append({
+                        "amount": parse_amount(cell(record, "amount")),
+                        "date": day,
+                        "currency": parse_currency(cell(record, "currency"), day),
+                        "category_id": category_id,
+                        "description": cell(record, "description"),
+                        "source": cell(record, "source")[:50],
+                    })
+                except ValueError as e:
+                    result.errors.append(RowError(line, str(e)))
+                    continue
+
+                if len(chunk) >= chunk_size:
+                    flush(chunk)
+                    chunk = []
+                    if progress:
+                        progress(line - 1)
+
+            flush(chunk)
+            if progress:
+                progress(line - 1)
+    finally:
+        if result.inserted:
+            analytics.invalidate()
+            budget_service.invalidate()
+            events.publish(events.ExpensesImported(result.inserted))
+    return result
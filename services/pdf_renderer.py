@@ -0,0 +1,108 @@
+"""Page-at-a-time PDF rendering for expense reports.
+
+kept free of database and Qt imports: render_pages runs inside ProcessPoolExecutor workers.
+every page is its own fixed-size Table, so reportlab never has to split one huge table.
+"""
+from io import BytesIO
+from typing import IO, Iterable, NamedTuple, Optional, Union
+
+from app.config import BASE_CURRENCY, CURRENCY_SYMBOLS
+
+ROWS_PER_PAGE = 38
+FIRST_PAGE_ROWS = 32  # room for the title and period lines
+HEADER = ["Data", f"Valor ({CURRENCY_SYMBOLS.get(BASE_CURRENCY, BASE_CURRENCY)})", "Categoria", "Descrição", "Origem"]
+
+
+class PageSpec(NamedTuple):
+    number: int
+    rows: list[tuple[str, str, str, str, str]]
+    footer: str  # running total up to this page, or the grand total on the last page
+
+
+def format_amount(value) -> str:
+    return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def render_pages(
+    pages: Iterable[PageSpec],
+    title_lines: Optional[list[str]] = None,
+    out: Union[str, IO[bytes], None] = None,
+) -> Optional[bytes]:
+    """render consecutive pages into a standalone PDF; title_lines go above the first one.
+
+    pages may be a generator, consumed as the layout goes. the PDF is written to out (a path or
+    binary file) when given, else returned as bytes.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    class LazyDocTemplate(SimpleDocTemplate):
+        """refills the flow list passed to build() from chunks each time the layout empties it.
+
+        pages are built into Tables only when the layout reaches them, so a long report never
+        holds every row and Table at once. build() hands handle_flowable that list while it is
+        non-empty, and its own internal lists too (checked against reportlab 5.0.1, see
+        requirements.txt).
+        """
+
+        def handle_flowable(self, flowables):
+            super().handle_flowable(flowables)
+            if flowables is flow and not flowables:
+                flowables.extend(next(chunks, ()))
+
+    buf = BytesIO() if out is None else out
+    doc = LazyDocTemplate(
+        buf,
+        pagesize = A4,
+        rightMargin = 2 * cm,
+        leftMargin = 2 * cm,
+        topMargin = 2 * cm,
+        bottomMargin = 2 * cm,
+    )
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "CustomTitle",
+        parent=styles["Heading1"],
+        fontSize=18,
+        spaceAfter=12,
+    )
+    table_style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#6366f1")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 10),
+            ("FONTSIZE", (0, 1), (-1, -1), 8),
+            ("BACKGROUND", (0, 1), (-1, -2), colors.white),
+            ("GRID", (0, 0), (-1, -2), 0.5, colors.lightgrey),
+            ("LINEABOVE", (0, -1), (-1, -1), 1, colors.grey),
+            ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+        ]
+    )
+    col_widths = [2 * cm, 2.5 * cm, 3 * cm, 6 * cm, 2.5 * cm]
+
+    flow = []
+    if title_lines:
+        flow.append(Paragraph(title_lines[0], title_style))
+        for line in title_lines[1:]:
+            flow.append(Paragraph(line, styles["Normal"]))
+        flow.append(Spacer(1, 0.5 * cm))
+
+    def tables():
+        for i, page in enumerate(pages):
+            data = [HEADER, *page.rows, ["", page.footer, "", "", f"Página {page.number}"]]
+            table = Table(data, colWidths=col_widths, rowHeights=0.55 * cm, repeatRows=0)
+            table.setStyle(table_style)
+            yield [PageBreak(), table] if i else [table]
+
+    chunks = tables()
+    if not flow:
+        flow.extend(next(chunks, ()))
+    doc.build(flow)
+    return buf.getvalue() if out is None else None
@@ -0,0 +1,164 @@
+"""Recurring expenses: templates for fixed costs and the materializer that turns them into expenses.
+
+materialize_due() runs at startup (main.py) and after a template is created. it writes every
+occurrence due up to today in one transaction and one bulk insert, so catching up after months
+without opening the app costs about as much as a single save. the (recurring_id, date) key on
+expenses makes it idempotent.
+"""
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterator, Optional
+
+from app.config import BASE_CURRENCY
+from core.database import session_scope
+from core import repository as repo
+from services import analytics, budget_service, events, fx_service
+from services.events import ExpensesImported
+
+FREQUENCIES = {
+    "daily": "Todo dia",
+    "weekly": "Toda semana",
+    "monthly": "Todo mês",
+    "yearly": "Todo ano",
+}
+
+
+def occurrence(frequency: str, interval: int, start: datetime, n: int) -> datetime:
+    """the n-th (0-based) date of the schedule; months shorter than start's day use their last day."""
+    step = n * interval
+    if frequency == "daily":
+        return start + timedelta(days=step)
+    if frequency == "weekly":
+        return start + timedelta(weeks=step)
+    if frequency not in ("monthly", "yearly"):
+        raise ValueError(f"frequência desconhecida: {frequency!r}")
+    months = step if frequency == "monthly" else step * 12
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    month += 1
+    return start.replace(year=year, month=month, day=min(start.day, monthrange(year, month)[1]))
+
+
+def _first_index_after(frequency: str, interval: int, start: datetime, after: datetime) -> int:
+    """an index no later than that of the first occurrence after `after`, so catching up skips the past."""
+    if frequency in ("daily", "weekly"):
+        return max(0, (after - start).days // (interval * (7 if frequency == "weekly" else 1)))
+    months = (after.year - start.year) * 12 + after.month - start.month
+    return max(0, months // (interval * (12 if frequency == "yearly" else 1)))
+
+
+def occurrences(
+    frequency: str,
+    interval: int,
+    start: datetime,
+    through: datetime,
+    after: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    count: Optional[int] = None,
+) -> Iterator[datetime]:
+    """dates of the schedule in (after, through], stopping at until and after count occurrences."""
+    last = min(through, until) if until else through
+    n = _first_index_after(frequency, interval, start, after) if after else 0
+    while count is None or n < count:
+        day = occurrence(frequency, interval, start, n)
+        if day > last:
+            return
+        if after is None or day > after:
+            yield day
+        n += 1
+
+
+def list_recurring(active_only: bool = False):
+    with session_scope() as session:
+        return repo.get_recurring_expenses(session, active_only=active_only)
+
+
+def next_occurrence(rec) -> Optional[datetime]:
+    """the first date of rec not materialized yet, or None when the schedule has ended."""
+    after = rec.materialized_until
+    for day in occurrences(rec.frequency, rec.interval, rec.start_date, datetime.max, after, rec.until, rec.count):
+        return day
+    return None
+
+
+def create_recurring(
+    amount: Decimal,
+    category_id: str,
+    start_date: datetime,
+    frequency: str = "monthly",
+    interval: int = 1,
+    description: str = "",
+    source: str = "",
+    until: Optional[datetime] = None,
+    count: Optional[int] = None,
+    currency: str = BASE_CURRENCY,
+):
+    """a new template; its occurrences are only written by the next materialize_due()."""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"frequência desconhecida: {frequency!r}")
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("intervalo e número de repetições devem ser positivos")
+    fx_service.rate(currency, start_date)
+    with session_scope() as session:
+        return repo.create_recurring_expense(
+            session, amount, category_id, start_date, frequency, interval, description, source, until, count,
+            currency,
+        )
+
+
+def set_active(recurring_id: str, active: bool) -> bool:
+    """pause or resume a template; occurrences missed while paused are not written."""
+    # resume from today rather than catching up on the paused period
+    yesterday = datetime.combine(date.today() - timedelta(days=1), datetime.max.time())
+    with session_scope() as session:
+        return repo.set_recurring_expense_active(session, recurring_id, active, yesterday)
+
+
+def delete_recurring(recurring_id: str) -> bool:
+    """remove a template; the expenses it produced are kept."""
+    with session_scope() as session:
+        return repo.delete_recurring_expense(session, recurring_id)
+
+
+def materialize_due(through: Optional[date] = None, skipped: Optional[list] = None) -> int:
+    """write every occurrence due on or before through (default today); returns how many were inserted.
+
+    a template whose currency has no exchange rate is left for a later run; its description (or
+    id) is appended to skipped when a list is given.
+    """
+    end = datetime.combine(through or date.today(), datetime.max.time())
+    with session_scope() as session:
+        rows = []
+        for rec in repo.get_due_recurring_expenses(session, end):
+            days = list(occurrences(
+                rec.frequency, rec.interval, rec.start_date, end, rec.materialized_until, rec.until, rec.count
+            ))
+            if not days:
+                continue
+            try:
+                fx_service.rate(rec.currency, days[0])
+            except ValueError:
+                if skipped is not None:
+                    skipped.append(rec.description or rec.id)
+                continue
+            rows.extend(
+                {
+                    "amount": rec.amount,
+                    "date": day,
+                    "category_id": rec.category_id,
+                    "description": rec.description or "",
+                    "source": rec.source or "",
+                    "currency": rec.currency,
+                    "recurring_id": rec.id,
+                }
+                for day in days
+            )
+            rec.materialized_until = days[-1]
+        inserted = repo.insert_recurring_occurrences(session, rows)
+
+    if inserted:
+        analytics.invalidate()
+        budget_service.invalidate()
+        events.publish(ExpensesImported(len(inserted)))
+    return len(inserted)
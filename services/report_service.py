@@ -0,0 +1,138 @@
+"""Batch reports: CSV and PDF files for many periods and categories, rendered in a process pool.
+
+every job reads the same database snapshot (core.database.snapshot_database), so a batch is
+consistent even while the app keeps writing. report.py is the command line front end.
+"""
+import multiprocessing
+import re
+import time
+import unicodedata
+from calendar import monthrange
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from core.database import set_default_db_path
+from services import export_service
+
+FORMATS = ("pdf", "csv")  # PDFs first: the slowest jobs start while the pool is empty
+
+
+@dataclass(frozen=True)
+class Period:
+    label: str  # used in file names
+    date_from: datetime
+    date_to: datetime
+
+
+@dataclass(frozen=True)
+class ReportJob:
+    kind: str  # "csv" or "pdf"
+    period: Period
+    category_id: Optional[str]  # None: every category in one report
+    category_label: str
+    path: str
+
+
+@dataclass(frozen=True)
+class JobResult:
+    job: ReportJob
+    seconds: float
+    empty: bool = False  # no expenses in the period: nothing written
+    error: Optional[str] = None
+
+
+def parse_period(text: str) -> Period:
+    """YYYY (a year), YYYY-MM (a month) or YYYY-MM-DD:YYYY-MM-DD (both days included)."""
+    t = text.strip()
+    try:
+        if ":" in t:
+            start, end = (date.fromisoformat(p.strip()) for p in t.split(":", 1))
+            label = f"{start:%Y%m%d}-{end:%Y%m%d}"
+        elif re.fullmatch(r"\d{4}-\d{2}", t):
+            year, month = map(int, t.split("-"))
+            start, end = date(year, month, 1), date(year, month, monthrange(year, month)[1])
+            label = t
+        elif re.fullmatch(r"\d{4}", t):
+            start, end = date(int(t), 1, 1), date(int(t), 12, 31)
+            label = t
+        else:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"período inválido: {text!r} (use AAAA, AAAA-MM ou AAAA-MM-DD:AAAA-MM-DD)")
+    if end < start:
+        raise ValueError(f"período invertido: {text!r}")
+    return Period(label, datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.max.time()))
+
+
+def _slug(text: str) -> str:
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_text.lower()).strip("-") or "categoria"
+
+
+def plan_jobs(
+    periods: list[Period],
+    categories: list[tuple[Optional[str], str]],
+    formats: tuple[str, ...],
+    out_dir: str,
+) -> list[ReportJob]:
+    """one job per (format, period, category); categories are (category_id or None, label)."""
+    jobs = []
+    for kind in (f for f in FORMATS if f in formats):
+        for period in periods:
+            for category_id, label in categories:
+                name = f"despesas_{period.label}_{_slug(label)}.{kind}"
+                jobs.append(ReportJob(kind, period, category_id, label, str(Path(out_dir) / name)))
+    return jobs
+
+
+def _init_worker(db_path: str):
+    set_default_db_path(db_path)
+
+
+def run_job(job: ReportJob) -> JobResult:
+    export = export_service.export_pdf if job.kind == "pdf" else export_service.export_csv
+    kwargs = {"workers": 1} if job.kind == "pdf" else {}  # the batch is already spread over processes
+    t = time.perf_counter()
+    try:
+        export(job.path, job.period.date_from, job.period.date_to, job.category_id, **kwargs)
+    except export_service.NoExpensesError:
+        return JobResult(job, time.perf_counter() - t, empty=True)
+    except Exception as e:
+        return JobResult(job, time.perf_counter() - t, error=f"{type(e).__name__}: {e}")
+    return JobResult(job, time.perf_counter() - t)
+
+
+def run_jobs(
+    jobs: list[ReportJob],
+    snapshot_path: str,
+    workers: int,
+    on_done: Optional[Callable[[JobResult], None]] = None,
+) -> list[JobResult]:
+    """render every job against snapshot_path; results come back (and on_done runs) as jobs finish."""
+    for job in jobs:
+        Path(job.path).parent.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    if workers <= 1 or len(jobs) <= 1:
+        _init_worker(snapshot_path)
+        for job in jobs:
+            results.append(run_job(job))
+            if on_done:
+                on_done(results[-1])
+        return results
+
+    # spawn: the workers start clean and open the snapshot themselves
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(snapshot_path,),
+    ) as pool:
+        for future in as_completed([pool.submit(run_job, job) for job in jobs]):
+            results.append(future.result())
+            if on_done:
+                on_done(results[-1])
+    return results
@@ -0,0 +1,221 @@
+"""Lazily populated expenses table: model plus a painted edit/delete actions column."""
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QEvent, QModelIndex, QRect, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QPen
+from PyQt6.QtWidgets import QStyledItemDelegate
+
+from services.expense_service import list_expenses_page
+from ui.loader import DataLoader
+from ui.styles.theme import COLORS
+from ..utils import _format_currency
+
+HEADERS = ["Data", "Valor", "Categoria", "Descrição", "Banco", "Ações"]
+ACTIONS_COLUMN = 5
+
+
+class ExpensesTableModel(QAbstractTableModel):
+    """rows are fetched from the service page by page as the view scrolls (canFetchMore/fetchMore).
+
+    pages load on a worker thread; loadingChanged reports when a page is in flight and
+    loadFailed carries the error of a page that could not be loaded.
+    single rows can be patched in place (upsert_row / remove_row) after a data event.
+    """
+    loadingChanged = pyqtSignal(bool)
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self, batch_size: int = 200, parent=None):
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self._loader = DataLoader(self)
+        self._filters: dict = {}
+        self._rows: list[tuple] = []  # (expense_id, date, amount, category, description, source)
+        self._keys: list[tuple] = []  # sort key of each row: (date, created_at, id), descending
+        self._cursor: Optional[str] = None
+        self._exhausted = True
+
+    def set_filters(self, **filters):
+        # replacing the "page" request drops any page still loading for the old filters
+        self._loader.cancel("page")
+        self.beginResetModel()
+        self._filters = filters
+        self._rows = []
+        self._keys = []
+        self._cursor = None
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def is_loading(self) -> bool:
+        return self._loader.is_loading("page")
+
+    def filters(self) -> dict:
+        return dict(self._filters)
+
+    def _find(self, expense_id: str) -> int:
+        return next((i for i, row in enumerate(self._rows) if row[0] == expense_id), -1)
+
+    def _position(self, key: tuple) -> int:
+        """index where a row with this sort key goes, keeping the descending order."""
+        lo, hi = 0, len(self._keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._keys[mid] > key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def remove_row(self, expense_id: str) -> bool:
+        i = self._find(expense_id)
+        if i < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), i, i)
+        del self._rows[i], self._keys[i]
+        self.endRemoveRows()
+        return True
+
+    def upsert_row(self, expense, category_name: str):
+        """show expense (a services.events.ExpenseState), which matches the filters.
+
+        a row that sorts after the last loaded page is left for fetchMore to bring in.
+        """
+        key = self._sort_key(expense)
+        row = self._to_row(expense, category_name)
+        i = self._find(expense.id)
+        if i >= 0:
+            in_place = (i == 0 or self._keys[i - 1] > key) and (i == len(self._keys) - 1 or key > self._keys[i + 1])
+            if in_place:
+                self._rows[i], self._keys[i] = row, key
+                self.dataChanged.emit(self.index(i, 0), self.index(i, ACTIONS_COLUMN - 1))
+                return
+            self.remove_row(expense.id)
+
+        pos = self._position(key)
+        if pos == len(self._rows) and not self._exhausted:
+            return
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, row)
+        self._keys.insert(pos, key)
+        self.endInsertRows()
+
+    def expense_id(self, row: int) -> Optional[str]:
+        if 0 <= row < len(self._rows):
+            return self._rows[row][0]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole and col < ACTIONS_COLUMN:
+            return row[col + 1]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.UserRole:
+            return row[0]
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self._exhausted and not self.is_loading()
+
+    def fetchMore(self, parent):
+        if parent.isValid() or self._exhausted or self.is_loading():
+            return
+        self._loader.request(
+            "page", list_expenses_page, self._cursor, self.batch_size, **self._filters,
+            on_result=self._on_page, on_error=self._on_page_error,
+        )
+        self.loadingChanged.emit(True)
+
+    def _on_page(self, page):
+        batch, self._cursor = page
+        if self._cursor is None:
+            self._exhausted = True
+        self.loadingChanged.emit(False)
+        if not batch:
+            return
+
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+        self._rows.extend(self._to_row(e, e.category_name) for e in batch)
+        self._keys.extend(self._sort_key(e) for e in batch)
+        self.endInsertRows()
+
+    def _on_page_error(self, error: Exception):
+        self._exhausted = True
+        self.loadingChanged.emit(False)
+        self.loadFailed.emit(str(error))
+
+    @staticmethod
+    def _sort_key(e) -> tuple:
+        return (e.date, e.created_at or datetime.min, e.id)
+
+    @staticmethod
+    def _to_row(e, category_name: str) -> tuple:
+        return (
+            e.id,
+            e.date.strftime("%d/%m/%Y") if e.date is not None else "",
+            _format_currency(Decimal(str(e.amount)), e.currency),
+            category_name,
+            (e.description or "")[:25],
+            str(e.source or ""),
+        )
+
+
+class ActionsDelegate(QStyledItemDelegate):
+    """draws Edit/Delete buttons in every row without creating a widget per row."""
+    editRequested = pyqtSignal(int)
+    deleteRequested = pyqtSignal(int)
+
+    EDIT_SIZE = (40, 24)
+    DELETE_SIZE = (60, 24)
+    SPACING = 6
+
+    def _button_rects(self, rect: QRect) -> tuple[QRect, QRect]:
+        (ew, eh), (dw, dh) = self.EDIT_SIZE, self.DELETE_SIZE
+        x = rect.center().x() - (ew + self.SPACING + dw) // 2
+        edit = QRect(x, rect.center().y() - eh // 2, ew, eh)
+        delete = QRect(x + ew + self.SPACING, rect.center().y() - dh // 2, dw, dh)
+        return edit, delete
+
+    def paint(self, painter, option, index):
+        edit, delete = self._button_rects(option.rect)
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        font = painter.font()
+        font.setPixelSize(12)
+        painter.setFont(font)
+        for rect, text, color in ((edit, "Edit", "#314ede"), (delete, "Delete", "#d61a1a")):
+            painter.setPen(QPen(QColor(COLORS["border"]), 1))
+            painter.setBrush(QColor(COLORS["bg_tertiary"]))
+            painter.drawRoundedRect(rect, 8, 8)
+            painter.setPen(QColor(color))
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            edit, delete = self._button_rects(option.rect)
+            pos = event.position().toPoint()
+            if edit.contains(pos):
+                self.editRequested.emit(index.row())
+                return True
+            if delete.contains(pos):
+                self.deleteRequested.emit(index.row())
+                return True
+        return super().editorEvent(event, model, option, index)
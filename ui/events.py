@@ -0,0 +1,33 @@
+"""Delivers services.events to the views on the GUI thread."""
+from typing import Optional
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from services import events
+
+
+class DataEventBridge(QObject):
+    """re-emits every data event as a Qt signal.
+
+    connected queued, so a view handles the event after the call that made the write has
+    returned, whichever thread made it (a dialog on the GUI thread or a DataLoader worker).
+    """
+    received = pyqtSignal(object)  # services.events.DataEvent
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        events.subscribe(events.DataEvent, self.received.emit)
+
+    def subscribe(self, slot):
+        self.received.connect(slot, Qt.ConnectionType.QueuedConnection)
+
+
+_bridge: Optional[DataEventBridge] = None
+
+
+def data_events() -> DataEventBridge:
+    """the bridge; created on first use, which must happen on the GUI thread."""
+    global _bridge
+    if _bridge is None:
+        _bridge = DataEventBridge()
+    return _bridge
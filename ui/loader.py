@@ -0,0 +1,117 @@
+"""Runs service calls on a QThreadPool and delivers the results back on the GUI thread."""
+import inspect
+import traceback
+from functools import partial
+from typing import Any, Callable, Optional
+
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+
+from core import instrumentation
+
+
+class _Request:
+    __slots__ = ("key", "on_result", "on_error", "cancelled", "future")
+
+    def __init__(self, key: str, on_result: Callable[[Any], None], on_error: Optional[Callable[[Exception], None]]):
+        self.key = key
+        self.on_result = on_result
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None  # set for coroutine functions, which run on the services.aio loop
+
+
+class DataLoader(QObject):
+    """one in-flight request per key: a new request for the same key supersedes the previous one.
+
+    superseded requests that have not started yet are skipped, and results of the ones
+    already running are dropped, so a burst of filter changes only renders the last answer.
+    fn may be a coroutine function (services.aio): it then runs on the asyncio loop instead
+    of the thread pool, and superseding it cancels the task.
+    """
+    _finished = pyqtSignal(object, object)  # (request, result)
+    _failed = pyqtSignal(object, object)  # (request, exception)
+
+    def __init__(self, parent=None, pool: Optional[QThreadPool] = None):
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._latest: dict[str, _Request] = {}
+        self._owner = type(parent).__name__  # names the instrumentation scopes
+        # emitted from worker threads, delivered queued on the thread owning the loader
+        self._finished.connect(self._on_finished)
+        self._failed.connect(self._on_failed)
+
+    def request(
+        self,
+        key: str,
+        fn: Callable[..., Any],
+        *args,
+        on_result: Callable[[Any], None],
+        on_error: Optional[Callable[[Exception], None]] = None,
+        **kwargs,
+    ):
+        self.cancel(key)
+        req = _Request(key, on_result, on_error)
+        self._latest[key] = req
+        if inspect.iscoroutinefunction(fn):
+            from services import aio
+
+            req.future = aio.submit(self._run_async(req, fn, args, kwargs))
+        else:
+            self._pool.start(partial(self._run, req, fn, args, kwargs))
+
+    def cancel(self, key: str):
+        req = self._latest.pop(key, None)
+        if req is not None:
+            req.cancelled = True
+            if req.future is not None:
+                req.future.cancel()
+
+    def is_loading(self, key: str) -> bool:
+        return key in self._latest
+
+    def _run(self, req: _Request, fn, args, kwargs):
+        if req.cancelled:
+            return
+        try:
+            # e.g. "ExpensesView.summary": the query counts of one refresh of one view
+            with instrumentation.scope(f"{self._owner}.{req.key}"):
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            result, failed = e, True
+        else:
+            failed = False
+        self._deliver(req, result, failed)
+
+    async def _run_async(self, req: _Request, fn, args, kwargs):
+        try:
+            with instrumentation.scope(f"{self._owner}.{req.key}"):
+                result = await fn(*args, **kwargs)
+        except Exception as e:
+            result, failed = e, True
+        else:
+            failed = False
+        self._deliver(req, result, failed)
+
+    def _deliver(self, req: _Request, result, failed: bool):
+        try:
+            (self._failed if failed else self._finished).emit(req, result)
+        except RuntimeError:
+            pass  # the loader's view was destroyed (window closed) while fn was running
+
+    def _take(self, req: _Request) -> bool:
+        if req.cancelled or self._latest.get(req.key) is not req:
+            return False
+        del self._latest[req.key]
+        return True
+
+    def _on_finished(self, req: _Request, result):
+        if self._take(req):
+            req.on_result(result)
+
+    def _on_failed(self, req: _Request, error: Exception):
+        if not self._take(req):
+            return
+        if req.on_error:
+            req.on_error(error)
+        else:
+            traceback.print_exception(error)
@@ -1,10 +1,13 @@
-from PyQt6.QtCore import Qt
+from typing import Optional
+
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import (
     QFrame,
     QGridLayout,
     QHBoxLayout,
     QLabel,
     QMainWindow,
+    QMessageBox,
     QPushButton,
     QScrollArea,
     QSizePolicy,
@@ -13,11 +16,11 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
-from ui.views.dashboard_view import DashboardView
-from ui.views.expenses_view import ExpensesView
-from ui.views.categories_view import CategoriesView
+from app.startup import profile
+from services import budget_service
 from ui.styles.theme import get_stylesheet, COLORS
 from ui.styles.fonts import load_fonts
+from ui.utils import _format_currency
 
 class NavButton(QPushButton):
     def __init__(self, text: str, icon_char: str = "", parent=None):
@@ -28,15 +31,31 @@ class NavButton(QPushButton):
         self.setMinimumHeight(44)
         self.setProperty("nav", True)
 
+def _dashboard_view(parent):
+    from ui.views.dashboard_view import DashboardView
+    return DashboardView(parent)
+
+def _expenses_view(parent):
+    from ui.views.expenses_view import ExpensesView
+    return ExpensesView(parent)
+
+def _categories_view(parent):
+    from ui.views.categories_view import CategoriesView
+    return CategoriesView(parent)
+
 class MainWindow(QMainWindow):
+    """only the dashboard is built at startup; the other views (and their imports) on first open."""
+    budget_crossed = pyqtSignal(object)  # budget_service.ThresholdCrossing
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Expense Tracker")
         self.setMinimumSize(1000, 700)
         self.resize(1200, 800)
 
-        font_family = load_fonts()
-        self.setStyleSheet(get_stylesheet(font_family))
+        with profile.phase("fonts and stylesheet"):
+            font_family = load_fonts()
+            self.setStyleSheet(get_stylesheet(font_family))
 
         central = QWidget()
         self.setCentralWidget(central)
@@ -82,22 +101,16 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
         self.stack.setStyleSheet("background: transparent;")
 
-        self.dashboard_view = DashboardView(self)
-        self.expenses_view = ExpensesView(self)
-        self.categories_view = CategoriesView(self)
-
-        self.stack.addWidget(self.dashboard_view)
-        self.stack.addWidget(self.expenses_view)
-        self.stack.addWidget(self.categories_view)
-
         nav_items = [
-            ("Dashboard", "📊", 0),
-            ("Expenses", "📝", 1),
-            ("Categories", "📁", 2),
+            ("Dashboard", "📊", 0, _dashboard_view),
+            ("Expenses", "📝", 1, _expenses_view),
+            ("Categories", "📁", 2, _categories_view),
         ]
+        self._view_factories = [factory for *_, factory in nav_items]
+        self._views: list[Optional[QWidget]] = [None] * len(nav_items)
 
         self.nav_buttons = []
-        for text, icon, index in nav_items:
+        for text, icon, index, _ in nav_items:
             btn = self.create_nav_button(text, icon, index)
             sidebar_layout.addWidget(btn)
             self.nav_buttons.append(btn)
@@ -106,27 +119,51 @@ class MainWindow(QMainWindow):
         sidebar_layout.addStretch()
         layout.addWidget(sidebar)
         layout.addWidget(self.stack, 1)
-        self.dashboard_view.refresh()
-        
+        self._go_to(0)
+
+        # crossings are reported on the thread that made the write; queued so the alert shows after it returns
+        self.budget_crossed.connect(self._show_budget_alert, Qt.ConnectionType.QueuedConnection)
+        self._budget_listener = self.budget_crossed.emit
+        budget_service.add_crossing_listener(self._budget_listener)
+
+    def _view(self, index: int) -> QWidget:
+        view = self._views[index]
+        if view is None:
+            factory = self._view_factories[index]
+            with profile.phase(f"build {factory.__name__.strip('_')}"):
+                view = factory(self)
+            self._views[index] = view
+            self.stack.addWidget(view)
+        return view
+
     def _go_to(self, index: int):
         for i, btn in enumerate(self.nav_buttons):
             btn.setChecked(i == index)
-        self.stack.setCurrentIndex(index)
-        if index == 0:
-            self.dashboard_view.refresh()
-        elif index == 1:
-            self.expenses_view.refresh()
-        elif index == 2:
-            self.categories_view.refresh()
+        view = self._view(index)
+        self.stack.setCurrentWidget(view)
+        view.refresh()
 
     def refresh_current_view(self):
-        idx = self.stack.currentIndex()
-        if idx == 0:
-            self.dashboard_view.refresh()
-        elif idx == 1:
-            self.expenses_view.refresh()
-        elif idx == 2:
-            self.categories_view.refresh()
+        view = self.stack.currentWidget()
+        if view is not None:
+            view.refresh()
+
+    def _show_budget_alert(self, crossing):
+        if crossing.threshold < budget_service.EXCEEDED_RATIO and crossing.spent >= crossing.limit:
+            return  # the same write also crossed the limit itself, which gets its own alert
+        if crossing.threshold >= budget_service.EXCEEDED_RATIO:
+            text = f"O limite de {crossing.name} foi atingido/ultrapassado"
+        else:
+            text = f"{crossing.name} atingiu {crossing.threshold:.0%} do limite"
+        QMessageBox.warning(
+            self, "Limite de gastos",
+            f"{text} em {crossing.year_month}.\n\n"
+            f"Gasto: {_format_currency(crossing.spent)}\nLimite: {_format_currency(crossing.limit)}",
+        )
+
+    def closeEvent(self, event):
+        budget_service.remove_crossing_listener(self._budget_listener)
+        super().closeEvent(event)
 
     def create_nav_button(self, text: str, icon: str = "", index: int = 0) -> NavButton:
         btn = NavButton(text, icon)
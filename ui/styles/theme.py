@@ -1,7 +1,3 @@
-
-from turtle import color
-
-
 COLORS = {
     "bg_primary": "#0f0f0f",
     "bg_secondary": "#18181b",
@@ -201,7 +197,7 @@ def get_stylesheet(font_family: str = "Poppins, Segoe UI, sans-serif") -> str:
     }}
 
     /* Table */
-    QTableWidget {{
+    QTableView {{
         background-color: {COLORS["bg_secondary"]};
         alternate-background-color: {COLORS["bg_card"]};
         color: {COLORS["text_primary"]};
@@ -211,12 +207,12 @@ def get_stylesheet(font_family: str = "Poppins, Segoe UI, sans-serif") -> str:
         padding: 4px;
     }}
 
-    QTableWidget::item {{
+    QTableView::item {{
         padding: 10px 12px;
         font-size: 13px;
     }}
 
-    QTableWidget::item:selected {{
+    QTableView::item:selected {{
         background-color: {COLORS["accent_soft"]};
         color: {COLORS["text_primary"]};
     }}
@@ -1,14 +1,17 @@
 from datetime import datetime
 from decimal import Decimal
 
+from app.config import BASE_CURRENCY, CURRENCY_SYMBOLS
+
 MESES = ("janeiro", "fevereiro", "março", "abril", "maio", "junho",
             "julho", "agosto", "setembro", "outubro", "novembro", "dezembro")
 
 def _month_year_pt(dt: datetime) -> str:
     return f"{MESES[dt.month - 1]}, {dt.year}"
 
-def _format_currency(value: Decimal) -> str:
-    return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+def _format_currency(value: Decimal, currency: str = BASE_CURRENCY) -> str:
+    symbol = CURRENCY_SYMBOLS.get(currency, currency)
+    return f"{symbol} {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 def _safe_call(obj, method_name, *args, **kwargs):
     """no intuito de evitar erros do pylance, simplesmente chama o método se existir."""
@@ -23,9 +23,12 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QColor
 
-from core.database import session_scope
-from core import repository as repo
-from services.category_service import list_categories, create_category, update_category, delete_category
+from app.config import BASE_CURRENCY, CURRENCY_SYMBOLS
+from services.budget_service import evaluate_month, list_categories_with_budget
+from services.category_service import create_category, update_category, delete_category
+from services.events import CategoryChanged, ExpensesImported, ExpenseUpdated, RatesChanged
+from ui.events import data_events
+from ui.loader import DataLoader
 from ui.styles.theme import COLORS
 from ..utils import _format_currency, _safe_call, _hex_to_rgb
 
@@ -50,7 +53,7 @@ class CategoryFormDialog(QDialog):
         self.limit_edit = QDoubleSpinBox()
         self.limit_edit.setRange(0, 99999999.99)
         self.limit_edit.setDecimals(2)
-        self.limit_edit.setPrefix("R$ ")
+        self.limit_edit.setPrefix(f"{CURRENCY_SYMBOLS.get(BASE_CURRENCY, BASE_CURRENCY)} ")
         self.limit_edit.setSpecialValueText("Sem limite")
         self.limit_edit.setValue(0)
         form.addRow("Limite mensal (opcional)", self.limit_edit)
@@ -113,6 +116,9 @@ class CategoriesView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.main_window = parent
+        self.loader = DataLoader(self)
+        self._rows_by_id: dict[str, int] = {}
+        data_events().subscribe(self._on_data_event)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(32, 32, 32, 32)
 
@@ -129,6 +135,11 @@ class CategoriesView(QWidget):
         header.addWidget(self.add_btn)
         layout.addLayout(header)
 
+        self.loading_label = QLabel("Carregando...")
+        self.loading_label.setProperty("class", "muted")
+        self.loading_label.setVisible(False)
+        layout.addWidget(self.loading_label)
+
         self.alert_frame = QFrame()
         self.alert_frame.setVisible(False)
         self.alert_layout = QVBoxLayout(self.alert_frame)
@@ -147,15 +158,11 @@ class CategoriesView(QWidget):
         self.table.setHorizontalHeaderLabels(["Nome", "Cor", "Limite mensal", "Gasto atual*", "Ações"])        
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
         layout.addWidget(self.table)
-        self.refresh()
+        # filled by refresh(), which MainWindow calls whenever the view is shown
 
     def _open_form(self, category=None):
-        d = CategoryFormDialog(self, category)
-        if d.exec():
-            
-            self.refresh()
-            if self.main_window:
-                self.main_window.refresh_current_view()
+        # the table is reloaded from the CategoryChanged event the write publishes
+        CategoryFormDialog(self, category).exec()
 
     def _delete_category(self, category_id: str):
         if QMessageBox.question(
@@ -164,37 +171,43 @@ class CategoriesView(QWidget):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No,
         ) == QMessageBox.StandardButton.Yes:
-            if delete_category(category_id):
-                self.refresh()
-                if self.main_window:
-                    self.main_window.refresh_current_view()
-            else:
+            if not delete_category(category_id):
                 QMessageBox.warning(self, "Erro", "Categoria do sistema não pode ser excluída.")
 
     def refresh(self):
-        categories = list_categories()
-        self.table.setRowCount(len(categories))
+        year_month = datetime.now().strftime("%Y-%m")
 
-        today = datetime.now().date()
-        start_month = datetime(today.year, today.month, 1)
-        end_month = datetime.now()
+        self.loading_label.setText("Carregando...")
+        self.loading_label.setVisible(True)
+        self.loader.request(
+            "categories", list_categories_with_budget, year_month,
+            on_result=lambda result: self._render(*result),
+            on_error=lambda e: self.loading_label.setText(f"Erro ao carregar categorias: {e}"),
+        )
+
+    def _on_data_event(self, event):
+        if not self.isVisible():
+            return  # refreshed when navigated to
+        if isinstance(event, (CategoryChanged, ExpensesImported, RatesChanged)):
+            self.refresh()
+            return
+        states = (event.before, event.after) if isinstance(event, ExpenseUpdated) else (event.expense,)
+        year_month = datetime.now().strftime("%Y-%m")
+        if any(s.date.strftime("%Y-%m") == year_month for s in states):
+            # only the spending columns and the alerts change: one aggregate query, no rows rebuilt
+            self.loader.request(
+                "budget", lambda: {s.category_id: s for s in evaluate_month(year_month)},
+                on_result=self._apply_statuses,
+            )
+
+    def _render(self, categories, statuses: dict):
+        self.loading_label.setVisible(False)
+        self.table.setRowCount(len(categories))
+        self._rows_by_id = {str(cat.id): row for row, cat in enumerate(categories)}
 
-        with session_scope() as session:
-            totals = repo.get_total_by_category_in_period(session, start_month, end_month)
-            spent_by_cat = {cid: total for cid, _, total in totals}
-            
-        alert_widgets = []
         for row, cat in enumerate(categories):
-            limit = Decimal(str(cat.monthly_limit)) if cat.monthly_limit is not None else Decimal("0")
-            spent = spent_by_cat.get(str(cat.id), Decimal("0"))
-            
-            data = [
-                cat.name,
-                cat.color or "",
-                _format_currency(limit) if float(limit) > 0 else "-",
-                _format_currency(spent),
-            ]
-            
+            data = [cat.name, cat.color or ""]
+
             for col, value in enumerate(data):
                 item = QTableWidgetItem(value)
                 item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -235,6 +248,24 @@ class CategoriesView(QWidget):
             actions_layout.addWidget(del_btn)
             self.table.setCellWidget(row, 4, actions)
 
+        self._apply_statuses(statuses)
+
+    def _apply_statuses(self, statuses: dict):
+        """limit and spending columns plus the alerts, from {category_id: BudgetStatus}."""
+        alert_widgets = []
+        for category_id, row in self._rows_by_id.items():
+            status = statuses.get(category_id)
+            # the limit set for this month, else the category default
+            limit = status.limit if status and status.limit is not None else Decimal("0")
+            spent = status.spent if status else Decimal("0")
+            if status and status.level != "ok":
+                alert_widgets.append(status)
+
+            for col, value in ((2, _format_currency(limit) if float(limit) > 0 else "-"), (3, _format_currency(spent))):
+                item = QTableWidgetItem(value)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row, col, item)
+
         while self.alert_layout.count():
             item = self.alert_layout.takeAt(0)
             wid = item.widget() if item else None
@@ -243,20 +274,26 @@ class CategoriesView(QWidget):
 
         if alert_widgets:
             self.alert_frame.setVisible(True)
-            for name, spent, limit in alert_widgets:
+            for status in sorted(alert_widgets, key=lambda s: s.ratio, reverse=True):
+                exceeded = status.level == "exceeded"
+                color, soft = ("danger", "danger_soft") if exceeded else ("warning", "warning_soft")
+                message = "Limite atingido/ultrapassado" if exceeded else "80% do limite"
                 alert = QFrame()
-                alert.setProperty("class", "alert_danger")
+                alert.setProperty("class", f"alert_{color}")
                 alert.setStyleSheet(f"""
                     QFrame {{
-                        background-color: {COLORS["danger_soft"]};
-                        border: 1px solid {COLORS["danger"]};
+                        background-color: {COLORS[soft]};
+                        border: 1px solid {COLORS[color]};
                         border-radius: 8px;
                         padding: 12px;
                         margin-bottom: 8px;
                     }}
                 """)
                 alert_layout = QHBoxLayout(alert)
-                alert_layout.addWidget(QLabel(f"Limite atingido/ultrapassado: {name} (gasto: R$ {spent:,.2f}, limite: R$ {limit:,.2f})"))
+                alert_layout.addWidget(QLabel(
+                    f"{message}: {status.name} (gasto: {_format_currency(status.spent)}, "
+                    f"limite: {_format_currency(status.limit)}, {status.ratio:.0%})"
+                ))
                 self.alert_layout.addWidget(alert)
         else:
             self.alert_frame.setVisible(False)
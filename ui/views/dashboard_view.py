@@ -12,8 +12,11 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QColor, QPen
 
-from services.expense_service import total_spent, total_by_category, monthly_totals
-from services.category_service import get_category_color_by_id
+from services import aio, analytics
+from services.dashboard_service import CategorySlice, DashboardSnapshot, get_snapshot
+from services.events import ExpenseCreated, ExpenseDeleted, ExpenseUpdated
+from ui.events import data_events
+from ui.loader import DataLoader
 from ui.styles.theme import COLORS
 
 from ..utils import _format_currency
@@ -22,6 +25,8 @@ from ..utils import _month_year_pt
 class DashboardView(QScrollArea):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.loader = DataLoader(self)
+        data_events().subscribe(self._on_data_event)
         self.setWidgetResizable(True)
         self.setFrameShape(QFrame.Shape.NoFrame)
         self.setStyleSheet("QScrollArea { background: transparent; border: none; }")
@@ -41,22 +46,36 @@ class DashboardView(QScrollArea):
         subtitle = QLabel("Resumo financeiro e visão geral das despesas, mensalmente e anualmente")
         subtitle.setProperty("class", "subtitle")
         layout.addWidget(subtitle)
+
+        self.loading_label = QLabel("Carregando...")
+        self.loading_label.setProperty("class", "muted")
+        self.loading_label.setVisible(False)
+        layout.addWidget(self.loading_label)
         layout.addSpacing(16)
 
         self.cards_layout = QGridLayout()
         layout.addLayout(self.cards_layout)
+        self._cards: dict[str, tuple[QLabel, QLabel]] = {}  # key -> (value, subtitle) labels
+
+        # kept between renders so new figures only move the slices and bars
+        self._pie_series = None
+        self._bar_set = None
+        self._bar_axis_y = None
+        self._bar_months: list[str] = []
 
         self._has_charts = False
 
+        # QtCharts is imported and the chart views built on the first render, after the window is up
         charts_widget = QWidget()
-        charts_layout = QGridLayout(charts_widget)
+        self._charts_layout = QGridLayout(charts_widget)
+        self._charts_built = False
 
         self.chart_pie = None
         self.chart_bars = None
-        self._build_charts(charts_layout)
         layout.addWidget(charts_widget, 1)
 
     def _build_charts(self, parent_layout: QGridLayout):
+        self._charts_built = True
         try:
             from PyQt6.QtCharts import QChartView
             self._has_charts = True
@@ -89,12 +108,16 @@ class DashboardView(QScrollArea):
         bar_layout.addWidget(self.bar_chart_view)
         parent_layout.addWidget(self.bar_container, 0, 1)
 
-    def _clear_cards(self):
-        while self.cards_layout.count():
-            item = self.cards_layout.takeAt(0)
-            wid = item.widget() if item else None
-            if wid:
-                wid.deleteLater()
+    def _set_card(self, key: str, title: str, value: str, row: int, col: int, subtitle: str, color: str = COLORS["success"], is_money: bool = False):
+        """build the card on the first render, afterwards only update its labels."""
+        labels = self._cards.get(key)
+        if labels is None:
+            self._cards[key] = self._add_card(title, value, row, col, subtitle, color, is_money)
+            return
+        v, s = labels
+        v.setText(value)
+        v.setStyleSheet(f"font-size: 24px; font-weight: 500; color: {color};")
+        s.setText(subtitle)
 
     def _add_card(self, title: str, value: str, row: int, col: int, subtitle: str = "", color: str = COLORS["success"], is_money: bool = False):
             card = QFrame()
@@ -121,6 +144,7 @@ class DashboardView(QScrollArea):
             v.setAlignment(Qt.AlignmentFlag.AlignCenter)
             card_layout.addWidget(v)
 
+            s = None
             if subtitle:
                 s = QLabel(subtitle)
                 if is_money:
@@ -133,15 +157,33 @@ class DashboardView(QScrollArea):
                 card_layout.addWidget(s)
 
             self.cards_layout.addWidget(card, row, col)
+            return v, s
 
-    def _update_pie_chart(self, data: list[tuple[str, str, Decimal]]):
+    def _update_pie_chart(self, data: tuple[CategorySlice, ...]):
         if not self._has_charts:
             return
 
         from PyQt6.QtCharts import QChart, QPieSeries
-        series = QPieSeries()
 
-        valid_data = [(cid, cname, total) for cid, cname, total in data if total > 0]
+        valid_data = [s for s in data if s.total > 0]
+        if valid_data and self._pie_series is not None:
+            # same chart: resize the slices, add and drop categories
+            slices = {s.label(): s for s in self._pie_series.slices()}
+            for cat in valid_data:
+                slice_ = slices.pop(cat.name, None)
+                if slice_ is None:
+                    self._style_slice(self._pie_series.append(cat.name, float(cat.total)), cat.color)
+                else:
+                    if slice_.value() != float(cat.total):
+                        slice_.setValue(float(cat.total))
+                    if slice_.color() != QColor(cat.color):
+                        slice_.setColor(QColor(cat.color))
+            for slice_ in slices.values():
+                self._pie_series.remove(slice_)
+            return
+
+        series = QPieSeries()
+        self._pie_series = series if valid_data else None
         if not valid_data:
             slice_ = series.append("Nenhum Gasto", 1)
             if slice_:
@@ -150,14 +192,8 @@ class DashboardView(QScrollArea):
                 slice_.setLabelBrush(QColor(COLORS["text_secondary"]))
                 slice_.setPen(QPen(Qt.PenStyle.NoPen))
         else:
-            for cid, cname, total in valid_data:
-                ccolor = get_category_color_by_id(cid)
-                slice_ = series.append(cname, float(total))
-                if slice_:
-                    slice_.setColor(QColor(ccolor))
-                    slice_.setLabelVisible(True)
-                    slice_.setLabelBrush(QColor(COLORS["text_primary"]))
-                    slice_.setPen(QPen(QColor(COLORS['bg_card']), 1))
+            for cat in valid_data:
+                self._style_slice(series.append(cat.name, float(cat.total)), cat.color)
 
         chart = QChart()
         chart.addSeries(series)
@@ -178,10 +214,28 @@ class DashboardView(QScrollArea):
 
         self.pie_chart_view.setChart(chart)
 
-    def _update_bar_chart(self, data: list[tuple[str, Decimal]]):
+    @staticmethod
+    def _style_slice(slice_, color: str):
+        if slice_:
+            slice_.setColor(QColor(color))
+            slice_.setLabelVisible(True)
+            slice_.setLabelBrush(QColor(COLORS["text_primary"]))
+            slice_.setPen(QPen(QColor(COLORS['bg_card']), 1))
+
+    def _update_bar_chart(self, data: tuple[tuple[str, Decimal], ...]):
         if not self._has_charts:
             return
-        
+
+        months = [ym for ym, _ in data]
+        if self._bar_set is not None and months == self._bar_months:
+            # same months on the axis: only move the bars whose total changed
+            for i, (_, total) in enumerate(data):
+                if self._bar_set.at(i) != float(total):
+                    self._bar_set.replace(i, float(total))
+            # the value axis takes its range from the series only when attached
+            self._bar_axis_y.setRange(0, max((float(t) for _, t in data), default=0))
+            return
+
         from PyQt6.QtCharts import QChart, QBarSet, QBarSeries, QBarCategoryAxis, QValueAxis
         from PyQt6.QtGui import QColor
 
@@ -197,6 +251,7 @@ class DashboardView(QScrollArea):
 
         series = QBarSeries()
         series.append(bar_set)
+        self._bar_set, self._bar_months = bar_set, months
 
         chart = QChart()
         chart.addSeries(series)
@@ -213,6 +268,7 @@ class DashboardView(QScrollArea):
         axis_y = QValueAxis()
         chart.addAxis(axis_y, Qt.AlignmentFlag.AlignLeft)
         series.attachAxis(axis_y)
+        self._bar_axis_y = axis_y
         
         legend = chart.legend()
         legend.setVisible(False) if legend else None
@@ -220,29 +276,51 @@ class DashboardView(QScrollArea):
         self.bar_chart_view.setChart(chart)
 
     def refresh(self):
-        today = datetime.now().date()
+        self.loading_label.setText("Carregando...")
+        self.loading_label.setVisible(True)
+        self._request_snapshot()
+
+    def _request_snapshot(self):
+        fn = get_snapshot
+        if aio.overlaps() and not analytics.available():
+            # from SQL: the asyncio twin reads the month breakdown and monthly series concurrently
+            from services.aio.dashboard_service import get_snapshot as fn
+        self.loader.request(
+            "snapshot", fn, datetime.now().date(),
+            on_result=self._render, on_error=self._show_error,
+        )
+
+    def _on_data_event(self, event):
+        """new figures for the cards and charts; with NumPy they come from the ledger, without SQL."""
+        if not self.isVisible():
+            return  # refreshed when navigated to
+        if isinstance(event, (ExpenseCreated, ExpenseUpdated, ExpenseDeleted)):
+            states = (event.before, event.after) if isinstance(event, ExpenseUpdated) else (event.expense,)
+            today = datetime.now()
+            window_start = datetime(today.year - 1, today.month, 1)  # the 12 months of the bar chart
+            if not any(window_start <= s.date for s in states):
+                return
+        self._request_snapshot()
+
+    def _show_error(self, error: Exception):
+        self.loading_label.setText(f"Erro ao carregar o resumo: {error}")
+
+    def _render(self, snapshot: DashboardSnapshot):
+        self.loading_label.setVisible(False)
+        today = snapshot.today
         start_month = datetime(today.year, today.month, 1)
-        end_today = datetime.combine(today, datetime.max.time())
-        start_year = datetime(today.year, 1, 1)
 
-        self._clear_cards()
+        self._set_card("month", "Gastos este mês", _format_currency(snapshot.month_total), 0, 0, _month_year_pt(start_month))
+        self._set_card("year", "Gastos este ano", _format_currency(snapshot.year_total), 0, 1, str(today.year))
 
-        total_this_month = total_spent(start_month, end_today)
-        self._add_card("Gastos este mês", _format_currency(total_this_month), 0, 0, _month_year_pt(start_month)) if float(total_this_month) > 0 else self._add_card("Gastos este mês", _format_currency(Decimal("0")), 0, 0, _month_year_pt(start_month))
-        
-        total_this_year = total_spent(start_year, end_today)
-        self._add_card("Gastos este ano", _format_currency(total_this_year), 0, 1,
-                       str(today.year)) if float(total_this_year) > 0 else self._add_card("Gastos esse ano", _format_currency(Decimal("0")), 0, 1, str(today.year))
-        
-        totals = total_by_category(start_month, end_today)
-        top_cid, top_name, top_total = max(totals, key=lambda x: x[2]) if totals else (0, "Nenhum gasto", Decimal("0"))
-        main_color = get_category_color_by_id(str(top_cid))
-
-        self._add_card("Categoria com maior gasto ", top_name, 0, 2, _format_currency(top_total), color = main_color, is_money = True)
+        top = snapshot.top_category
+        if top:
+            self._set_card("top", "Categoria com maior gasto ", top.name, 0, 2, _format_currency(top.total), color = top.color, is_money = True)
+        else:
+            self._set_card("top", "Categoria com maior gasto ", "Nenhum gasto", 0, 2, _format_currency(Decimal("0")), color = COLORS["accent"], is_money = True)
 
+        if not self._charts_built:
+            self._build_charts(self._charts_layout)
         if self._has_charts:
-            by_cat = total_by_category(start_month, end_today)
-            monthly = monthly_totals(12)
-
-            self._update_pie_chart(by_cat)
-            self._update_bar_chart(monthly)
+            self._update_pie_chart(snapshot.by_category)
+            self._update_bar_chart(snapshot.monthly)
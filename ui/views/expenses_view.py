@@ -1,12 +1,16 @@
 from datetime import datetime, date
 from decimal import Decimal
+from html import escape
+from typing import Optional
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import (
+    QAbstractItemView,
     QComboBox,
     QDateEdit,
     QDialog,
     QDoubleSpinBox,
+    QFileDialog,
     QFormLayout,
     QFrame,
     QGridLayout,
@@ -17,15 +21,30 @@ from PyQt6.QtWidgets import (
     QLineEdit,
     QMessageBox,
     QPushButton,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
 
-from services.expense_service import list_expenses, add_expense, update_expense, remove_expense, get_expense, total_spent
+from app.config import BASE_CURRENCY
+from services.events import (
+    CategoryChanged, ExpenseCreated, ExpenseDeleted, ExpensesImported, ExpenseUpdated, RatesChanged,
+)
+from services.expense_service import (
+    add_expense, update_expense, remove_expense, get_expense, summarize_expenses, expense_matches,
+)
 from services.category_service import list_categories, get_category, get_category_color_by_id
 from services.export_service import export_csv, export_pdf
+from services.fx_service import currencies, delete_rate, list_rates, set_rate, symbol
+from services.import_service import import_csv
+from services.recurring_service import (
+    FREQUENCIES, create_recurring, delete_recurring, list_recurring, materialize_due, next_occurrence, set_active,
+)
+from ui.components.expenses_table import ACTIONS_COLUMN, ActionsDelegate, ExpensesTableModel
+from ui.events import data_events
+from ui.loader import DataLoader
 from ..utils import _format_currency, _safe_call
 
 class ExpenseFormDialog(QDialog):
@@ -40,8 +59,17 @@ class ExpenseFormDialog(QDialog):
         self.amount = QDoubleSpinBox()
         self.amount.setRange(0.01, 99999999.99)
         self.amount.setDecimals(2)
-        self.amount.setPrefix("R$ ")
-        form.addRow("Valor", self.amount)
+        self.currency = QComboBox()
+        for code in currencies():
+            self.currency.addItem(code, code)
+        self.currency.currentIndexChanged.connect(
+            lambda _: self.amount.setPrefix(f"{symbol(self.currency.currentData())} ")
+        )
+        self.amount.setPrefix(f"{symbol(BASE_CURRENCY)} ")
+        amount_row = QHBoxLayout()
+        amount_row.addWidget(self.amount, 1)
+        amount_row.addWidget(self.currency)
+        form.addRow("Valor", amount_row)
 
         self.date_edit = QDateEdit()
         self.date_edit.setCalendarPopup(True)
@@ -60,6 +88,14 @@ class ExpenseFormDialog(QDialog):
         self.source.setPlaceholderText("Sua fonte de pagamento")
         form.addRow("Banco", self.source)
 
+        self.repeat = None
+        if not expense:
+            self.repeat = QComboBox()
+            self.repeat.addItem("Não repete", None)
+            for frequency, label in FREQUENCIES.items():
+                self.repeat.addItem(label, frequency)
+            form.addRow("Repetir", self.repeat)
+
         layout.addLayout(form)
 
         buttons = QHBoxLayout()
@@ -75,6 +111,11 @@ class ExpenseFormDialog(QDialog):
 
         if expense:
             self.amount.setValue(float(expense.amount))
+            idx = self.currency.findData(expense.currency)
+            if idx < 0:  # a code no longer in CURRENCY_SYMBOLS
+                self.currency.addItem(expense.currency, expense.currency)
+                idx = self.currency.count() - 1
+            self.currency.setCurrentIndex(idx)
             self.date_edit.setDate(expense.date.date() if hasattr(expense.date, "date") else expense.date)
             idx = self.category_combo.findData(expense.category_id)
             if idx >= 0:
@@ -96,18 +137,207 @@ class ExpenseFormDialog(QDialog):
             return
         desc = self.description.text().strip()
         source = self.source.text().strip()
-        if self.expense:
-            update_expense(self.expense.id, amount=amount, date=dt, category_id=cat_id,
-                           description=desc or None, source=source or None)
-        else:
-            add_expense(amount, dt, cat_id, desc, source)
+        currency = self.currency.currentData()
+        try:
+            if self.expense:
+                update_expense(self.expense.id, amount=amount, date=dt, category_id=cat_id,
+                               description=desc or None, source=source or None, currency=currency)
+            elif self.repeat.currentData():
+                # the template writes this first expense too, plus any occurrence already due since dt
+                create_recurring(amount, cat_id, dt, self.repeat.currentData(), description=desc, source=source,
+                                 currency=currency)
+                materialize_due()
+            else:
+                add_expense(amount, dt, cat_id, desc, source, currency)
+        except ValueError as e:  # e.g. no exchange rate for the currency
+            QMessageBox.warning(self, "Erro", str(e))
+            return
         self.accept()
 
 
+class RecurringExpensesDialog(QDialog):
+    """the recurring expense templates, to pause, resume or remove them."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Despesas recorrentes")
+        self.setMinimumSize(760, 360)
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels(["Descrição", "Categoria", "Valor", "Repetição", "Próxima", "Ações"])
+        _safe_call(self.table.verticalHeader(), "setVisible", False)
+        _safe_call(self.table.verticalHeader(), "setDefaultSectionSize", 45)
+        _safe_call(self.table.horizontalHeader(), "setSectionResizeMode", QHeaderView.ResizeMode.Stretch)
+        self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        close = QPushButton("Fechar")
+        close.clicked.connect(self.accept)
+        buttons.addWidget(close)
+        layout.addLayout(buttons)
+        self.refresh()
+
+    def refresh(self):
+        templates = list_recurring()
+        self.table.setRowCount(len(templates))
+        for row, rec in enumerate(templates):
+            upcoming = next_occurrence(rec) if rec.active else None
+            repeat = FREQUENCIES[rec.frequency] if rec.interval == 1 else f"{FREQUENCIES[rec.frequency]} (a cada {rec.interval})"
+            data = [
+                rec.description or "-",
+                rec.category_name or "-",
+                _format_currency(rec.amount, rec.currency),
+                repeat,
+                upcoming.strftime("%d/%m/%Y") if upcoming else ("Pausada" if not rec.active else "Encerrada"),
+            ]
+            for col, value in enumerate(data):
+                item = QTableWidgetItem(value)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row, col, item)
+
+            actions = QWidget()
+            actions_layout = QHBoxLayout(actions)
+            actions_layout.setContentsMargins(0, 0, 0, 0)
+            actions_layout.setSpacing(5)
+            actions_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+            toggle_btn = QPushButton("Pausar" if rec.active else "Retomar")
+            toggle_btn.setProperty("class", "edit")
+            toggle_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            toggle_btn.setFixedSize(70, 24)
+            toggle_btn.clicked.connect(lambda checked, r=rec: self._toggle(r))
+
+            del_btn = QPushButton("Delete")
+            del_btn.setProperty("class", "delete")
+            del_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            del_btn.setFixedSize(60, 24)
+            del_btn.clicked.connect(lambda checked, r=rec: self._delete(r))
+
+            actions_layout.addWidget(toggle_btn)
+            actions_layout.addWidget(del_btn)
+            self.table.setCellWidget(row, 5, actions)
+
+    def _toggle(self, rec):
+        set_active(rec.id, not rec.active)
+        if not rec.active:
+            materialize_due()  # an occurrence due today is written right away
+        self.refresh()
+
+    def _delete(self, rec):
+        if QMessageBox.question(
+            self, "Confirmar",
+            "Remover esta despesa recorrente? As despesas já lançadas são mantidas.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        ) == QMessageBox.StandardButton.Yes:
+            delete_recurring(rec.id)
+            self.refresh()
+
+
+class FxRatesDialog(QDialog):
+    """exchange rates to BASE_CURRENCY, one per currency and day."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Cotações")
+        self.setMinimumSize(520, 380)
+        layout = QVBoxLayout(self)
+
+        hint = QLabel(f"Valor de 1 unidade da moeda em {BASE_CURRENCY}, válido a partir da data até a próxima cotação.")
+        hint.setProperty("class", "muted")
+        hint.setWordWrap(True)
+        layout.addWidget(hint)
+
+        form = QHBoxLayout()
+        self.currency = QComboBox()
+        for code in currencies()[1:]:
+            self.currency.addItem(code, code)
+        self.day = QDateEdit()
+        self.day.setCalendarPopup(True)
+        self.day.setDate(date.today())
+        self.rate = QDoubleSpinBox()
+        self.rate.setRange(0.0001, 1_000_000)
+        self.rate.setDecimals(4)
+        self.rate.setPrefix(f"{symbol(BASE_CURRENCY)} ")
+        save = QPushButton("Salvar")
+        save.setProperty("class", "primary")
+        save.clicked.connect(self._save)
+        form.addWidget(self.currency)
+        form.addWidget(self.day)
+        form.addWidget(self.rate, 1)
+        form.addWidget(save)
+        layout.addLayout(form)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["Moeda", "A partir de", "Cotação", "Ações"])
+        _safe_call(self.table.verticalHeader(), "setVisible", False)
+        _safe_call(self.table.verticalHeader(), "setDefaultSectionSize", 40)
+        _safe_call(self.table.horizontalHeader(), "setSectionResizeMode", QHeaderView.ResizeMode.Stretch)
+        self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        close = QPushButton("Fechar")
+        close.clicked.connect(self.accept)
+        buttons.addWidget(close)
+        layout.addLayout(buttons)
+        self.refresh()
+
+    def refresh(self):
+        rates = list_rates()
+        self.table.setRowCount(len(rates))
+        for row, fx in enumerate(rates):
+            for col, value in enumerate((fx.currency, fx.day.strftime("%d/%m/%Y"), f"{fx.rate:.4f}".replace(".", ","))):
+                item = QTableWidgetItem(value)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row, col, item)
+            del_btn = QPushButton("Delete")
+            del_btn.setProperty("class", "delete")
+            del_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            del_btn.setFixedSize(60, 24)
+            del_btn.clicked.connect(lambda checked, c=fx.currency, d=fx.day: self._delete(c, d))
+            cell = QWidget()
+            cell_layout = QHBoxLayout(cell)
+            cell_layout.setContentsMargins(0, 0, 0, 0)
+            cell_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            cell_layout.addWidget(del_btn)
+            self.table.setCellWidget(row, 3, cell)
+
+    def _save(self):
+        try:
+            set_rate(self.currency.currentData(), self.day.date().toPyDate(), Decimal(str(self.rate.value())))
+        except ValueError as e:
+            QMessageBox.warning(self, "Erro", str(e))
+            return
+        self.refresh()
+
+    def _delete(self, currency: str, day: datetime):
+        try:
+            delete_rate(currency, day)
+        except ValueError as e:
+            QMessageBox.warning(self, "Erro", str(e))
+            return
+        self.refresh()
+
+
 class ExpensesView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.main_window = parent
+        self.loader = DataLoader(self)
+        self._summary: Optional[list] = None  # [filter name, count, total, filter color] on screen
+        self._page_error: Optional[str] = None  # why the table stopped loading, shown under the summary
+        data_events().subscribe(self._on_data_event)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(32, 32, 32, 32)
 
@@ -122,6 +352,14 @@ class ExpensesView(QWidget):
         self.add_btn.setProperty("class", "primary")
         self.add_btn.clicked.connect(self._open_form)
 
+        self.recurring_btn = QPushButton("Recorrentes")
+        self.recurring_btn.clicked.connect(lambda: RecurringExpensesDialog(self).exec())
+
+        self.rates_btn = QPushButton("Cotações")
+        self.rates_btn.clicked.connect(lambda: FxRatesDialog(self).exec())
+
+        header.addWidget(self.rates_btn)
+        header.addWidget(self.recurring_btn)
         header.addWidget(self.add_btn)
         layout.addLayout(header)
 
@@ -144,18 +382,35 @@ class ExpensesView(QWidget):
         filters_layout.addWidget(self.filter_date_to)
         filters_layout.addWidget(QLabel("Categoria:"))
         filters_layout.addWidget(self.filter_category, 1)
+
+        # search refreshes once typing pauses instead of on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(300)
+        self._search_timer.timeout.connect(self.refresh)
+        self.filter_search = QLineEdit()
+        self.filter_search.setPlaceholderText("Buscar descrição ou banco")
+        self.filter_search.setClearButtonEnabled(True)
+        self.filter_search.textChanged.connect(lambda _: self._search_timer.start())
+        filters_layout.addWidget(self.filter_search, 1)
         layout.addWidget(filters)
 
-        self.table = QTableWidget()
-        self.table.setColumnWidth(5, 150)
+        self.model = ExpensesTableModel(parent=self)
+        self.actions_delegate = ActionsDelegate(self)
+        self.actions_delegate.editRequested.connect(self._edit_row)
+        self.actions_delegate.deleteRequested.connect(self._delete_row)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(ACTIONS_COLUMN, self.actions_delegate)
         self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["Data", "Valor", "Categoria", "Descrição", "Banco", "Ações"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         _safe_call(self.table.horizontalHeader(), "setSectionResizeMode", QHeaderView.ResizeMode.Stretch)
         _safe_call(self.table.verticalHeader(), "setVisible", False)
+        # fixed, uniform row heights so the view never measures rows it has not painted
+        _safe_call(self.table.verticalHeader(), "setSectionResizeMode", QHeaderView.ResizeMode.Fixed)
         _safe_call(self.table.verticalHeader(), "setDefaultSectionSize", 50)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setAlternatingRowColors(True)
         layout.addWidget(self.table)
 
@@ -166,9 +421,14 @@ class ExpensesView(QWidget):
         self.label_status.setTextFormat(Qt.TextFormat.RichText)
 
         layout.addWidget(self.label_status)
+        # a page that fails stops the table there; refresh() (any filter change) retries from the top
+        self.model.loadFailed.connect(self._page_failed)
 
         export_row = QHBoxLayout()
         export_row.addStretch()
+        self.import_csv_btn = QPushButton("Importar CSV")
+        self.import_csv_btn.clicked.connect(self._import_csv)
+        export_row.addWidget(self.import_csv_btn)
         self.export_csv_btn = QPushButton("Exportar CSV")
         self.export_csv_btn.clicked.connect(self._export_csv)
         self.export_pdf_btn = QPushButton("Exportar PDF")
@@ -178,27 +438,22 @@ class ExpensesView(QWidget):
         layout.addLayout(export_row)
  
         self._load_category_filter()
-        self.refresh()
+        # filled by refresh(), which MainWindow calls whenever the view is shown
 
     def _load_category_filter(self):
+        """(re)fill the category filter, keeping the selected category if it still exists."""
+        selected = self.filter_category.currentData()
+        self.filter_category.blockSignals(True)
         self.filter_category.clear()
         self.filter_category.addItem("Todas", None)
         for c in list_categories():
             self.filter_category.addItem(str(c.name), c.id)
+        self.filter_category.setCurrentIndex(max(self.filter_category.findData(selected), 0))
+        self.filter_category.blockSignals(False)
 
-    def _get_expenses_in_category_filter(self, category_id):
-        return list_expenses(
-            date_from=datetime.combine(self.filter_date_from.date().toPyDate(), datetime.min.time()),
-            date_to=datetime.combine(self.filter_date_to.date().toPyDate(), datetime.max.time()),
-            category_id=category_id,
-        )
-    
     def _open_form(self, expense=None):
-        d = ExpenseFormDialog(self, expense)
-        if d.exec():
-            self.refresh()
-            if self.main_window:
-                self.main_window.refresh_current_view()
+        # the table and summary are patched from the data event the write publishes
+        ExpenseFormDialog(self, expense).exec()
 
     def _export_csv(self):
         try:
@@ -213,96 +468,182 @@ class ExpensesView(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Erro", str(e))
 
+    def _import_csv(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Importar extrato", "", "CSV (*.csv *.txt)")
+        if not path:
+            return
+        self.import_csv_btn.setEnabled(False)
+        self.import_csv_btn.setText("Importando...")
+        # rows without a known category go to the category selected in the filter, if any
+        self.loader.request(
+            "import", import_csv, path, default_category_id=self.filter_category.currentData(),
+            on_result=self._import_finished, on_error=self._import_failed,
+        )
+
+    def _import_finished(self, result):
+        self.import_csv_btn.setEnabled(True)
+        self.import_csv_btn.setText("Importar CSV")
+        msg = f"{result.inserted} despesas importadas."
+        if result.errors:
+            lines = "\n".join(f"linha {e.line}: {e.message}" for e in result.errors[:10])
+            more = f"\n... e mais {len(result.errors) - 10}" if len(result.errors) > 10 else ""
+            msg += f"\n\n{len(result.errors)} linhas ignoradas:\n{lines}{more}"
+        QMessageBox.information(self, "Importação concluída", msg)
+
+    def _import_failed(self, error: Exception):
+        self.import_csv_btn.setEnabled(True)
+        self.import_csv_btn.setText("Importar CSV")
+        QMessageBox.critical(self, "Erro", str(error))
+
     def _export_pdf(self):
-        try:
-            cat_id = self.filter_category.currentData()
+        self.export_pdf_btn.setEnabled(False)
+        self.export_pdf_btn.setText("Exportando...")
+        self.loader.request(
+            "export_pdf", export_pdf,
+            date_from=datetime.combine(self.filter_date_from.date().toPyDate(), datetime.min.time()),
+            date_to=datetime.combine(self.filter_date_to.date().toPyDate(), datetime.max.time()),
+            category_id=self.filter_category.currentData(),
+            on_result=self._export_pdf_finished, on_error=self._export_pdf_failed,
+        )
 
-            path = export_pdf(
-                date_from=datetime.combine(self.filter_date_from.date().toPyDate(), datetime.min.time()),
-                date_to=datetime.combine(self.filter_date_to.date().toPyDate(), datetime.max.time()),
-                category_id = cat_id,
-            )
-            QMessageBox.information(self, "Exportado", f"PDF salvo em:\n{path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", str(e))
+    def _export_pdf_finished(self, path: str):
+        self.export_pdf_btn.setEnabled(True)
+        self.export_pdf_btn.setText("Exportar PDF")
+        QMessageBox.information(self, "Exportado", f"PDF salvo em:\n{path}")
+
+    def _export_pdf_failed(self, error: Exception):
+        self.export_pdf_btn.setEnabled(True)
+        self.export_pdf_btn.setText("Exportar PDF")
+        QMessageBox.critical(self, "Erro", str(error))
 
     def _edit_row(self, row: int):
-        item = self.table.item(row, 0)
-        if item is not None:
-            expense_id = item.data(Qt.ItemDataRole.UserRole)
-            if expense_id is not None:
-                expense = get_expense(expense_id)
-                if expense:
-                    self._open_form(expense)
+        expense_id = self.model.expense_id(row)
+        if expense_id is not None:
+            expense = get_expense(expense_id)
+            if expense:
+                self._open_form(expense)
 
     def _delete_row(self, row: int):
-        item = self.table.item(row, 0)
-        if item is not None:
-            expense_id = item.data(Qt.ItemDataRole.UserRole)
-            if expense_id is not None:
-                if QMessageBox.question(
-                    self, "Confirmar",
-                    "Excluir esta despesa?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.No,
-                ) == QMessageBox.StandardButton.Yes:
-                    remove_expense(expense_id)
-                    self.refresh()
-                    if self.main_window:
-                        self.main_window.refresh_current_view()
+        expense_id = self.model.expense_id(row)
+        if expense_id is not None:
+            if QMessageBox.question(
+                self, "Confirmar",
+                "Excluir esta despesa?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No,
+            ) == QMessageBox.StandardButton.Yes:
+                remove_expense(expense_id)
 
     def refresh(self):
         date_from = datetime.combine(self.filter_date_from.date().toPyDate(), datetime.min.time())
         date_to = datetime.combine(self.filter_date_to.date().toPyDate(), datetime.max.time())
         cat_id = self.filter_category.currentData()
+        search = self.filter_search.text().strip() or None
+
+        self._page_error = None
+        self.model.set_filters(date_from=date_from, date_to=date_to, category_id=cat_id, search=search)
+
+        self.label_status.setText("Carregando despesas...")
+        self._request_summary()
+
+    def _request_summary(self):
+        filters = self.model.filters()
+        cat_id = filters.get("category_id")
+        filter_name = self.filter_category.currentText() if cat_id else "Totais"
+        self.loader.request(
+            "summary", self._load_summary,
+            filters.get("date_from"), filters.get("date_to"), cat_id, filters.get("search"),
+            on_result=lambda result: self._show_summary(filter_name, *result),
+            on_error=lambda e: self.label_status.setText(f"Erro ao carregar despesas: {e}"),
+        )
 
-        expenses = list_expenses(date_from=date_from, date_to=date_to, category_id=cat_id)
-        self.table.setRowCount(len(expenses))
+    @staticmethod
+    def _load_summary(date_from, date_to, cat_id, search):
+        """worker thread: (count, total, filter color)."""
+        count, spent = summarize_expenses(date_from=date_from, date_to=date_to, category_id=cat_id, search=search)
+        color = get_category_color_by_id(str(cat_id) if cat_id is not None else "#000000")
+        return count, spent, color
+
+    def _show_summary(self, filter_name: str, count: int, spent: Decimal, filer_color: str):
+        self._summary = [filter_name, count, spent, filer_color]
+        self.label_status.setText(
+            f"Despesas <span style='color:{filer_color};'>{filter_name}</span> > {count} "
+            f"<br>Gastos totais > <span style='color:#00CB00;'>{_format_currency(spent)}</span>"
+            + (f"<br>{self._page_error_html()}" if self._page_error else "")
+        )
 
-        for row, e in enumerate(expenses):
-            category = get_category(str(e.category_id))
-            # print(category)
-            data = [
-                e.date.strftime("%d/%m/%Y") if e.date is not None else "",
-                _format_currency(Decimal(str(e.amount))),
-                category.name if category else "no category relationship",
-                (e.description or "")[:25],
-                str(e.source or ""),
-            ]
+    def _page_failed(self, error: str):
+        self._page_error = error
+        if self._summary is None or self.loader.is_loading("summary"):
+            self.label_status.setText(self._page_error_html())  # the summary appends it when it arrives
+        else:
+            self._show_summary(*self._summary)
 
-            for col, val in enumerate(data):
-                item = QTableWidgetItem(val)
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                if col == 0:
-                    item.setData(Qt.ItemDataRole.UserRole, e.id)
-                self.table.setItem(row, col, item)
+    def _page_error_html(self) -> str:
+        if not self._page_error:
+            return ""
+        return f"<span style='color:#d61a1a;'>Erro ao carregar despesas: {escape(self._page_error)}</span>"
 
-            spent = sum(e.amount for e in expenses)
-            filter_category = get_category(cat_id) if cat_id else None
-            filer_color = get_category_color_by_id(str(cat_id) if cat_id is not None else "#000000")
-            self.label_status.setText(
-                f"Despesas <span style='color:{filer_color};'>{filter_category.name if filter_category else 'Totais'}</span> > {len(expenses)} "
-                f"<br>Gastos totais > <span style='color:#00CB00;'>{_format_currency(spent)}</span>"
-            )
+    # ---------- data events: patch the affected row and the summary instead of reloading ----------
 
-            actions = QWidget()
-            actions_layout = QHBoxLayout(actions)
-            actions_layout.setContentsMargins(0, 0, 0, 0)
-            actions_layout.setSpacing(6)
-            actions_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    def _on_data_event(self, event):
+        if not self.isVisible():
+            return  # refreshed when navigated to
+        if isinstance(event, CategoryChanged):
+            self._load_category_filter()
+            self.refresh()
+        elif isinstance(event, ExpensesImported):
+            self.refresh()
+        elif isinstance(event, RatesChanged):
+            self._request_summary()  # rows show their own currency; only the converted total changes
+        elif isinstance(event, (ExpenseCreated, ExpenseUpdated, ExpenseDeleted)):
+            before = event.before if isinstance(event, ExpenseUpdated) else None
+            after = event.after if isinstance(event, ExpenseUpdated) else None
+            if isinstance(event, ExpenseCreated):
+                after = event.expense
+            elif isinstance(event, ExpenseDeleted):
+                before = event.expense
+            self._patch(before, after)
+
+    def _matches(self, expense) -> bool:
+        """the filters of the table, except search, checked on an ExpenseState."""
+        filters = self.model.filters()
+        date_from, date_to, category_id = filters.get("date_from"), filters.get("date_to"), filters.get("category_id")
+        return (
+            (date_from is None or expense.date >= date_from)
+            and (date_to is None or expense.date <= date_to)
+            and (category_id is None or expense.category_id == category_id)
+        )
 
-            edit_btn = QPushButton("Edit")
-            edit_btn.setProperty("class", "edit")
-            edit_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            edit_btn.setFixedSize(40, 24)
-            edit_btn.clicked.connect(lambda checked, r=row: self._edit_row(r))
+    def _patch(self, before, after):
+        filters = self.model.filters()
+        if filters.get("search"):
+            # full-text matching needs the database: one primary key lookup, then the summary again
+            expense_id = (after or before).id
+            matched = (lambda: expense_matches(after.id, **filters)) if after else (lambda: False)
+            self.loader.request(
+                f"event:{expense_id}", matched,
+                on_result=lambda ok: self._apply(before, after if ok else None, refresh_summary=True),
+            )
+            return
 
-            del_btn = QPushButton("Delete")
-            del_btn.setProperty("class", "delete")
-            del_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            del_btn.setFixedSize(60, 24)
-            del_btn.clicked.connect(lambda checked, r=row: self._delete_row(r))
-            
-            actions_layout.addWidget(edit_btn)
-            actions_layout.addWidget(del_btn)
-            self.table.setCellWidget(row, 5, actions)
+        self._apply(before, after if after and self._matches(after) else None, refresh_summary=False)
+        if self._summary is None or self.loader.is_loading("summary"):
+            self._request_summary()  # the summary being loaded may have been read before this write
+        else:
+            filter_name, count, spent, color = self._summary
+            if before and self._matches(before):
+                count, spent = count - 1, spent - before.base_amount
+            if after and self._matches(after):
+                count, spent = count + 1, spent + after.base_amount
+            self._show_summary(filter_name, count, spent, color)
+
+    def _apply(self, before, shown, refresh_summary: bool):
+        """shown: the new state of the expense when it belongs in the table, else None."""
+        if shown is not None:
+            category = get_category(shown.category_id)
+            self.model.upsert_row(shown, category.name if category else "")
+        elif before is not None:
+            self.model.remove_row(before.id)
+        if refresh_summary:
+            self._request_summary()